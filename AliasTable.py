@@ -0,0 +1,54 @@
+import random
+from array import array
+from typing import Sequence
+
+
+class AliasTable(object):
+    def __init__(self, weights:Sequence[float] | None, size:int) -> None:
+        """constructor of the AliasTable object, draw an index with a probability proportional to its weight in O(1).
+
+        The table is built in O(size) with the method of Vose
+
+        Args:
+            weights (Sequence[float] | None): the positive weight of each index, None : every index has the weight 1
+            size (int): the number of indexes
+        """
+        super(AliasTable, self).__init__()
+        self.size:int = size
+        self.uniform:bool = weights is None
+        self.total:float = float(size) if weights is None else float(sum(weights))
+        # probability to keep the drawn index, else its alias is returned
+        self.probability:array = array('d')
+        self.alias:array = array('I')
+        if weights is None or size == 0:
+            return
+
+        self.probability = array('d', (weight * size / self.total for weight in weights))
+        self.alias = array('I', bytes(4 * size))
+        small = [index for index in range(size) if self.probability[index] < 1]
+        large = [index for index in range(size) if self.probability[index] >= 1]
+        while len(small) > 0 and len(large) > 0:
+            less = small.pop()
+            more = large.pop()
+            self.alias[less] = more
+            # the large index gives the missing probability of the small one
+            self.probability[more] -= 1 - self.probability[less]
+            (small if self.probability[more] < 1 else large).append(more)
+        # the remaining indexes are only rounding errors away from 1
+        for index in small + large:
+            self.probability[index] = 1
+
+    def draw(self, rng:random.Random | None = None) -> int:
+        """draw an index
+
+        Args:
+            rng (random.Random | None, optional): the random generator. Defaults to the random module.
+
+        Returns:
+            int: the index
+        """
+        rng = rng or random
+        index = rng.randrange(self.size)
+        if self.uniform or rng.random() < self.probability[index]:
+            return index
+        return self.alias[index]
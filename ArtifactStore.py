@@ -0,0 +1,243 @@
+import os
+from collections import OrderedDict
+from FileIO import get_file_io
+
+
+class ArtifactStore(object):
+    def __init__(self, max_bytes:int, spill_dir:str | None = None) -> None:
+        """constructor of the ArtifactStore object.
+
+        Keep the encoded grids in memory, addressed by the hash of the board state they show :
+        the views showing the same board state share one image.
+        The least recently used grids are evicted when the store is full.
+        If a spill directory is given the evicted grids are written in it and read back on demand
+
+        Args:
+            max_bytes (int): the maximum number of bytes kept in memory
+            spill_dir (str | None, optional): the directory used to store the evicted grids. Defaults to None.
+        """
+        super(ArtifactStore, self).__init__()
+        self.max_bytes:int = max_bytes
+        self.spill_dir:str | None = spill_dir
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+        # board state hash -> encoded image
+        self.artifacts:OrderedDict[str, bytes] = OrderedDict()
+        # (channel_id, isSpy) -> (board version, board state hash)
+        self.pointers:dict[tuple[str, bool], tuple[int, str]] = {}
+        # number of channel views pointing to each board state hash
+        self.references:dict[str, int] = {}
+        # board state hash of the grids written in the spill directory, a grid read back stays in it
+        self.spilled:set[str] = set()
+        # evicted grids being written in the spill directory
+        self.spilling:dict[str, bytes] = {}
+        self.size_bytes:int = 0
+
+        self.hits:int = 0
+        self.spill_hits:int = 0
+        self.misses:int = 0
+        self.shared:int = 0
+        self.evictions:int = 0
+
+    @classmethod
+    def from_env(cls) -> "ArtifactStore":
+        """create an ArtifactStore configured with the ARTIFACT_STORE_MAX_BYTES and ARTIFACT_SPILL_DIR environment variables
+
+        Returns:
+            ArtifactStore: the store
+        """
+        max_bytes = os.getenv('ARTIFACT_STORE_MAX_BYTES')
+        return cls(
+            max_bytes=int(max_bytes) if max_bytes != None and max_bytes.isnumeric() else 256_000_000,
+            spill_dir=os.getenv('ARTIFACT_SPILL_DIR')
+        )
+
+    def get_spill_path(self, state_hash:str) -> str:
+        return os.path.join(self.spill_dir or "", f"{state_hash}.grid")
+
+    async def put(self, channel_id:str, isSpy:bool, data:bytes, version:int=0, state_hash:str | None = None):
+        """store the encoded grid of a channel view, replace the previous one
+
+        Args:
+            channel_id (str): the channel id of the game
+            isSpy (bool): True for the spies grid, False for the players grid
+            data (bytes): the encoded image
+            version (int, optional): the board version of the image. Defaults to 0.
+            state_hash (str | None, optional): the hash of the board state shown. Defaults to a key only used by this channel view.
+        """
+        if state_hash is None:
+            state_hash = f"{channel_id}{'_SPY' if isSpy else '_PLAYER'}_{version}"
+        # the new pointer is added before releasing the previous one : an unchanged image is kept
+        previous = self.pointers.get((channel_id, isSpy))
+        self.pointers[(channel_id, isSpy)] = (version, state_hash)
+        self.references[state_hash] = self.references.get(state_hash, 0) + 1
+        removed = self.release(previous[1]) if previous is not None else []
+
+        if state_hash in self.artifacts:
+            self.artifacts.move_to_end(state_hash)
+            self.shared += 1
+        else:
+            self.artifacts[state_hash] = data
+            self.size_bytes += len(data)
+        # the store is updated before the first await, the files are written after
+        evicted = self.evict()
+        await self.remove_spill_files(removed)
+        await self.spill(evicted)
+
+    def evict(self) -> list[str]:
+        """evict the least recently used grids until the store is not full, the last used one is always kept
+
+        Returns:
+            list[str]: the hash of the evicted grids to write in the spill directory
+        """
+        evicted:list[str] = []
+        while self.size_bytes > self.max_bytes and len(self.artifacts) > 1:
+            (evicted_hash, data) = self.artifacts.popitem(last=False)
+            self.size_bytes -= len(data)
+            self.evictions += 1
+            # a grid read back from the spill directory is still in it
+            if self.spill_dir is not None and evicted_hash not in self.spilled:
+                self.spilling[evicted_hash] = data
+                evicted.append(evicted_hash)
+        return evicted
+
+    async def spill(self, evicted:list[str]):
+        for state_hash in evicted:
+            try:
+                await get_file_io().write_bytes(self.get_spill_path(state_hash), self.spilling[state_hash])
+            except (OSError, TimeoutError) as e:
+                print(e)
+                self.spilling.pop(state_hash)
+                continue
+            self.spilling.pop(state_hash)
+            if state_hash in self.references:
+                self.spilled.add(state_hash)
+            else:
+                # released while it was written
+                await get_file_io().remove(self.get_spill_path(state_hash))
+
+    def release(self, state_hash:str) -> list[str]:
+        """remove a reference to a grid, the grid is removed when no channel view points to it anymore
+
+        Args:
+            state_hash (str): the hash of the board state shown by the grid
+
+        Returns:
+            list[str]: the hash of the grids to remove from the spill directory
+        """
+        self.references[state_hash] -= 1
+        if self.references[state_hash] > 0:
+            return []
+        self.references.pop(state_hash)
+        data = self.artifacts.pop(state_hash, None)
+        if data is not None:
+            self.size_bytes -= len(data)
+        if state_hash in self.spilled:
+            self.spilled.remove(state_hash)
+            return [state_hash]
+        return []
+
+    async def remove_spill_files(self, removed:list[str]):
+        for state_hash in removed:
+            await get_file_io().remove(self.get_spill_path(state_hash))
+
+    def get_hash(self, channel_id:str, isSpy:bool, version:int | None = None) -> str | None:
+        """return the hash of the board state shown by the grid of a channel view
+
+        Args:
+            channel_id (str): the channel id of the game
+            isSpy (bool): True for the spies grid, False for the players grid
+            version (int | None, optional): the board version expected. Defaults to None : any version.
+
+        Returns:
+            str | None: the hash or None if no grid of this version is stored
+        """
+        pointer = self.pointers.get((channel_id, isSpy))
+        if pointer is None or (version is not None and pointer[0] != version):
+            return None
+        return pointer[1]
+
+    async def get(self, channel_id:str, isSpy:bool, version:int | None = None) -> bytes | None:
+        """return the encoded grid of a channel view
+
+        Args:
+            channel_id (str): the channel id of the game
+            isSpy (bool): True for the spies grid, False for the players grid
+            version (int | None, optional): the board version expected, an image of another version is never returned. Defaults to None : any version.
+
+        Returns:
+            bytes | None: the encoded image or None if it is not stored
+        """
+        state_hash = self.get_hash(channel_id, isSpy, version)
+        if state_hash is None:
+            self.misses += 1
+            return None
+
+        data = self.artifacts.get(state_hash)
+        if data is not None:
+            self.artifacts.move_to_end(state_hash)
+            self.hits += 1
+            return data
+
+        data = self.spilling.get(state_hash)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        if state_hash in self.spilled:
+            try:
+                data = await get_file_io().read_bytes(self.get_spill_path(state_hash))
+            except (OSError, TimeoutError) as e:
+                print(e)
+                self.spilled.discard(state_hash)
+                self.misses += 1
+                return None
+            self.spill_hits += 1
+            # the grid may have been released or read back by another request during the read
+            if state_hash in self.references and state_hash not in self.artifacts:
+                self.artifacts[state_hash] = data
+                self.size_bytes += len(data)
+                await self.spill(self.evict())
+            return data
+
+        self.misses += 1
+        return None
+
+    async def remove(self, channel_id:str):
+        """remove the grids of a channel from memory and from the spill directory
+
+        Args:
+            channel_id (str): the channel id of the game
+        """
+        removed:list[str] = []
+        for isSpy in (False, True):
+            pointer = self.pointers.pop((channel_id, isSpy), None)
+            if pointer is not None:
+                removed.extend(self.release(pointer[1]))
+        await self.remove_spill_files(removed)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "artifacts": len(self.artifacts),
+            "pointers": len(self.pointers),
+            "size_bytes": self.size_bytes,
+            "hits": self.hits,
+            "spill_hits": self.spill_hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "evictions": self.evictions,
+        }
+
+
+ARTIFACT_STORE:ArtifactStore | None = None
+
+def get_artifact_store() -> ArtifactStore:
+    """return the store shared by every game, created from the environment variables on first use
+
+    Returns:
+        ArtifactStore: the shared store
+    """
+    global ARTIFACT_STORE
+    if ARTIFACT_STORE is None:
+        ARTIFACT_STORE = ArtifactStore.from_env()
+    return ARTIFACT_STORE
@@ -0,0 +1,108 @@
+import os
+import time
+from collections import OrderedDict
+
+
+class AttachmentCache(object):
+    def __init__(self, max_entries:int, ttl:float) -> None:
+        """constructor of the AttachmentCache object.
+
+        Keep the discord url of the grids already sent, addressed by the hash of the board state they show :
+        a grid already sent is displayed from its url instead of being uploaded again.
+        The urls of the discord attachments expire : they are only reused during ttl seconds
+
+        Args:
+            max_entries (int): the maximum number of urls kept, the least recently used ones are evicted
+            ttl (float): the number of seconds an url is reused
+        """
+        super(AttachmentCache, self).__init__()
+        self.max_entries:int = max_entries
+        self.ttl:float = ttl
+        # board state hash -> (url, time of the upload)
+        self.urls:OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+        self.hits:int = 0
+        self.misses:int = 0
+        self.expired:int = 0
+        self.evictions:int = 0
+        self.uploads:int = 0
+
+    @classmethod
+    def from_env(cls) -> "AttachmentCache":
+        """create an AttachmentCache configured with the ATTACHMENT_CACHE_SIZE and ATTACHMENT_URL_TTL environment variables
+
+        Returns:
+            AttachmentCache: the cache
+        """
+        max_entries = os.getenv('ATTACHMENT_CACHE_SIZE')
+        ttl = os.getenv('ATTACHMENT_URL_TTL')
+        return cls(
+            max_entries=int(max_entries) if max_entries != None and max_entries.isnumeric() else 10_000,
+            ttl=int(ttl) if ttl != None and ttl.isnumeric() else 3600
+        )
+
+    def get(self, state_hash:str | None) -> str | None:
+        """return the url of a grid already sent
+
+        Args:
+            state_hash (str | None): the hash of the board state shown by the grid, None if the grid is not rendered
+
+        Returns:
+            str | None: the url or None if the grid must be uploaded
+        """
+        if state_hash is None:
+            self.misses += 1
+            return None
+        entry = self.urls.get(state_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+        (url, uploaded_at) = entry
+        if time.monotonic() - uploaded_at > self.ttl:
+            self.urls.pop(state_hash)
+            self.expired += 1
+            self.misses += 1
+            return None
+        self.urls.move_to_end(state_hash)
+        self.hits += 1
+        return url
+
+    def put(self, state_hash:str | None, url:str | None):
+        """store the url of an uploaded grid
+
+        Args:
+            state_hash (str | None): the hash of the board state shown by the grid, nothing is stored if None
+            url (str | None): the url of the discord attachment, nothing is stored if None
+        """
+        self.uploads += 1
+        if state_hash is None or url is None:
+            return
+        self.urls.pop(state_hash, None)
+        self.urls[state_hash] = (url, time.monotonic())
+        while len(self.urls) > self.max_entries:
+            self.urls.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "urls": len(self.urls),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "uploads": self.uploads,
+        }
+
+
+ATTACHMENT_CACHE:AttachmentCache | None = None
+
+def get_attachment_cache() -> AttachmentCache:
+    """return the cache shared by every game, created from the environment variables on first use
+
+    Returns:
+        AttachmentCache: the shared cache
+    """
+    global ATTACHMENT_CACHE
+    if ATTACHMENT_CACHE is None:
+        ATTACHMENT_CACHE = AttachmentCache.from_env()
+    return ATTACHMENT_CACHE
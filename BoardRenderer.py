@@ -0,0 +1,181 @@
+from PIL import Image
+from CardGrid import CardGrid
+from ColorCard import ColorCard
+import grid_generator
+from RenderExecutor import get_render_executor
+from ArtifactStore import get_artifact_store
+from TileCache import TileKey, get_tile_cache
+from CardAssets import THEMES
+import GridEncoder
+from GridEncoder import EncodeResult
+import os
+import asyncio
+import hashlib
+
+
+def get_view_themes() -> dict[bool, str]:
+    """return the theme of each view (key: isSpy) set by the GRID_THEME_PLAYER and GRID_THEME_SPY environment variables
+
+    Returns:
+        dict[bool, str]: the theme of the players and spies views, "default" if not set or unknown
+    """
+    themes:dict[bool, str] = {}
+    for (isSpy, variable) in [(False, 'GRID_THEME_PLAYER'), (True, 'GRID_THEME_SPY')]:
+        theme = os.getenv(variable)
+        themes[isSpy] = theme if theme in THEMES else "default"
+    return themes
+
+
+class BoardRenderer(object):
+    def __init__(self, card_grid:CardGrid, channel_id:str, themes:dict[bool, str] | None = None, encoder:str | None = None) -> None:
+        """constructor of the BoardRenderer object.
+
+        Keep the last rendered grid of each view to only redraw the cards that changed since the previous render
+
+        Args:
+            card_grid (CardGrid): the grid to render
+            channel_id (str): the channel id of the game, used as key in the artifact store
+            themes (dict[bool, str] | None, optional): the theme of each view (key: isSpy). Defaults to the GRID_THEME_PLAYER and GRID_THEME_SPY environment variables.
+            encoder (str | None, optional): the name of the encoder in GridEncoder.ENCODERS. Defaults to the GRID_ENCODER environment variable.
+        """
+        super(BoardRenderer, self).__init__()
+        self.card_grid:CardGrid = card_grid
+        self.channel_id:str = channel_id
+        self.themes:dict[bool, str] = themes if themes is not None else get_view_themes()
+        self.encoder:str = encoder if encoder is not None else GridEncoder.get_encoder_name()
+
+        # last composed canvas of each view (key: isSpy)
+        self.canvases:dict[bool, Image.Image] = {}
+        # visible state of each card on the canvas of each view (key: isSpy)
+        self.tile_states:dict[bool, list[tuple[ColorCard, bool] | None]] = {}
+
+    def visible_state(self, index:int, isSpy:bool) -> tuple[ColorCard, bool]:
+        """return what a card looks like in a view, two cards with the same visible state have the same overlays
+
+        Args:
+            index (int): the index of the card in the grid
+            isSpy (bool): True for the spies view, False for the players view
+
+        Returns:
+            tuple[ColorCard, bool]: the color displayed and the guessed state of the card
+        """
+        guessed = self.card_grid.is_guessed(index)
+        # unguessed cards all look white for the players
+        if not isSpy and not guessed:
+            return (ColorCard.WHITE, False)
+        return (self.card_grid.get_color(index), guessed)
+
+    def dirty_tiles(self, isSpy:bool) -> list[int]:
+        """return the index of the cards that changed since the last render of the view
+
+        Args:
+            isSpy (bool): True for the spies view, False for the players view
+
+        Returns:
+            list[int]: the indexes of the cards to redraw
+        """
+        states = self.tile_states.get(isSpy)
+        nb_cards = self.card_grid.grid_size**2
+        if states is None:
+            return list(range(nb_cards))
+        return [index for index in range(nb_cards) if states[index] != self.visible_state(index, isSpy)]
+
+    def state_hash(self, isSpy:bool) -> str:
+        """return the hash of what a view shows : two views with the same hash have the same image
+
+        Args:
+            isSpy (bool): True for the spies view, False for the players view
+
+        Returns:
+            str: the hash of the theme, the encoder and the word, visible color and guessed state of each card
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.themes[isSpy]}|{self.encoder}|{self.card_grid.grid_size}".encode())
+        for index in range(self.card_grid.grid_size**2):
+            (color, guessed) = self.visible_state(index, isSpy)
+            word = self.card_grid.get_word(index)
+            digest.update(f"|{word}|{color.value}|{int(guessed)}".encode())
+        return digest.hexdigest()
+
+    async def render(self, isSpy:bool) -> bytes:
+        """update and encode the canvas of a single view, see render_views
+
+        Args:
+            isSpy (bool): True for the spies view, False for the players view
+
+        Raises:
+            TimeoutError: if the render executor took too long
+            BrokenProcessPool: if the render process crashed
+
+        Returns:
+            bytes: the encoded grid
+        """
+        return (await self.render_views([isSpy]))[isSpy]
+
+    async def render_views(self, views:list[bool]=[False, True], version:int=0) -> dict[bool, bytes]:
+        """update the canvas of several views by redrawing only the changed cards, then store the encoded grids in the artifact store.
+
+        The text of a card is drawn once for every view, the cards are drawn and the grids are encoded by the render executor
+
+        Args:
+            views (list[bool], optional): the views to render (isSpy). Defaults to both views.
+            version (int, optional): the board version, stored with the encoded grids. Defaults to 0.
+
+        Raises:
+            TimeoutError: if the render executor took too long
+            BrokenProcessPool: if the render process crashed
+
+        Returns:
+            dict[bool, bytes]: the encoded grid of each view
+        """
+        grid_size = self.card_grid.grid_size
+        tile_cache = get_tile_cache()
+        # the board is read before the first await : the hashes are the ones of the drawn state
+        state_hashes = {isSpy: self.state_hash(isSpy) for isSpy in views}
+
+        # cards to paste in each view : (view, index, key, tile)
+        pastes:list[tuple[bool, int, TileKey, Image.Image | None]] = []
+        # cards missing from the tile cache, grouped by shared text layer : (word, card_id, theme) -> visible states
+        missing:dict[tuple[str, int, str], list[tuple[ColorCard, bool]]] = {}
+        for isSpy in views:
+            if isSpy not in self.canvases:
+                self.canvases[isSpy] = grid_generator.newCanvas(grid_size, self.themes[isSpy])
+                self.tile_states[isSpy] = [None] * grid_size**2
+
+            for index in self.dirty_tiles(isSpy):
+                (color, guessed) = self.visible_state(index, isSpy)
+                word = self.card_grid.get_word(index)
+                # the visible state already tells the views apart : a guessed card has the same tile in both views
+                key:TileKey = (word, index+1, self.themes[isSpy], color, guessed)
+                tile = tile_cache.get(key)
+                pastes.append((isSpy, index, key, tile))
+                if tile is None:
+                    states = missing.setdefault((word, index+1, self.themes[isSpy]), [])
+                    if (color, guessed) not in states:
+                        states.append((color, guessed))
+
+        # only the cards missing from the tile cache are drawn by the render executor, in a single job
+        executor = get_render_executor()
+        specs = [(word, card_id, states, theme) for ((word, card_id, theme), states) in missing.items()]
+        rendered:list[list[Image.Image]] = await executor.run(grid_generator.generateTiles, specs) if len(specs) > 0 else []
+        drawn:dict[TileKey, Image.Image] = {}
+        for ((word, card_id, states, theme), tiles) in zip(specs, rendered):
+            for ((color, guessed), tile) in zip(states, tiles):
+                drawn[(word, card_id, theme, color, guessed)] = tile
+
+        for (isSpy, index, key, tile) in pastes:
+            if tile is None:
+                tile = drawn[key]
+                tile_cache.put(key, tile)
+            # the tile is pasted without mask : it fully replaces the previous card
+            (_, _, theme, color, guessed) = key
+            self.canvases[isSpy].paste(tile, grid_generator.getTilePosition(index, grid_size, theme))
+            self.tile_states[isSpy][index] = (color, guessed)
+
+        results:list[EncodeResult] = await asyncio.gather(*[executor.run(GridEncoder.encode, self.canvases[isSpy], self.encoder) for isSpy in views])
+        encoded:dict[bool, bytes] = {}
+        for (isSpy, result) in zip(views, results):
+            GridEncoder.ENCODER_STATS.add(result)
+            await get_artifact_store().put(self.channel_id, isSpy, result.data, version, state_hashes[isSpy])
+            encoded[isSpy] = result.data
+        return encoded
@@ -1,17 +1,37 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from ColorCard import ColorCard
+if TYPE_CHECKING:
+    from CardGrid import CardGrid
 
 class Card(object):
-    def __init__(self, word:str, color:ColorCard) -> None:
-        super(Card, self).__init__()
-        
-        self.word: str = word
-        self.guessed:bool = False
-        self.color:ColorCard = color
+    # a view on a card of a grid : the state is stored by the grid
+    __slots__ = ("card_grid", "index")
+
+    def __init__(self, card_grid:CardGrid, index:int) -> None:
+        self.card_grid:CardGrid = card_grid
+        self.index:int = index
+
+    @property
+    def word(self) -> str:
+        return self.card_grid.get_word(self.index)
+
+    @property
+    def color(self) -> ColorCard:
+        return self.card_grid.get_color(self.index)
+
+    @property
+    def guessed(self) -> bool:
+        return self.card_grid.is_guessed(self.index)
+
+    def __eq__(self, other:object) -> bool:
+        return isinstance(other, Card) and self.card_grid is other.card_grid and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.card_grid), self.index))
 
     def __str__(self) -> str:
         return f"{self.word}, {self.color.value}, {self.guessed}"
-    
+
     def __repr__(self) -> str:
         return f"{{{self.word}, {self.color.value}, {self.guessed}}}"
-        
-        
\ No newline at end of file
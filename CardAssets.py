@@ -0,0 +1,121 @@
+from types import MappingProxyType
+from PIL import Image, ImageFont
+from ColorCard import ColorCard
+
+# Font used
+FONT = 'font/KeepCalm.ttf'
+FONT_SIZE = 75
+
+IMAGES_DIR = 'images'
+
+# padding around cards, at the size of the images
+PADDING = 10
+
+# scale of the rendered grids compared to the size of the images
+THEMES:dict[str, float] = {
+    "default": 0.5,
+    "mobile": 0.3,
+}
+
+# mode of every card layer, the cards are composed in this mode
+COMPOSITING_MODE = 'RGBA'
+
+
+class CardAssets(object):
+    def __init__(self, scale:float=1, images_dir:str=IMAGES_DIR, font_path:str=FONT, font_size:int=FONT_SIZE) -> None:
+        """constructor of the CardAssets object.
+
+        Decode the base card, the color and guess overlays and the font once, already scaled to the output size.
+        The images are shared by every render : they must be copied before being drawn on
+
+        Args:
+            scale (float, optional): the scale of the cards compared to the size of the images. Defaults to 1.
+            images_dir (str, optional): the directory of the card images. Defaults to IMAGES_DIR.
+            font_path (str, optional): the path of the font file. Defaults to FONT.
+            font_size (int, optional): the size of the font at scale 1. Defaults to FONT_SIZE.
+
+        Raises:
+            FileNotFoundError: if an image or the font is missing
+            ValueError: if an overlay does not have the size of the base card
+        """
+        super(CardAssets, self).__init__()
+        self.scale:float = scale
+        self.base:Image.Image = self.load(f"{images_dir}/BASE.png")
+
+        # white base is equal to BASE.png so there is no white overlay
+        self.overlays:MappingProxyType[ColorCard, Image.Image] = MappingProxyType({
+            color: self.load(f"{images_dir}/{color.value}.png") for color in ColorCard if color != ColorCard.WHITE
+        })
+        # black does not exist because when it is guessed the party is finished
+        self.guess_overlays:MappingProxyType[ColorCard, Image.Image] = MappingProxyType({
+            color: self.load(f"{images_dir}/{color.value}_GUESS.png") for color in ColorCard if color != ColorCard.BLACK
+        })
+
+        self.font:ImageFont.FreeTypeFont = ImageFont.truetype(font_path, round(font_size * scale))
+        self.padding:int = round(PADDING * scale)
+
+        layers = [(color.value, image) for (color, image) in self.overlays.items()]
+        layers += [(f"{color.value}_GUESS", image) for (color, image) in self.guess_overlays.items()]
+        for (name, image) in layers:
+            if image.size != self.base.size:
+                raise ValueError(f"{name}.png is {image.size}, expected the size of the base card {self.base.size}")
+
+    def load(self, path:str) -> Image.Image:
+        """decode an image, convert it to the compositing mode and scale it
+
+        Args:
+            path (str): the path of the image
+
+        Returns:
+            Image.Image: the decoded image
+        """
+        with Image.open(path) as image:
+            converted = image.convert(COMPOSITING_MODE)
+        if self.scale == 1:
+            return converted
+        # an integer reduction averages the pixels like a reduction of the whole grid
+        factor = 1 / self.scale
+        if factor.is_integer() and converted.width % factor == 0 and converted.height % factor == 0:
+            return converted.reduce(int(factor))
+        return converted.resize((round(converted.width * self.scale), round(converted.height * self.scale)), Image.Resampling.LANCZOS)
+
+    @property
+    def card_width(self) -> int:
+        return self.base.width
+
+    @property
+    def card_height(self) -> int:
+        return self.base.height
+
+    def scaled(self, value:float) -> float:
+        """scale a coordinate given at the size of the images"""
+        return value * self.scale
+
+    def images(self) -> list[Image.Image]:
+        return [self.base, *self.overlays.values(), *self.guess_overlays.values()]
+
+    def memory_usage(self) -> int:
+        """return the number of bytes used by the decoded images
+
+        Returns:
+            int: the size of the pixels of every image
+        """
+        return sum(image.width * image.height * len(image.getbands()) for image in self.images())
+
+
+CARD_ASSETS:dict[str, CardAssets] = {}
+
+def get_card_assets(theme:str="default") -> CardAssets:
+    """return the assets of a theme for the current process, decoded on first use
+
+    Args:
+        theme (str, optional): the name of the theme in THEMES. Defaults to "default".
+
+    Returns:
+        CardAssets: the shared assets
+    """
+    assets = CARD_ASSETS.get(theme)
+    if assets is None:
+        assets = CardAssets(scale=THEMES[theme])
+        CARD_ASSETS[theme] = assets
+    return assets
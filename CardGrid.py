@@ -2,21 +2,47 @@ from ColorCard import ColorCard
 from Language import Language
 from Card import Card
 import random
+import sys
+from array import array
 from CodeGameExceptions import WrongCardIdNumberGiven, WordNotInGrid, WordListFileNotFound, NotEnoughWordsInFile
-from word_list import read_list_file
+from WordPool import WordPool, get_word_pool_index
+from RecentWords import get_recent_words
+import unidecode
 GRID_SIZE = 5
+# the code of each color in the color array of a grid
+COLORS:list[ColorCard] = list(ColorCard)
+COLOR_CODES:dict[ColorCard, int] = {color: code for (code, color) in enumerate(COLORS)}
+
+def normalize_word(word:str) -> str:
+    """return a word proposed by a user as it is written in the grid : without special characters, in upper case and only its first word
+
+    Args:
+        word (str): the word or sentence given
+
+    Returns:
+        str: the normalized word
+    """
+    return unidecode.unidecode(word).upper().split(" ")[0]
 
 class CardGrid(object):
     
-    def __init__(self, language:Language, starting_team_color:ColorCard, team_list:list[ColorCard], default_word_list:bool=True, guild_id_for_list:str | None = None) -> None:
+    def __init__(self, language:Language, starting_team_color:ColorCard, team_list:list[ColorCard], default_word_list:bool=True, guild_id_for_list:str | None = None, channel_id:str | None = None, guild_id:str | None = None, rng:random.Random | None = None) -> None:
         """constructor of the CardGrid object
 
+        The words and the colors are drawn with rng : the same seed and the same word pool give the same grid,
+        as long as the recent words of the channel and the guild are the same.
+        The grid is stored as the index of each word in its pool, a byte per color, a bitmask of the guessed cards
+        and a bitmask of the unguessed cards of each color, the Card objects are views created on demand
+
         Args:
             language (Language): the langage of the grid
             starting_team_color (ColorCard): the color of the team that starts
             team_list (list[ColorCard]): the list of color team present in the grid
             default_word_list (bool): True : the default word list of the language will be used. False : not
             guild_id_for_list (str): the guild_id of the guild. If mentionned the guild_word_list will be added, if it's None it will not. Default to: None
+            channel_id (str | None): the channel of the game, the words of its last games are avoided. Default to: None
+            guild_id (str | None): the guild of the game, the words of its last games are avoided. Default to: None
+            rng (random.Random | None): the random generator of the grid. Default to: a generator with a random seed
 
         Raises:
             WordListFileNotFound: if the word file of the guild_id is not found
@@ -25,96 +51,160 @@ class CardGrid(object):
         super(CardGrid, self).__init__()
         
         self.grid_size = 3 + len(team_list)
+        rng = rng or random.Random()
 
-        words:list[str] = []
-
-        if default_word_list:
-            words.extend(read_list_file(path=f"words/{language.value}_word_list.txt"))
+        try:
+            pool:WordPool = get_word_pool_index().get_pool(language, default_word_list, guild_id_for_list)
+        except Exception as e:
+            print(e)
+            raise WordListFileNotFound(language=language)
 
-        if guild_id_for_list != None:
-            try:
-                    words_to_add = read_list_file(path=f"words/servers/{guild_id_for_list}_word_list.txt")
-                    words.extend(words_to_add)
-            except Exception as e:
-                print(e)
-                raise WordListFileNotFound(language=language)
-
-        words = list(dict.fromkeys(words)) # remove duplicates
-        if len(words) < self.grid_size**2:
+        if len(pool) < self.grid_size**2:
             raise NotEnoughWordsInFile(language=language)
+        # the grid keeps its pool, even if the pool of its word lists is rebuilt
+        self.pool:WordPool = pool
+        # the content hash of the words the grid is drawn from
+        self.pool_version:str = pool.version
 
-        word_list:list[str] = random.sample(words, self.grid_size**2)
-        
-        self.card_list:list[list[Card]] = [[Card(word_list[i*self.grid_size+j], ColorCard.WHITE) for j in range(self.grid_size)] for i in range(self.grid_size)]
+        # avoid the words of the last games of the channel and of the guild
+        scopes = ([f"channel:{channel_id}"] if channel_id != None else []) + ([f"guild:{guild_id}"] if guild_id != None else [])
+        if len(scopes) > 0:
+            word_ids:list[int] = get_recent_words().sample_indexes(pool, (language, default_word_list, guild_id_for_list), self.grid_size**2, scopes, rng)
+        else:
+            word_ids = pool.sample_indexes(self.grid_size**2, rng)
+
+        # index in the pool of the word of each card, row by row
+        self.word_ids:array = array('I', word_ids)
+        # code in COLORS of the color of each card
+        self.colors:bytearray = bytearray(self.grid_size**2)
+        # bit i is set when the card i is guessed
+        self.guessed:int = 0
+        # bit i of the mask of a color code is set while the card i of this color is not guessed
+        self.unguessed:list[int] = [0] * len(COLORS)
+        # word -> index of its card, the words of a grid are unique. Built on the first lookup and shared by the clones
+        self.positions:dict[str, int] | None = None
         self.language: Language = language
         self.starting_team_color:ColorCard = starting_team_color
 
-
-        self.remaining_words_count:dict[ColorCard,int] = {}
         # color randomly the grid
-        self.color_all_grid(team_list=team_list)
+        self.color_all_grid(team_list=team_list, rng=rng)
         
     
-    def color_all_grid(self, team_list:list[ColorCard]):
-        """color all the grid depending on the teams given in parameters
+    def color_all_grid(self, team_list:list[ColorCard], rng:random.Random):
+        """color all the grid depending on the teams given in parameters, with a single shuffle of the colors
 
         Args:
             team_list (list[ColorCard]): the list of teams color
+            rng (random.Random): the random generator of the grid
         """
         nb_teams = len(team_list)
         nb_words = 6 + nb_teams
+        counts:dict[ColorCard, int] = {}
         for color_team in team_list:
-            self.color_grid(color=color_team, number=nb_words if color_team != self.starting_team_color else nb_words+1)
-            
-        self.color_grid(color=ColorCard.BLACK, number=1)
-        
+            counts[color_team] = nb_words if color_team != self.starting_team_color else nb_words+1
+        counts[ColorCard.BLACK] = 1
         # grid_size**2 = number total of card, nb_words*nb_teams = nb colored card in the grid (+1 for starting team, +1 for black card)
-        self.remaining_words_count[ColorCard.WHITE] = self.grid_size**2 - ((nb_words*nb_teams)+2)
+        counts[ColorCard.WHITE] = self.grid_size**2 - ((nb_words*nb_teams)+2)
+
+        colors = bytearray()
+        for (color, number) in counts.items():
+            colors.extend(bytes([COLOR_CODES[color]]) * number)
+        rng.shuffle(colors)
+        self.colors = colors
+        self.guessed = 0
+        self.unguessed = self.color_masks(colors)
+
+    @staticmethod
+    def color_masks(colors:bytearray) -> list[int]:
+        """return the bitmask of the cards of each color code"""
+        masks = [0] * len(COLORS)
+        for (index, code) in enumerate(colors):
+            masks[code] |= 1 << index
+        return masks
+
+    def get_word(self, index:int) -> str:
+        return self.pool[self.word_ids[index]]
 
-    def color_grid(self, color:ColorCard, number:int):
-        """Color a number of cards of the grid with the same color. 
+    def get_color(self, index:int) -> ColorCard:
+        return COLORS[self.colors[index]]
 
-        The number and the color are passed in parameter
+    def is_guessed(self, index:int) -> bool:
+        return self.guessed >> index & 1 == 1
+
+    def get_card(self, index:int) -> Card:
+        """return a view on the card at an index of the grid
 
         Args:
-            grid (list[list[Card]]): The grid of Card
-            color (ColorCard): The color chosen to color the cards
-            number (int): The number of cards that will be colored
+            index (int): the index of the card, from 0 to grid_size**2-1 row by row
+
+        Returns:
+            Card: the card
         """
-        # set number of word remaining for each card color
-        self.remaining_words_count[color] = number
-        for _ in range(number):
-            x = random.randint(0, self.grid_size-1)
-            y = random.randint(0, self.grid_size-1)
-
-            while self.card_list[x][y].color != ColorCard.WHITE:
-                x = random.randint(0, self.grid_size-1)
-                y = random.randint(0, self.grid_size-1)
-            # exit : grid[x][y].color == ColorCard.WHITE
-            self.card_list[x][y].color = color
+        return Card(self, index)
+
+    def cards(self) -> list[Card]:
+        """return a view on every card of the grid, row by row
+
+        Returns:
+            list[Card]: the cards
+        """
+        return [Card(self, index) for index in range(self.grid_size**2)]
+
+    def index_of(self, word:str) -> int | None:
+        """return the index of the unguessed card of a word, found in the positions of the words of the grid
+
+        Args:
+            word (str): a single normalized word, see normalize_word
+
+        Returns:
+            int | None: the index of the card, None if the word is not present in the grid or already guessed
+        """
+        if self.positions is None:
+            self.positions = {self.get_word(index): index for index in range(len(self.word_ids))}
+        index = self.positions.get(word)
+        return index if index is not None and not self.is_guessed(index) else None
 
     def get_card_by_word(self, word:str) -> Card | None:
-        """return the card associate with the word
+        """return the unguessed card associate with the word
 
         Args:
-            word (str): a single word
+            word (str): a single normalized word, see normalize_word
 
         Returns:
-            Card | None: the Card or None if the word is not present in the grid
+            Card | None: the Card or None if the word is not present in the grid or already guessed
         """
-        i = 0
-        j = 0
-        k = 0
-        while(k < self.grid_size**2 and (self.card_list[i][j].guessed or self.card_list[i][j].word != word)):
-            k += 1
-            j = k%self.grid_size
-            i = k//self.grid_size
-        # exit : k >= GRID_SIZE**2 or (not self.card_list[i][j].guessed and self.card_list[i][j].word == word)
-
-        if k < self.grid_size**2:
-            return self.card_list[i][j]
-        return None
-    
+        index = self.index_of(word)
+        return Card(self, index) if index is not None else None
+
+    def remaining_count(self, color:ColorCard) -> int:
+        """return the number of unguessed cards of a color
+
+        Args:
+            color (ColorCard): the color of the cards
+
+        Returns:
+            int: the number of cards
+        """
+        return self.unguessed[COLOR_CODES[color]].bit_count()
+
+    def remaining_cards(self, color:ColorCard) -> list[Card]:
+        """return the unguessed cards of a color
+
+        Args:
+            color (ColorCard): the color of the cards
+
+        Returns:
+            list[Card]: the cards, in the order of the grid
+        """
+        cards:list[Card] = []
+        mask = self.unguessed[COLOR_CODES[color]]
+        while mask:
+            # the lowest set bit
+            index = (mask & -mask).bit_length() - 1
+            cards.append(Card(self, index))
+            mask &= mask - 1
+        return cards
+
     def is_in_grid(self, word:str) -> bool:
         """return if the word is in the grid
 
@@ -124,7 +214,7 @@ class CardGrid(object):
         Returns:
             bool: True if the word is in the grid, else False
         """
-        return not self.get_card_by_word(word) == None
+        return self.index_of(word) != None
 
     def guess(self, word:str) -> tuple[ColorCard, str]:
         """set a card associate to a word to guessed if the word is in the grid
@@ -138,15 +228,66 @@ class CardGrid(object):
         Returns:
             ColorCard: the color of the guessed card
         """
-        card = self.get_card_by_word(word)
-        if card == None :
+        index = self.index_of(word)
+        if index == None :
             raise WordNotInGrid(self.language)
         
-        card.guessed = True
-        self.remaining_words_count[card.color] -= 1
-        return (card.color, card.word)
+        self.guessed |= 1 << index
+        self.unguessed[self.colors[index]] &= ~(1 << index)
+        return (self.get_color(index), self.get_word(index))
+
+    def clone(self) -> "CardGrid":
+        """return a copy of the grid, the word and color arrays and the positions are never modified and are shared
+
+        Returns:
+            CardGrid: the copy
+        """
+        card_grid = CardGrid.__new__(CardGrid)
+        card_grid.__dict__.update(self.__dict__)
+        card_grid.unguessed = list(self.unguessed)
+        return card_grid
+
+    def snapshot(self) -> dict:
+        """return the state of the grid with the words instead of their index : the pools are not the same after a restart
+
+        Returns:
+            dict: the words, the color codes in hexadecimal, the guessed bitmask and the starting team
+        """
+        return {
+            "words": [self.get_word(index) for index in range(len(self.word_ids))],
+            "colors": self.colors.hex(),
+            "guessed": self.guessed,
+            "starting_team": self.starting_team_color.value,
+            "pool_version": self.pool_version,
+        }
 
+    @classmethod
+    def from_snapshot(cls, snapshot:dict, language:Language) -> "CardGrid":
+        """create the grid of a snapshot, its pool is made of the words of the grid
 
+        Args:
+            snapshot (dict): the snapshot returned by CardGrid.snapshot
+            language (Language): the language of the grid
+
+        Returns:
+            CardGrid: the grid
+        """
+        card_grid = CardGrid.__new__(CardGrid)
+        words:tuple[str, ...] = tuple(snapshot["words"])
+        card_grid.grid_size = int(len(words) ** 0.5)
+        card_grid.pool = WordPool((words,))
+        card_grid.pool_version = snapshot["pool_version"]
+        card_grid.word_ids = array('I', range(len(words)))
+        card_grid.colors = bytearray.fromhex(snapshot["colors"])
+        card_grid.guessed = snapshot["guessed"]
+        card_grid.unguessed = [mask & ~card_grid.guessed for mask in CardGrid.color_masks(card_grid.colors)]
+        card_grid.positions = None
+        card_grid.language = language
+        card_grid.starting_team_color = ColorCard(snapshot["starting_team"])
+        return card_grid
+
+    def memory_usage(self) -> int:
+        return sys.getsizeof(self.word_ids) + sys.getsizeof(self.colors) + sys.getsizeof(self.guessed) + sys.getsizeof(self.unguessed) + sum(sys.getsizeof(mask) for mask in self.unguessed)
     
     def get_word_by_number(self, card_id:int) -> str:
         """get the associated word with a number given
@@ -162,8 +303,79 @@ class CardGrid(object):
         """
         if(card_id < 1 or card_id > 25):
             raise WrongCardIdNumberGiven(self.language, self.grid_size)
-        
-        i = (card_id-1)//self.grid_size
-        j = (card_id-1)%self.grid_size
 
-        return self.card_list[i][j].word
+        return self.get_word(card_id-1)
+
+
+if __name__ == "__main__":
+    import copy
+    import timeit
+    import tracemalloc
+
+    class ObjectCard(object):
+        # a card of the grid stored as objects
+        def __init__(self, word:str, color:ColorCard) -> None:
+            self.word:str = word
+            self.color:ColorCard = color
+            self.guessed:bool = False
+
+    def object_grid(card_grid:CardGrid) -> tuple:
+        # the grid as a list of card objects with the word and color indexes
+        card_list = [[ObjectCard(card_grid.get_word(i*card_grid.grid_size+j), card_grid.get_color(i*card_grid.grid_size+j)) for j in range(card_grid.grid_size)] for i in range(card_grid.grid_size)]
+        positions = {card.word: (i, j) for (i, row) in enumerate(card_list) for (j, card) in enumerate(row)}
+        remaining_by_color:dict[ColorCard, set[str]] = {}
+        for row in card_list:
+            for card in row:
+                remaining_by_color.setdefault(card.color, set()).add(card.word)
+        return (card_list, positions, set(positions), remaining_by_color, {color: len(words) for (color, words) in remaining_by_color.items()})
+
+    def linear_scan(card_grid:CardGrid, word:str) -> Card | None:
+        # the lookup before the index
+        for card in card_grid.cards():
+            if not card.guessed and card.word == word:
+                return card
+        return None
+
+    def rejection_coloring(card_grid:CardGrid, team_list:list[ColorCard]):
+        # the coloring before the shuffle : redraw a random card until it is white
+        colors = [ColorCard.WHITE] * card_grid.grid_size**2
+        for (color, number) in [(color, 6 + len(team_list) + (color == team_list[0])) for color in team_list] + [(ColorCard.BLACK, 1)]:
+            for _ in range(number):
+                index = random.randint(0, card_grid.grid_size**2-1)
+                while colors[index] != ColorCard.WHITE:
+                    index = random.randint(0, card_grid.grid_size**2-1)
+                colors[index] = color
+
+    teams = [ColorCard.RED, ColorCard.BLUE, ColorCard.GREEN, ColorCard.YELLOW]
+    for nb_teams in (2, 3, 4):
+        card_grid = CardGrid(Language.EN, teams[0], teams[:nb_teams], rng=random.Random(0))
+        rng = random.Random(0)
+        shuffle = timeit.timeit(lambda: card_grid.color_all_grid(teams[:nb_teams], rng), number=10_000) * 100
+        rejection = timeit.timeit(lambda: rejection_coloring(card_grid, teams[:nb_teams]), number=10_000) * 100
+        grids = timeit.timeit(lambda: CardGrid(Language.EN, teams[0], teams[:nb_teams], rng=random.Random(0)), number=1_000) * 1_000
+        print(f"{nb_teams} teams: coloring shuffle {shuffle:.1f}us, rejection {rejection:.1f}us, seeded grid {grids:.1f}us")
+
+    for nb_teams in (2, 3, 4):
+        card_grid = CardGrid(Language.EN, teams[0], teams[:nb_teams])
+        last_word = card_grid.get_word(card_grid.grid_size**2 - 1)
+        print(f"{card_grid.grid_size}x{card_grid.grid_size}:")
+        for (name, word) in (("last card", last_word), ("missing word", "NOT-IN-GRID")):
+            scan = timeit.timeit(lambda: linear_scan(card_grid, word), number=100_000) * 10
+            index = timeit.timeit(lambda: card_grid.get_card_by_word(word), number=100_000) * 10
+            print(f"    {name:<12}: scan {scan:.2f}us, index {index:.2f}us")
+        remaining = timeit.timeit(lambda: card_grid.remaining_cards(teams[0]), number=100_000) * 10
+        print(f"    remaining_cards: {remaining:.2f}us")
+
+        # memory of 1000 grids and cost of a copy, compact against objects
+        tracemalloc.start()
+        grids = [card_grid.clone() for _ in range(1000)]
+        compact_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        objects = [object_grid(card_grid) for _ in range(1000)]
+        objects_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        clone = timeit.timeit(lambda: card_grid.clone(), number=10_000) * 100
+        deepcopy = timeit.timeit(lambda: copy.deepcopy(objects[0]), number=1_000) * 1_000
+        print(f"    per grid: compact {compact_memory/1000:.0f}B, objects {objects_memory/1000:.0f}B")
+        print(f"    copy: clone {clone:.2f}us, deepcopy of the objects {deepcopy:.2f}us")
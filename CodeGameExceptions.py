@@ -174,4 +174,24 @@ class NotEnoughWordsInFile(CodeNamesException):
                 message = "Il n'y a pas assez de mot dans le fichier de votre serveur pour commencer la partie. Utilisez `/upload` avec un fichier `.txt` pour envoyer un nouveau fichier de mots"
             case _:
                 message = "No word file found. Use `/upload` with a `.txt` file to upload a new file with more custom words"
-        super().__init__(language, message)
\ No newline at end of file
+        super().__init__(language, message)
+
+class RenderFailed(CodeNamesException):
+    "Raised when the grid images could not be rendered in time"
+    def __init__(self, language:Language):
+        match language:
+            case Language.FR:
+                message = "L'image de la grille n'a pas pu être générée"
+            case _:
+                message = "The grid image could not be generated"
+        super().__init__(language, message)
+
+class GameBusy(CodeNamesException):
+    "Raised when a game receives more commands than it can queue"
+    def __init__(self, language:Language):
+        match language:
+            case Language.FR:
+                message = "La partie reçoit trop de commandes, réessayez dans un instant"
+            case _:
+                message = "The game is receiving too many commands, try again in a moment"
+        super().__init__(language, message)
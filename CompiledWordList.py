@@ -0,0 +1,158 @@
+import os
+import mmap
+import glob
+import struct
+from typing import Iterator, Sequence
+from word_list import read_weighted_list_file
+
+# header : magic, format version, flags, number of words
+MAGIC = b"CNWL"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHHI")
+# the weight table follows the offset table
+FLAG_WEIGHTS = 1
+# offset of each word in the blob, the last one is the end of the blob
+OFFSET = struct.Struct("<I")
+WEIGHT = struct.Struct("<f")
+EXTENSION = ".wl"
+
+
+def get_compiled_path(path:str) -> str:
+    """return the path of the compiled word list of a text word list
+
+    Args:
+        path (str): the path of the text file
+
+    Returns:
+        str: the path of the compiled file, next to the text file
+    """
+    return os.path.splitext(path)[0] + EXTENSION
+
+
+class CompiledWordList(object):
+    def __init__(self, path:str) -> None:
+        """constructor of the CompiledWordList object.
+
+        Read a compiled word list through mmap : the processes opening the same file share its pages
+        and a word is only decoded when it is accessed.
+        The file is : the header, the offset table, the weight table if the words have weights, then the normalized UTF-8 words
+
+        Args:
+            path (str): the path of the compiled file
+
+        Raises:
+            FileNotFoundError: if the file does not exist
+            ValueError: if the file is not a compiled word list of this format version
+        """
+        super(CompiledWordList, self).__init__()
+        self.path:str = path
+        with open(path, "rb") as f:
+            self.mmap:mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mmap) < HEADER.size:
+            raise ValueError(f"{path}: not a compiled word list")
+        (magic, version, flags, count) = HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path}: compiled word list version {version} expected {FORMAT_VERSION}")
+        self.count:int = count
+        weights_start = HEADER.size + (count+1) * OFFSET.size
+        self.blob_start:int = weights_start + (count * WEIGHT.size if flags & FLAG_WEIGHTS else 0)
+        if len(self.mmap) < self.blob_start:
+            raise ValueError(f"{path}: truncated compiled word list")
+        # the weights are read in the mapped file
+        self.weights:Sequence[float] | None = None
+        if flags & FLAG_WEIGHTS:
+            self.weights = memoryview(self.mmap)[weights_start:self.blob_start].cast("f")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index:int) -> str:
+        if index < 0:
+            index += self.count
+        if index < 0 or index >= self.count:
+            raise IndexError("word index out of range")
+        (start, end) = struct.unpack_from("<II", self.mmap, HEADER.size + index * OFFSET.size)
+        return self.mmap[self.blob_start+start:self.blob_start+end].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self.count):
+            yield self[index]
+
+    def close(self):
+        if isinstance(self.weights, memoryview):
+            self.weights.release()
+        self.mmap.close()
+
+
+def compile_words(words:Sequence[str], target_path:str, weights:Sequence[float] | None = None):
+    """write a compiled word list, the file is replaced atomically
+
+    Args:
+        words (Sequence[str]): the normalized words, without duplicates
+        target_path (str): the path of the compiled file
+        weights (Sequence[float] | None, optional): the weight of each word. Defaults to None : no weight.
+    """
+    encoded = [word.encode("utf-8") for word in words]
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+
+    tmp_path = f"{target_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_WEIGHTS if weights is not None else 0, len(encoded)))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        if weights is not None:
+            f.write(struct.pack(f"<{len(weights)}f", *weights))
+        f.write(b"".join(encoded))
+    # the processes reading the previous file keep their mapping
+    os.replace(tmp_path, target_path)
+
+def deduplicate(words:list[str], weights:list[float] | None) -> tuple[tuple[str, ...], tuple[float, ...] | None]:
+    """remove the duplicated words of a list, the first weight of a word is kept
+
+    Args:
+        words (list[str]): the words
+        weights (list[float] | None): the weight of each word, None if no weight
+
+    Returns:
+        tuple[tuple[str, ...], tuple[float, ...] | None]: the words and their weight
+    """
+    if weights is None:
+        return (tuple(dict.fromkeys(words)), None)
+    first_weights:dict[str, float] = {}
+    for (word, weight) in zip(words, weights):
+        first_weights.setdefault(word, weight)
+    return (tuple(first_weights.keys()), tuple(first_weights.values()))
+
+def compile_list_file(path:str) -> str:
+    """compile a text word list next to it
+
+    Args:
+        path (str): the path of the text file
+
+    Returns:
+        str: the path of the compiled file
+    """
+    target_path = get_compiled_path(path)
+    (words, weights) = deduplicate(*read_weighted_list_file(path))
+    compile_words(words, target_path, weights)
+    return target_path
+
+def compile_all(words_dir:str="words") -> list[str]:
+    """compile the default and guild word lists
+
+    Args:
+        words_dir (str, optional): the directory of the word lists. Defaults to "words".
+
+    Returns:
+        list[str]: the paths of the compiled files
+    """
+    paths = glob.glob(os.path.join(words_dir, "*.txt")) + glob.glob(os.path.join(words_dir, "servers", "*.txt"))
+    return [compile_list_file(path) for path in sorted(paths)]
+
+
+if __name__ == "__main__":
+    # build the compiled word lists : python CompiledWordList.py [words directory]
+    import sys
+    for compiled_path in compile_all(*sys.argv[1:2]):
+        print(f"{compiled_path}: {len(CompiledWordList(compiled_path))} words")
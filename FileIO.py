@@ -0,0 +1,165 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class OperationStats(object):
+    def __init__(self) -> None:
+        """constructor of the OperationStats object, the totals of an operation of the FileIO
+        """
+        super(OperationStats, self).__init__()
+        self.count:int = 0
+        self.errors:int = 0
+        self.timeouts:int = 0
+        self.total_duration:float = 0
+        self.max_duration:float = 0
+
+    def add(self, duration:float):
+        self.count += 1
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+
+    def report(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "average_ms": self.total_duration * 1000 / self.count if self.count > 0 else 0,
+            "max_ms": self.max_duration * 1000,
+        }
+
+
+class FileIO(object):
+    def __init__(self, workers:int, max_queued:int=64, timeout:float=10) -> None:
+        """constructor of the FileIO object.
+
+        Run the disk accesses in a pool of threads so a slow disk never blocks the event loop,
+        the latency of each operation is measured
+
+        Args:
+            workers (int): the number of threads. 0 : the operations are run in the event loop
+            max_queued (int, optional): the number of operations submitted at the same time, the next ones wait their turn. Defaults to 64.
+            timeout (float, optional): the number of seconds allowed to an operation. Defaults to 10.
+        """
+        super(FileIO, self).__init__()
+        self.workers:int = workers
+        self.max_queued:int = max_queued
+        self.timeout:float = timeout
+        self.pool:ThreadPoolExecutor | None = None
+        self.operations:dict[str, OperationStats] = {}
+        # created on first use to be bound to the running event loop
+        self.queue_slots:asyncio.Semaphore | None = None
+
+    @classmethod
+    def from_env(cls) -> "FileIO":
+        """create a FileIO configured with the FILE_IO_WORKERS, FILE_IO_QUEUE_SIZE and FILE_IO_TIMEOUT environment variables
+
+        Returns:
+            FileIO: the file I/O
+        """
+        workers = os.getenv('FILE_IO_WORKERS')
+        max_queued = os.getenv('FILE_IO_QUEUE_SIZE')
+        try:
+            # a timeout can have decimals, isnumeric would reject them
+            timeout = float(os.getenv('FILE_IO_TIMEOUT', ""))
+        except ValueError:
+            timeout = 10
+        return cls(
+            workers=int(workers) if workers != None and workers.isnumeric() else 4,
+            max_queued=int(max_queued) if max_queued != None and max_queued.isnumeric() else 64,
+            timeout=timeout
+        )
+
+    def get_pool(self) -> ThreadPoolExecutor:
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="file_io")
+        return self.pool
+
+    async def run(self, operation:str, func:Callable[..., Any], *args:Any) -> Any:
+        """run a blocking disk access in a thread and wait for its result without blocking the event loop
+
+        Args:
+            operation (str): the name of the operation in the stats
+            func (Callable[..., Any]): the blocking function
+            *args (Any): the arguments of the function
+
+        Raises:
+            TimeoutError: if the operation did not finish in time, the thread keeps running until the disk answers
+            Exception: the error raised by the function
+
+        Returns:
+            Any: the result of the function
+        """
+        stats = self.operations.setdefault(operation, OperationStats())
+        if self.queue_slots is None:
+            self.queue_slots = asyncio.Semaphore(self.max_queued)
+
+        async with self.queue_slots:
+            start = time.perf_counter()
+            try:
+                if self.workers <= 0:
+                    result = func(*args)
+                else:
+                    loop = asyncio.get_running_loop()
+                    result = await asyncio.wait_for(loop.run_in_executor(self.get_pool(), func, *args), self.timeout)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                raise TimeoutError(f"file operation {operation} took more than {self.timeout}s")
+            except Exception:
+                stats.errors += 1
+                raise
+            stats.add(time.perf_counter() - start)
+            return result
+
+    async def read_bytes(self, path:str) -> bytes:
+        return await self.run("read_bytes", read_bytes, path)
+
+    async def write_bytes(self, path:str, data:bytes):
+        await self.run("write_bytes", write_bytes, path, data)
+
+    async def remove(self, path:str):
+        """remove a file, nothing is done if it does not exist
+
+        Args:
+            path (str): the path of the file
+        """
+        await self.run("remove", remove, path)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {operation: stats.report() for (operation, stats) in self.operations.items()}
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+
+
+def read_bytes(path:str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def write_bytes(path:str, data:bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+def remove(path:str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+FILE_IO:FileIO | None = None
+
+def get_file_io() -> FileIO:
+    """return the file I/O shared by every game, created from the environment variables on first use
+
+    Returns:
+        FileIO: the shared file I/O
+    """
+    global FILE_IO
+    if FILE_IO is None:
+        FILE_IO = FileIO.from_env()
+    return FILE_IO
@@ -1,15 +1,20 @@
 import random
 from Language import Language
-from CardGrid import CardGrid
+from CardGrid import CardGrid, normalize_word
 from ColorCard import ColorCard
 import interactions as di
 import enum
 from CodeGameExceptions import *
-import unidecode
-import grid_generator
+from BoardRenderer import BoardRenderer
+from RenderScheduler import RenderScheduler
 import asyncio
-from PIL import Image
+import copy
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from ArtifactStore import get_artifact_store
 from Creator import Creator
+from GameActor import GameActor
+from GameLog import GameLog, GameEvent, EventType, LoggedUser, run_now
 
 class State(enum.Enum):
     WAITING = 0
@@ -18,24 +23,36 @@ class State(enum.Enum):
     WIN = 3
 
 class Player(object):
-    def __init__(self, user: di.User, team_color: ColorCard, can_be_spy:bool=False) -> None:
-        self.user: di.User = user
+    # only the id and the name of the user are kept, a game may stay idle for a long time
+    __slots__ = ("user_id", "name", "team_color", "isSpy", "can_be_spy")
+
+    def __init__(self, user_id:int, name:str, team_color: ColorCard, can_be_spy:bool=False) -> None:
+        self.user_id: int = user_id
+        self.name: str = name
         self.team_color: ColorCard = team_color
         self.isSpy: bool = False
         self.can_be_spy: bool = can_be_spy
 
+    @classmethod
+    def from_user(cls, user: di.User, team_color: ColorCard, can_be_spy:bool=False) -> "Player":
+        return cls(int(user.id), str(user.username), team_color, can_be_spy)
+
 
 class Game(object):
     
 
-    def __init__(self, creator:Creator, nb_teams:int, default_word_list:bool, server_word_list:bool) -> None:
+    def __init__(self, creator:Creator, nb_teams:int, default_word_list:bool, server_word_list:bool, seed:int | None = None) -> None:
         """constructeur of a Game object
 
+        The starting team and the grid are drawn from the seed : with the seed and the pool_version
+        of a game the same board can be generated again for a bug report, a replay or a benchmark
+
         Args:
             language (Language): the language of the game
             creator_id (str): the discord id of the creator of the game
             channel_id (str): the channel id where the game has been created
             guild_id (str) : the guild id where the game has been created
+            seed (int | None) : the seed of the random generator of the game. Default to: a random seed
 
         Raises:
             WordListFileNotFound: if the word file of the guild_id is not found
@@ -45,8 +62,12 @@ class Game(object):
         self.team_colors: list[ColorCard] = [ColorCard.BLUE, ColorCard.RED, ColorCard.GREEN, ColorCard.YELLOW][:nb_teams]
         self.nb_minimum_player: int = 2 # TODO : solo mode
         
+        self.seed:int = seed if seed != None else random.getrandbits(64)
+        # the generator is not kept : its state is larger than the rest of the game
+        rng = random.Random(self.seed)
+
         self.state : State = State.WAITING
-        self.color_state : ColorCard = random.choice(self.team_colors)
+        self.color_state : ColorCard = rng.choice(self.team_colors)
         self.winners:list[ColorCard] = []
 
         self.language: Language = creator.language
@@ -61,19 +82,38 @@ class Game(object):
                 starting_team_color=self.color_state, 
                 team_list=self.team_colors,
                 default_word_list=default_word_list, 
-                guild_id_for_list=creator.guild_id if server_word_list else None
+                guild_id_for_list=creator.guild_id if server_word_list else None,
+                channel_id=creator.channel_id,
+                guild_id=creator.guild_id,
+                rng=rng
             )
         except (WordListFileNotFound, NotEnoughWordsInFile):
             raise
-
-        self.player_list: dict[str, Player] = {}
+        self.pool_version:str = self.card_grid.pool_version
+
+        self.renderer: BoardRenderer = BoardRenderer(self.card_grid, self.channel_id)
+        self.render_scheduler: RenderScheduler = RenderScheduler(self.renderer)
+        # a headless game keeps its state without rendering the grids, to replay its log
+        self.headless: bool = False
+        # the commands of the players are applied one at a time by the actor
+        self.actor: GameActor = GameActor.from_env(self.language)
+        # incremented on every change of the grid, the images of older versions are never displayed
+        self.board_version: int = 0
+
+        # user id -> player, in the order they joined
+        self.player_list: dict[int, Player] = {}
         self.spies: dict[ColorCard, Player] = {}
-        self.teams:dict[ColorCard, list[Player]] = {color:[] for color in self.team_colors}
+        # user ids of the players of each team
+        self.teams:dict[ColorCard, set[int]] = {color:set() for color in self.team_colors}
 
         self.last_word_suggested:str = ""
         self.last_number_hint:int = 0
         self.bonus_proposition:bool = True
         self.one_word_found:bool = False
+
+        # the changes of the game, from its creation : the board of the snapshot and the events replay the game
+        self.log: GameLog = GameLog(GameLog.get_game_id(self.channel_id, self.seed))
+        self.log.append(EventType.CREATE, int(self.creator_id), self.snapshot())
     
     async def join(self, user: di.User, team_color: ColorCard, can_be_spy: bool | None):
         """add a user to the game. 
@@ -93,23 +133,24 @@ class Game(object):
 
         if team_color not in self.team_colors:
             raise TeamNotAvailable(self.language)
+        self.log.append(EventType.JOIN, int(user.id), str(user.username), team_color.value, can_be_spy)
         # already in Game : change team color
-        if str(user.id) in self.player_list:
-            player:Player = self.player_list[str(user.id)]
+        if int(user.id) in self.player_list:
+            player:Player = self.player_list[int(user.id)]
             # pop the player from there team
-            self.teams[player.team_color].remove(player)
+            self.teams[player.team_color].discard(player.user_id)
             # change team color
             player.team_color = team_color
             # change can_be_spy state
             if can_be_spy != None :
                 player.can_be_spy = can_be_spy
 
-            self.teams[team_color].append(player)
+            self.teams[team_color].add(player.user_id)
             return
         # else
-        p = Player(user=user, team_color=team_color, can_be_spy=bool(can_be_spy))
-        self.player_list[str(user.id)] = p
-        self.teams[team_color].append(p)
+        p = Player.from_user(user, team_color=team_color, can_be_spy=bool(can_be_spy))
+        self.player_list[p.user_id] = p
+        self.teams[team_color].add(p.user_id)
 
 
     async def leave(self, user:di.User):
@@ -125,11 +166,12 @@ class Game(object):
         if self.state != State.WAITING:
             raise GameAlreadyStarted(self.language)
         
-        if user.id not in self.player_list:
+        if int(user.id) not in self.player_list:
             raise NotInGame(self.language)
         
-        player:Player = self.player_list.pop(user.id)
-        self.teams[player.team_color].remove(player)
+        player:Player = self.player_list.pop(int(user.id))
+        self.teams[player.team_color].discard(player.user_id)
+        self.log.append(EventType.LEAVE, player.user_id)
 
 
     def next_state(self):
@@ -166,13 +208,13 @@ class Game(object):
         while i < len(self.team_colors):
             color_team = self.team_colors[i]
             i += 1
-            if self.card_grid.remaining_words_count[color_team] <= 0:
+            if self.card_grid.remaining_count(color_team) <= 0:
                 self.winners = [color_team]
                 return True
         # exit condition : i >= len(self.team_colors) : no winner
 
         # Black card found
-        if self.card_grid.remaining_words_count[ColorCard.BLACK] <= 0:
+        if self.card_grid.remaining_count(ColorCard.BLACK) <= 0:
             # return all teams except the team that found black card
             temp_team_colors = self.team_colors.copy()
             temp_team_colors.remove(self.color_state)
@@ -194,12 +236,25 @@ class Game(object):
         # return the number of player in the specified team
         return len(self.teams[team_color])
 
+    def get_team(self, team_color:ColorCard) -> list[Player]:
+        """return the players of a team in the order they joined the game
+
+        Args:
+            team_color (ColorCard): the color of the team
+
+        Returns:
+            list[Player]: the players
+        """
+        team = self.teams.get(team_color, set())
+        return [player for player in self.player_list.values() if player.user_id in team]
+
     def chose_spies(self):
-        """Define 1 spy in each team randomly
+        """Define 1 spy in each team randomly, drawn from the seed of the game
         """
+        rng = random.Random(f"{self.seed}:spies")
         for team_color in self.team_colors:
             # get the list of pretenders in the team
-            spy_pretenders = [player for player in self.teams[team_color] if player.can_be_spy]
+            spy_pretenders = [player for player in self.get_team(team_color) if player.can_be_spy]
 
             # reset can_be_spy (for display)
             for player in spy_pretenders:
@@ -207,13 +262,13 @@ class Game(object):
 
             # if no spy pretender : chose a spy in the whole team
             if len(spy_pretenders) == 0:
-                spy_pretenders = self.teams[team_color]
-            spy: Player = random.choice(spy_pretenders)
+                spy_pretenders = self.get_team(team_color)
+            spy: Player = rng.choice(spy_pretenders)
             spy.isSpy = True
             self.spies[team_color] = spy
 
     async def start(self, creator_id:str):
-        """Starts a new game if the creator_id is the same as the User that create the game
+        """Starts a new game if the creator_id is the same as the User that create the game, the grids are rendered in the background
 
         Args:
             creator_id (str): the id of the User running the command
@@ -236,10 +291,10 @@ class Game(object):
             i += 1
         
         self.chose_spies()
-
-        await self.generate_grids()
-
         self.next_state()
+        self.log.append(EventType.START, int(creator_id), [self.spies[color].user_id for color in self.team_colors])
+
+        self.request_grids()
 
     async def suggest(self, user:di.User, word:str, number:int) -> tuple[str, int]:
         """suggest a word and a number of tries for a spy
@@ -261,13 +316,13 @@ class Game(object):
         Returns:
             tuple[str, int]: the word and the number stored
         """
-        if user.id not in self.player_list:
+        if int(user.id) not in self.player_list:
             raise NotInGame(self.language)
         
         if self.state == State.WAITING:
             raise GameNotStarted(self.language)
 
-        player:Player = self.player_list[user.id]
+        player:Player = self.player_list[int(user.id)]
 
         if not player.isSpy:
             raise NotYourRole(self.language)
@@ -282,12 +337,12 @@ class Game(object):
             raise WrongHintNumberGiven(self.language)
 
         # setting more than remaining word set number of try to the number of remaining words
-        remaining_words = self.card_grid.remaining_words_count[player.team_color]
+        remaining_words = self.card_grid.remaining_count(player.team_color)
         if number > remaining_words:
             number = remaining_words
         
         # remove or replace special characters and keep only the first word in the possible sentence
-        newWord = unidecode.unidecode(word).upper().split(" ")[0]
+        newWord = normalize_word(word)
         if self.card_grid.is_in_grid(newWord):
             raise WordInGrid(self.language)
         
@@ -295,6 +350,7 @@ class Game(object):
         self.last_word_suggested = newWord
         self.one_word_found = False
         self.next_state()
+        self.log.append(EventType.SUGGEST, player.user_id, newWord, number)
 
         return (self.last_word_suggested, self.last_number_hint)
     
@@ -324,7 +380,7 @@ class Game(object):
         return await self.guess_by_word(user, word)
     
     async def guess_by_word(self, user:di.User, word:str) -> tuple[ColorCard, str]:
-        """proposed a word in the grid
+        """proposed a word in the grid, the new grids are rendered in the background
 
         Args:
             user (di.User): the user that run the command
@@ -341,13 +397,13 @@ class Game(object):
         Returns:
             tuple[ColorCard, str]: the color of the guessed card and the word
         """
-        if user.id not in self.player_list:
+        if int(user.id) not in self.player_list:
             raise NotInGame(self.language)
         
         if self.state == State.WAITING:
             raise GameNotStarted(self.language)
         
-        player:Player = self.player_list[user.id]
+        player:Player = self.player_list[int(user.id)]
 
         if player.isSpy:
             raise NotYourRole(self.language)
@@ -359,8 +415,9 @@ class Game(object):
             raise NotYourTurn(self.language)
 
         try:
-            newWord = unidecode.unidecode(word).upper().split(" ")[0]
+            newWord = normalize_word(word)
             (color, word_found) = self.card_grid.guess(newWord) # can raise WordNotInGrid
+            self.log.append(EventType.GUESS, player.user_id, newWord)
 
             isWon = self.is_won()
             # a team won or player guessed a wrong color
@@ -375,8 +432,8 @@ class Game(object):
                 self.bonus_proposition = False
                 self.next_state()
             
-            # generate the png grids
-            await self.generate_grids()
+            # the png grids are rendered in the background, see wait_for_render
+            self.request_grids()
             return (color, word_found)
         except WordNotInGrid:
             raise
@@ -395,13 +452,13 @@ class Game(object):
             NotYourTurn: if it's not the team of the user that play
             NoWordGuessed: if the player didn't found any word
         """
-        if user.id not in self.player_list:
+        if int(user.id) not in self.player_list:
             raise NotInGame(self.language)
         
         if self.state == State.WAITING:
             raise GameNotStarted(self.language)
         
-        player:Player = self.player_list[user.id]
+        player:Player = self.player_list[int(user.id)]
 
         if player.isSpy:
             raise NotYourRole(self.language)
@@ -416,64 +473,132 @@ class Game(object):
             raise NoWordGuessed(self.language)
 
         self.next_state()
+        self.log.append(EventType.SKIP, player.user_id)
+
+    def request_grids(self) -> int:
+        """request the render of the players and spies grids of the new board version, only the cards changed since the last render are redrawn.
+
+        The command does not wait for the render : the next commands of the game are applied while it runs
+        and the renders requested while a render is in progress are merged into a single render of the newest board.
+        The caller waits for it with wait_for_render, outside of the actor
+
+        Returns:
+            int: the new board version
+        """
+        self.board_version += 1
+        if not self.headless:
+            self.render_scheduler.request(self.board_version)
+        return self.board_version
+
+    async def wait_for_render(self, version:int):
+        """wait until the board version, or a newer one, is rendered
 
-    async def generate_grids(self):
-        taskSpy = asyncio.get_event_loop().create_task(
-            grid_generator.generateGrid(
-            self.card_grid, isSpy=False, channel_id=self.channel_id
-        ))
-        taskPlayer = asyncio.get_event_loop().create_task(
-            grid_generator.generateGrid(
-            self.card_grid, isSpy=True, channel_id=self.channel_id
-        ))
+        Args:
+            version (int): the board version
 
-        await asyncio.wait([taskSpy, taskPlayer])
+        Raises:
+            RenderFailed: if the grids could not be rendered
+        """
+        try:
+            await self.render_scheduler.wait_for(version)
+        except (TimeoutError, asyncio.TimeoutError, BrokenProcessPool) as e:
+            print(e)
+            raise RenderFailed(self.language)
 
     #def create_grid(self):
     #    loop = asyncio.get_event_loop()
     #    loop.run_until_complete(self.generate_grids())
     #    loop.close()
 
-    def get_image_path(self, isSpy:bool=False) -> str:
-        """return the image path based on the isSpy bool passed in param
+    async def get_image(self, isSpy:bool=False) -> bytes:
+        """return the encoded image of the grid based on the isSpy bool passed in param
+
+        Args:
+            isSpy (bool): True for the spies grid, False for the players grid
+
+        Raises:
+            GameNotStarted: if the game is not yet started
+            RenderFailed: if the grid could not be rendered
+
+        Returns:
+            bytes: the PNG image of the grid
+        """
+        return (await self.get_image_and_hash(isSpy))[0]
+
+    async def get_image_and_hash(self, isSpy:bool=False) -> tuple[bytes, str | None]:
+        """return the encoded image of the grid and the hash of the board state it shows
 
         Args:
             isSpy (bool): True for the spies grid, False for the players grid
 
         Raises:
             GameNotStarted: if the game is not yet started
-            FileNotFoundError: if the file is not accessible for any reason
+            RenderFailed: if the grid could not be rendered
 
         Returns:
-            str: the path of the image
-        """        
+            tuple[bytes, str | None]: the PNG image of the grid and its hash
+        """
         if self.state == State.WAITING:
             raise GameNotStarted(self.language)
-        path = f"render/{self.channel_id}{'_SPY' if isSpy else '_PLAYER'}.png"
-        try:
-            Image.open(path)
-            return path
-        except FileNotFoundError:
-            raise
-        
-    def get_user_image_path(self,  user: di.User) -> str:
-        """return the image path for the player
+        version = self.board_version
+        store = get_artifact_store()
+        # the hash is read with the image, before the store reads the spill directory
+        state_hash = store.get_hash(self.channel_id, isSpy, version)
+        data = await store.get(self.channel_id, isSpy, version)
+        if data is not None:
+            return (data, state_hash)
+        # rendering in progress : wait for it, evicted from the store : encode the last canvas again
+        self.render_scheduler.request(version, force=self.render_scheduler.rendered_version >= version)
+        await self.wait_for_render(version)
+        state_hash = store.get_hash(self.channel_id, isSpy)
+        data = await store.get(self.channel_id, isSpy)
+        if data is None:
+            raise RenderFailed(self.language)
+        return (data, state_hash)
+
+    def get_image_hash(self, isSpy:bool=False) -> str | None:
+        """return the hash of the board state shown by the current grid, two grids with the same hash are the same image
+
+        Args:
+            isSpy (bool): True for the spies grid, False for the players grid
+
+        Returns:
+            str | None: the hash or None if the grid of the current board is not rendered yet
+        """
+        return get_artifact_store().get_hash(self.channel_id, isSpy, self.board_version)
+
+    def get_user_view(self, user: di.User) -> bool:
+        """return the grid seen by the player
 
         Args:
             user (di.User): the user running the command
 
         Raises:
             NotInGame: if the player is not in the game
-            GameNotStarted: if the game is not yet started
-            FileNotFoundError: if the file is not accessible for any reason
 
         Returns:
-            str: the path of the image
+            bool: True if the player sees the spies grid, False for the players grid
         """
-        if user.id not in self.player_list:
+        if int(user.id) not in self.player_list:
             raise NotInGame(self.language)
-        player:Player = self.player_list[user.id]
-        return self.get_image_path(player.isSpy) # can raise GameNotStarted
+        player:Player = self.player_list[int(user.id)]
+        return player.isSpy
+
+    async def get_user_image(self, user: di.User) -> bytes:
+        """return the encoded image of the grid for the player
+
+        Args:
+            user (di.User): the user running the command
+
+        Raises:
+            NotInGame: if the player is not in the game
+            GameNotStarted: if the game is not yet started
+            RenderFailed: if the grid could not be rendered
+
+        Returns:
+            bytes: the PNG image of the grid
+        """
+        return await self.get_image(self.get_user_view(user)) # can raise GameNotStarted
 
     def invert_can_be_spy(self, user:di.User):
         """invert the state of 'can_be_spy' field of the player
@@ -485,17 +610,18 @@ class Game(object):
             NotInGame: if the player is not in the game
             GameAlreadyStarted: when the game is already started
         """
-        if user.id not in self.player_list:
+        if int(user.id) not in self.player_list:
             raise NotInGame(self.language)
         
         if self.state != State.WAITING:
             raise GameAlreadyStarted(self.language)
         
-        player:Player = self.player_list[user.id]
+        player:Player = self.player_list[int(user.id)]
         player.can_be_spy = not player.can_be_spy
+        self.log.append(EventType.SPY_PREFERENCE, player.user_id)
 
     def get_all_pretenders_id(self) -> list[int]:
-        return [int(p.user.id) for p in self.player_list.values() if p.can_be_spy]
+        return [p.user_id for p in self.player_list.values() if p.can_be_spy]
         
 
 
@@ -517,3 +643,199 @@ class Game(object):
 
 
     
+
+    def memory_usage(self) -> int:
+        """return the bytes used by the state of the game : the game, its grid and its players. The word pools and the rendered grids are shared and not counted
+
+        Returns:
+            int: the number of bytes
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self.__dict__) + self.card_grid.memory_usage()
+        size += sys.getsizeof(self.player_list) + sum(sys.getsizeof(player) + sys.getsizeof(player.name) for player in self.player_list.values())
+        size += sys.getsizeof(self.teams) + sum(sys.getsizeof(team) for team in self.teams.values()) + sys.getsizeof(self.spies)
+        return size
+
+    def clone(self) -> "Game":
+        """return a copy of the game to simulate moves, in O(number of players + number of cards).
+
+        The users are shared, the grid is copied with CardGrid.clone. The copy is headless : its moves are never rendered
+        in the artifact store of the channel, where they would replace the grids of the game
+
+        Returns:
+            Game: the copy
+        """
+        game:Game = Game.__new__(Game)
+        game.__dict__.update(self.__dict__)
+        game.team_colors = list(self.team_colors)
+        game.winners = list(self.winners)
+        game.card_grid = self.card_grid.clone()
+        game.renderer = BoardRenderer(game.card_grid, self.channel_id, self.renderer.themes, self.renderer.encoder)
+        game.render_scheduler = RenderScheduler(game.renderer)
+        game.headless = True
+        game.actor = GameActor(self.language, self.actor.max_queued)
+        # the moves of the copy are not part of the game
+        game.log = self.log.copy()
+
+        # the same players in the list, the teams and the spies
+        game.player_list = {user_id: copy.copy(player) for (user_id, player) in self.player_list.items()}
+        game.teams = {color: set(team) for (color, team) in self.teams.items()}
+        game.spies = {color: game.player_list[player.user_id] for (color, player) in self.spies.items()}
+        return game
+
+    def snapshot(self) -> dict:
+        """return the state of the game as plain values, in O(number of players + number of cards)
+
+        Returns:
+            dict: the state, the players are their user id
+        """
+        return {
+            "seed": self.seed,
+            "pool_version": self.pool_version,
+            "language": self.language.value,
+            "creator_id": self.creator_id,
+            "channel_id": self.channel_id,
+            "guild_id": self.guild_id,
+            "team_colors": [color.value for color in self.team_colors],
+            "state": self.state.value,
+            "color_state": self.color_state.value,
+            "winners": [color.value for color in self.winners],
+            "board_version": self.board_version,
+            "board": self.card_grid.snapshot(),
+            "players": [(player.user_id, player.name, player.team_color.value, player.isSpy, player.can_be_spy) for player in self.player_list.values()],
+            "last_word_suggested": self.last_word_suggested,
+            "last_number_hint": self.last_number_hint,
+            "bonus_proposition": self.bonus_proposition,
+            "one_word_found": self.one_word_found,
+            "events": self.log.length,
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot:dict) -> "Game":
+        """create the game of a snapshot, the grids are rendered again on the next display
+
+        Args:
+            snapshot (dict): the snapshot returned by Game.snapshot
+
+        Returns:
+            Game: the game
+        """
+        game:Game = Game.__new__(Game)
+        game.team_colors = [ColorCard(color) for color in snapshot["team_colors"]]
+        game.nb_minimum_player = 2
+        game.seed = snapshot["seed"]
+        game.pool_version = snapshot["pool_version"]
+        game.state = State(snapshot["state"])
+        game.color_state = ColorCard(snapshot["color_state"])
+        game.winners = [ColorCard(color) for color in snapshot["winners"]]
+        game.language = Language(snapshot["language"])
+        game.creator_id = snapshot["creator_id"]
+        game.channel_id = snapshot["channel_id"]
+        game.guild_id = snapshot["guild_id"]
+        game.card_grid = CardGrid.from_snapshot(snapshot["board"], game.language)
+        game.renderer = BoardRenderer(game.card_grid, game.channel_id)
+        game.render_scheduler = RenderScheduler(game.renderer)
+        game.headless = False
+        game.actor = GameActor.from_env(game.language)
+        game.board_version = snapshot["board_version"]
+
+        game.player_list = {}
+        game.spies = {}
+        game.teams = {color:set() for color in game.team_colors}
+        for (user_id, name, team_color, isSpy, can_be_spy) in snapshot["players"]:
+            player = Player(user_id, name, ColorCard(team_color), can_be_spy)
+            player.isSpy = isSpy
+            game.player_list[user_id] = player
+            game.teams[player.team_color].add(user_id)
+            if isSpy:
+                game.spies[player.team_color] = player
+
+        game.last_word_suggested = snapshot["last_word_suggested"]
+        game.last_number_hint = snapshot["last_number_hint"]
+        game.bonus_proposition = snapshot["bonus_proposition"]
+        game.one_word_found = snapshot["one_word_found"]
+        # the snapshots saved before the log have no events
+        game.log = GameLog(GameLog.get_game_id(game.channel_id, game.seed), snapshot.get("events", 0))
+        return game
+
+    def apply(self, event:GameEvent):
+        """apply an event of the log again, the game must be headless : the commands run without waiting
+
+        Args:
+            event (GameEvent): the event
+
+        Raises:
+            ValueError: if the event can not be applied or does not give the same result
+            CodeNamesException: if the event is not valid in the state of the game
+        """
+        user = LoggedUser(event.user_id)
+        match event.type:
+            case EventType.JOIN:
+                (name, team_color, can_be_spy) = event.data
+                run_now(self.join(LoggedUser(event.user_id, name), ColorCard(team_color), can_be_spy)) # type: ignore
+            case EventType.LEAVE:
+                run_now(self.leave(user)) # type: ignore
+            case EventType.SPY_PREFERENCE:
+                self.invert_can_be_spy(user) # type: ignore
+            case EventType.START:
+                run_now(self.start(str(event.user_id)))
+                # the spies are drawn from the seed
+                if [self.spies[color].user_id for color in self.team_colors] != event.data[0]:
+                    raise ValueError(f"the spies of the game {self.log.game_id} are not the ones of the log")
+            case EventType.SUGGEST:
+                run_now(self.suggest(user, *event.data)) # type: ignore
+            case EventType.GUESS:
+                run_now(self.guess_by_word(user, event.data[0])) # type: ignore
+            case EventType.SKIP:
+                run_now(self.skip(user)) # type: ignore
+            case _:
+                raise ValueError(f"the event {event.type.name} can not be applied to a started log")
+
+    @classmethod
+    def replay(cls, events:list[GameEvent]) -> "Game":
+        """rebuild a game from its log : the board of the creation event, then the events applied in order.
+        The replayed game is headless, its grids are not rendered
+
+        Args:
+            events (list[GameEvent]): the events of the game, from its creation
+
+        Raises:
+            ValueError: if the log does not start with the creation of the game or diverges
+
+        Returns:
+            Game: the game in the state after the last event
+        """
+        if len(events) == 0 or events[0].type != EventType.CREATE:
+            raise ValueError("the log does not start with the creation of the game")
+        game = cls.from_snapshot(events[0].data[0])
+        game.headless = True
+        # the creation is the first event of the log
+        game.log = GameLog(game.log.game_id, 1)
+        for event in events[1:]:
+            game.apply(event)
+        return game
+
+
+if __name__ == "__main__":
+    import timeit
+    import tracemalloc
+
+    # memory of a game and cost of a copy with 8 players
+    creator = Creator(Language.EN, creator_id="1", channel_id="1", guild_id="1")
+    game = Game(creator, nb_teams=4, default_word_list=True, server_word_list=False)
+    for i in range(8):
+        user = di.User(id=di.Snowflake(1000 + i), username=f"user{i}", avatar="", client="") # type: ignore
+        asyncio.run(game.join(user, game.team_colors[i % 4], True))
+
+    tracemalloc.start()
+    clones = [game.clone() for _ in range(100)]
+    clone_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    deep_copies = [copy.deepcopy(game) for _ in range(100)]
+    deepcopy_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"game state: {game.memory_usage()}B with 8 players")
+    print(f"per copy: clone {clone_memory/100/1000:.1f}kB, deepcopy {deepcopy_memory/100/1000:.1f}kB")
+    print(f"clone: {timeit.timeit(game.clone, number=1_000)*1_000:.1f}us")
+    print(f"snapshot: {timeit.timeit(game.snapshot, number=1_000)*1_000:.1f}us")
+    print(f"deepcopy: {timeit.timeit(lambda: copy.deepcopy(game), number=100)*10_000:.1f}us")
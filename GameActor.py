@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+import inspect
+from collections import deque
+from typing import Any, Callable
+from Language import Language
+from CodeGameExceptions import GameBusy, GameNotFound
+
+
+class GameActor(object):
+    def __init__(self, language:Language, max_queued:int=256) -> None:
+        """constructor of the GameActor object.
+
+        Apply the commands of a game one at a time in the order they were submitted : a command is never interleaved
+        with another command of the same game, even when it awaits a render. The commands of different games run concurrently.
+        The worker task only exists while commands are queued, an idle game has no task
+
+        Args:
+            language (Language): the language of the game, used for the errors
+            max_queued (int, optional): the maximum number of commands waiting, the next ones are rejected. Defaults to 256.
+        """
+        super(GameActor, self).__init__()
+        self.language:Language = language
+        self.max_queued:int = max_queued
+        # (operation, function, args, kwargs, future of the caller, queued time)
+        self.pending:deque[tuple[str, Callable[..., Any], tuple, dict, asyncio.Future, float]] = deque()
+        self.task:asyncio.Task | None = None
+        self.running:str | None = None
+        # called after each command, the game may have changed
+        self.on_change:Callable[[], None] | None = None
+
+        self.commands:int = 0
+        self.rejected:int = 0
+        self.max_depth:int = 0
+        self.wait_time:float = 0
+
+    @classmethod
+    def from_env(cls, language:Language) -> "GameActor":
+        """create a GameActor with the queue size set by the GAME_QUEUE_SIZE environment variable
+
+        Args:
+            language (Language): the language of the game
+
+        Returns:
+            GameActor: the actor
+        """
+        max_queued = os.getenv('GAME_QUEUE_SIZE')
+        return cls(language, max_queued=int(max_queued) if max_queued != None and max_queued.isnumeric() else 256)
+
+    async def submit(self, operation:str, func:Callable[..., Any], *args, **kwargs) -> Any:
+        """queue a command of the game and wait for its result
+
+        Args:
+            operation (str): the name of the command
+            func (Callable[..., Any]): the method of the game, a coroutine function or a function
+
+        Raises:
+            GameBusy: if too many commands are waiting
+            GameNotFound: if the game was deleted before the command ran
+            CodeNamesException: the exceptions raised by the command
+
+        Returns:
+            Any: the result of the command
+        """
+        if len(self.pending) >= self.max_queued:
+            self.rejected += 1
+            raise GameBusy(self.language)
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((operation, func, args, kwargs, future, time.monotonic()))
+        self.max_depth = max(self.max_depth, len(self.pending))
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+        return await future
+
+    async def run(self):
+        try:
+            while len(self.pending) > 0:
+                (operation, func, args, kwargs, future, queued_at) = self.pending.popleft()
+                self.wait_time += time.monotonic() - queued_at
+                # the caller stopped waiting before the command started
+                if future.done():
+                    continue
+                self.running = operation
+                try:
+                    result = func(*args, **kwargs)
+                    if inspect.isawaitable(result):
+                        result = await result
+                except asyncio.CancelledError:
+                    # the game was deleted during the command
+                    if not future.done():
+                        future.set_exception(GameNotFound(self.language))
+                    raise
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    self.running = None
+                    self.commands += 1
+                if self.on_change is not None:
+                    self.on_change()
+        finally:
+            self.task = None
+
+    async def close(self):
+        """stop the command in progress and fail the waiting commands with GameNotFound, called when the game is deleted"""
+        while len(self.pending) > 0:
+            future = self.pending.popleft()[4]
+            if not future.done():
+                future.set_exception(GameNotFound(self.language))
+        task = self.task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "depth": len(self.pending),
+            "max_depth": self.max_depth,
+            "commands": self.commands,
+            "rejected": self.rejected,
+            "average_wait_ms": self.wait_time / self.commands * 1000 if self.commands > 0 else 0,
+        }
@@ -2,12 +2,78 @@ from CardGrid import CardGrid
 from Game import Game
 from Language import Language
 from CodeGameExceptions import GameInChannelAlreadyCreated, GameNotFound, WordListFileNotFound, NotEnoughWordsInFile
-import os
+from ArtifactStore import get_artifact_store
 from Creator import Creator
+from WordPool import get_word_pool_index
+from GameStore import GameStore
+from FileIO import get_file_io
+import functools
+import asyncio
+import sqlite3
 
 class GameList(object):
-    def __init__(self) -> None:
+    def __init__(self, store:GameStore | None = None) -> None:
+        """constructor of the GameList object
+
+        Args:
+            store (GameStore | None, optional): the store where the games are saved after each command, the saved games
+                are restored on the first access to their channel. Defaults to None : the games are only kept in memory.
+        """
         self.game_list :dict[str, Game]= {}
+        self.store:GameStore | None = store
+        # channels whose saved game is not restored yet
+        self.saved_channels:set[str] = store.channel_ids() if store is not None else set()
+        self.restoring:dict[str, asyncio.Task] = {}
+        self.restored:int = 0
+        self.restore_time:float = 0
+
+    def track(self, game:Game):
+        """add a game to the list and save it after each of its commands"""
+        self.game_list[game.channel_id] = game
+        if self.store is not None:
+            game.actor.on_change = functools.partial(self.store.save, game)
+
+    async def restore(self, channel_id:str) -> Game | None:
+        """restore the saved game of a channel, the concurrent calls for the same channel share the restore
+
+        Args:
+            channel_id (str): the id of the channel
+
+        Returns:
+            Game | None: the game, None if the channel has no saved game
+        """
+        if channel_id in self.game_list:
+            return self.game_list[channel_id]
+        if channel_id not in self.saved_channels or self.store is None:
+            return None
+        task = self.restoring.get(channel_id)
+        if task is None:
+            task = asyncio.create_task(get_file_io().run("load_game", self.store.load, channel_id))
+            self.restoring[channel_id] = task
+        start = asyncio.get_running_loop().time()
+        try:
+            snapshot = await task
+        except (OSError, TimeoutError, sqlite3.Error) as e:
+            print(e)
+            return None
+        finally:
+            self.restoring.pop(channel_id, None)
+        # another caller restored it while this one was waiting
+        if channel_id in self.game_list:
+            return self.game_list[channel_id]
+        self.saved_channels.discard(channel_id)
+        if snapshot is None:
+            return None
+        game = Game.from_snapshot(snapshot)
+        self.track(game)
+        self.restored += 1
+        self.restore_time += asyncio.get_running_loop().time() - start
+        return game
+
+    async def flush(self):
+        """write the games changed since the last commit, called before the bot stops"""
+        if self.store is not None:
+            await self.store.flush()
 
     async def create_game(self, creator:Creator, nb_teams, default_word_list, server_word_list) -> Game:
         """create a game in the channel
@@ -27,13 +93,21 @@ class GameList(object):
         Returns:
             Game: the game created
         """
-        if creator.channel_id in self.game_list:
+        if await self.restore(creator.channel_id) is not None:
             raise GameInChannelAlreadyCreated(creator.language)
+        try:
+            # read the word lists in the file I/O threads before creating the grid
+            await get_word_pool_index().refresh(creator.language, default_word_list, creator.guild_id if server_word_list else None)
+        except (OSError, TimeoutError) as e:
+            print(e)
+            raise WordListFileNotFound(creator.language)
         try:
             newGame = Game(creator, nb_teams, default_word_list, server_word_list)
         except (WordListFileNotFound, NotEnoughWordsInFile):
             raise
-        self.game_list[creator.channel_id] = newGame
+        self.track(newGame)
+        if self.store is not None:
+            self.store.save(newGame)
         return newGame
 
     async def delete_game(self, channel_id:str, language:Language):
@@ -45,11 +119,16 @@ class GameList(object):
         Raises:
             GameNotFound: if there is no game created in this channel
         """
-        if channel_id not in self.game_list:
+        if await self.restore(channel_id) is None:
             raise GameNotFound(language)
-        # remove files
-        [os.remove(os.path.join('render/', filename)) for filename in os.listdir('render/') if filename.startswith(f'{channel_id}') and filename.endswith('.png')]
-        self.game_list.pop(channel_id)
+        game = self.game_list.pop(channel_id)
+        if self.store is not None:
+            # the log of the game is compacted with its final state
+            self.store.finish(game)
+        # fail the commands still waiting
+        await game.actor.close()
+        # remove the rendered grids
+        await get_artifact_store().remove(channel_id)
     
     async def get_game(self, channel_id:str, language:Language) -> Game:
         """return the game of the channel
@@ -63,8 +142,24 @@ class GameList(object):
         Returns:
             Game: the game of the channel
         """
-        game = self.game_list.get(channel_id)
+        game = self.game_list.get(channel_id) or await self.restore(channel_id)
         if game is None:
             raise GameNotFound(language)
         return game
-        
\ No newline at end of file
+        
+
+    def stats(self) -> dict[str, int]:
+        size = sum(game.memory_usage() for game in self.game_list.values())
+        actors = [game.actor for game in self.game_list.values()]
+        return {
+            "games": len(self.game_list),
+            "size_bytes": size,
+            "bytes_per_game": size // len(self.game_list) if len(self.game_list) > 0 else 0,
+            "queued_commands": sum(len(actor.pending) for actor in actors),
+            "max_queue_depth": max((actor.max_depth for actor in actors), default=0),
+            "commands": sum(actor.commands for actor in actors),
+            "rejected_commands": sum(actor.rejected for actor in actors),
+            "saved_not_restored": len(self.saved_channels),
+            "restored": self.restored,
+            "average_restore_ms": int(self.restore_time / self.restored * 1000) if self.restored > 0 else 0,
+        }
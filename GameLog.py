@@ -0,0 +1,151 @@
+import enum
+import json
+from typing import Any, Coroutine, NamedTuple
+
+# compact JSON, the words are kept as they are
+ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+class EventType(enum.IntEnum):
+    CREATE = 0
+    JOIN = 1
+    LEAVE = 2
+    SPY_PREFERENCE = 3
+    START = 4
+    SUGGEST = 5
+    GUESS = 6
+    SKIP = 7
+
+
+class GameEvent(NamedTuple):
+    """a change of a game : its type, the user who made it and the values needed to apply it again"""
+    type: EventType
+    user_id: int
+    data: tuple
+
+    def encode(self) -> str:
+        """return the event as a compact JSON array : [type, user id, data...]"""
+        return ENCODER.encode([int(self.type), self.user_id, *self.data])
+
+    @classmethod
+    def decode(cls, line:str) -> "GameEvent":
+        (event_type, user_id, *data) = json.loads(line)
+        return cls(EventType(event_type), user_id, tuple(data))
+
+
+class GameLog(object):
+    def __init__(self, game_id:str, length:int=0) -> None:
+        """constructor of the GameLog object.
+
+        The append-only log of the events of a game. Only the events not written yet are kept in memory and they
+        are encoded when they are written : the GameStore writes them with the snapshot of the game and compacts them when the game ends
+
+        Args:
+            game_id (str): the id of the game, unique across the channels and the games of a channel
+            length (int, optional): the number of events already in the log. Defaults to 0.
+        """
+        super(GameLog, self).__init__()
+        self.game_id:str = game_id
+        self.length:int = length
+        # events not written yet, the sequence number of the first one is length - len(pending)
+        self.pending:list[GameEvent] = []
+
+    @staticmethod
+    def get_game_id(channel_id:str, seed:int) -> str:
+        return f"{channel_id}-{seed:x}"
+
+    def append(self, event_type:EventType, user_id:int, *data):
+        """add an event at the end of the log
+
+        Args:
+            event_type (EventType): the type of the event
+            user_id (int): the user who made the change
+            data: the values of the event, JSON values
+        """
+        self.pending.append(GameEvent(event_type, user_id, data))
+        self.length += 1
+
+    def encode_pending(self) -> list[tuple[str, int, str]]:
+        """return the pending events as rows : (game id, sequence number, encoded event)"""
+        first = self.length - len(self.pending)
+        return [(self.game_id, first + i, event.encode()) for (i, event) in enumerate(self.pending)]
+
+    def acknowledge(self, count:int):
+        """forget the first count pending events, once they are written"""
+        del self.pending[:count]
+
+    def copy(self) -> "GameLog":
+        log = GameLog(self.game_id, self.length)
+        log.pending = list(self.pending)
+        return log
+
+
+class LoggedUser(object):
+    """the user of an event, in place of the discord user when an event is applied again"""
+    __slots__ = ("id", "username")
+
+    def __init__(self, user_id:int, username:str="") -> None:
+        self.id:int = user_id
+        self.username:str = username
+
+
+def run_now(coroutine:Coroutine[Any, Any, Any]) -> Any:
+    """run a coroutine that never waits, as the commands of a headless game, without an event loop
+
+    Raises:
+        RuntimeError: if the coroutine waits
+
+    Returns:
+        Any: the result of the coroutine
+    """
+    try:
+        coroutine.send(None)
+    except StopIteration as e:
+        return e.value
+    coroutine.close()
+    raise RuntimeError("the command waited during the replay")
+
+
+if __name__ == "__main__":
+    # the replay speed of a whole game : python GameLog.py
+    import random
+    import time
+    from Game import Game, State
+    from Creator import Creator
+    from Language import Language
+
+    def play(seed:int) -> Game:
+        game = Game(Creator(Language.EN, creator_id="1", channel_id="1", guild_id="1"), nb_teams=2, default_word_list=True, server_word_list=False, seed=seed)
+        game.headless = True
+        rng = random.Random(seed)
+        for i in range(6):
+            run_now(game.join(LoggedUser(1000 + i, f"user{i}"), game.team_colors[i % 2], i < 2))
+        run_now(game.start("1"))
+        while game.state != State.WIN:
+            if game.state == State.SPY:
+                spy = game.spies[game.color_state]
+                run_now(game.suggest(LoggedUser(spy.user_id), f"hint{rng.randrange(1000)}", rng.randint(1, 3)))
+            else:
+                player = next(p for p in game.get_team(game.color_state) if not p.isSpy)
+                # the cards of several words can not be guessed by their first word
+                word = rng.choice([card.word for card in game.card_grid.cards() if not card.guessed and " " not in card.word])
+                run_now(game.guess_by_word(LoggedUser(player.user_id), word))
+        return game
+
+    games = [play(seed) for seed in range(200)]
+    logs = [game.log.pending for game in games]
+    nb_events = sum(len(events) for events in logs)
+    start = time.perf_counter()
+    lines = [line for game in games for (_, _, line) in game.log.encode_pending()]
+    print(f"encode: {(time.perf_counter() - start) / len(lines) * 1e6:.1f}us per event")
+    print(f"{nb_events / len(games):.0f} events per game, {sum(len(line) for line in lines) / len(lines):.0f}B per event, creation excluded: {sum(len(line) for line in lines if not line.startswith('[0,')) / (len(lines) - len(games)):.0f}B")
+
+    start = time.perf_counter()
+    for line in lines:
+        GameEvent.decode(line)
+    print(f"decode: {(time.perf_counter() - start) / len(lines) * 1e6:.1f}us per event")
+    start = time.perf_counter()
+    replayed = [Game.replay(events) for events in logs]
+    elapsed = time.perf_counter() - start
+    assert all(game.snapshot() == replay.snapshot() for (game, replay) in zip(games, replayed))
+    print(f"replay: {elapsed / len(games) * 1000:.2f}ms per game, {nb_events / elapsed:.0f} events/s")
@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from typing import Iterator
+from Game import Game
+from GameLog import GameLog, GameEvent
+from FileIO import get_file_io
+
+
+class GameStore(object):
+    def __init__(self, path:str, flush_interval:float=0.05) -> None:
+        """constructor of the GameStore object.
+
+        Save a snapshot of the games in a SQLite database so a restart does not end them, with the events of their log.
+        The changes are group committed : the games changed during flush_interval are written in a single transaction,
+        with the state they have when the transaction starts.
+        When a game ends its events are compacted in a single row with its final snapshot, read by finished_games
+
+        Args:
+            path (str): the path of the database file
+            flush_interval (float, optional): the number of seconds between a change and its commit. Defaults to 0.05.
+        """
+        super(GameStore, self).__init__()
+        self.path:str = path
+        self.flush_interval:float = flush_interval
+        # the connection is used by the file I/O threads, one at a time
+        self.lock:threading.Lock = threading.Lock()
+        self.connection:sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS games ("
+                "channel_id TEXT PRIMARY KEY, "
+                "snapshot TEXT NOT NULL)"
+            )
+            # the events of the games in progress, one row per event
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS game_events ("
+                "game_id TEXT NOT NULL, "
+                "seq INTEGER NOT NULL, "
+                "event TEXT NOT NULL, "
+                "PRIMARY KEY (game_id, seq)) WITHOUT ROWID"
+            )
+            # the ended games : their final snapshot and their events, one per line
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS finished_games ("
+                "id INTEGER PRIMARY KEY, "
+                "game_id TEXT NOT NULL UNIQUE, "
+                "channel_id TEXT NOT NULL, "
+                "snapshot TEXT NOT NULL, "
+                "events TEXT NOT NULL)"
+            )
+        # channel id -> game changed since the last commit, None if the game was deleted
+        self.dirty:dict[str, Game | None] = {}
+        # game id -> ended game whose log is compacted at the next commit
+        self.finished:dict[str, Game] = {}
+        self.flush_task:asyncio.Task | None = None
+        # one commit at a time, created on first use to be bound to the running event loop
+        self.commit_lock:asyncio.Lock | None = None
+
+        self.changes:int = 0
+        self.commits:int = 0
+        self.written:int = 0
+        self.events:int = 0
+        self.compacted:int = 0
+        self.failures:int = 0
+        self.last_commit:float = 0
+
+    @classmethod
+    def from_env(cls) -> "GameStore":
+        """create a GameStore in GAME_DB (games.db by default) committing every GAME_FLUSH_INTERVAL_MS milliseconds (50 by default)
+
+        Returns:
+            GameStore: the store
+        """
+        flush_interval = os.getenv('GAME_FLUSH_INTERVAL_MS')
+        return cls(
+            os.getenv('GAME_DB') or "games.db",
+            flush_interval=int(flush_interval)/1000 if flush_interval != None and flush_interval.isnumeric() else 0.05
+        )
+
+    def channel_ids(self) -> set[str]:
+        """return the channels with a saved game, read at startup : the games are only loaded when their channel is used
+
+        Returns:
+            set[str]: the channel ids
+        """
+        with self.lock:
+            return {channel_id for (channel_id,) in self.connection.execute("SELECT channel_id FROM games")}
+
+    def load(self, channel_id:str) -> dict | None:
+        """read the snapshot of the game of a channel, run it in a thread
+
+        Args:
+            channel_id (str): the channel id
+
+        Returns:
+            dict | None: the snapshot returned by Game.snapshot, None if there is no saved game
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT snapshot FROM games WHERE channel_id = ?", (channel_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def save(self, game:Game):
+        """save the game at the next commit"""
+        self.dirty[game.channel_id] = game
+        self.changes += 1
+        self.schedule()
+
+    def delete(self, channel_id:str):
+        """delete the saved game of a channel at the next commit"""
+        self.dirty[channel_id] = None
+        self.changes += 1
+        self.schedule()
+
+    def finish(self, game:Game):
+        """delete the saved game of its channel and compact its log at the next commit, called when the game ends"""
+        self.finished[game.log.game_id] = game
+        self.delete(game.channel_id)
+
+    def load_events(self, game_id:str) -> list[GameEvent]:
+        """read the written events of a game in progress or finished, run it in a thread
+
+        Args:
+            game_id (str): the id of the log of the game
+
+        Returns:
+            list[GameEvent]: the events in order, given to Game.replay
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT events FROM finished_games WHERE game_id = ?", (game_id,)).fetchone()
+            lines = row[0].split("\n") if row is not None else [line for (line,) in self.connection.execute(
+                "SELECT event FROM game_events WHERE game_id = ? ORDER BY seq", (game_id,)
+            )]
+        return [GameEvent.decode(line) for line in lines]
+
+    def finished_games(self, batch_size:int=256) -> Iterator[tuple[str, dict, list[GameEvent]]]:
+        """stream the finished games in the order they ended, read by batches : the database is not locked between two batches
+
+        Args:
+            batch_size (int, optional): the number of games read at once. Defaults to 256.
+
+        Yields:
+            tuple[str, dict, list[GameEvent]]: the game id, the final snapshot and the events of a game
+        """
+        last_id = 0
+        while True:
+            with self.lock:
+                rows = self.connection.execute(
+                    "SELECT id, game_id, snapshot, events FROM finished_games WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+                ).fetchall()
+            if len(rows) == 0:
+                return
+            for (last_id, game_id, snapshot, events) in rows:
+                yield (game_id, json.loads(snapshot), [GameEvent.decode(line) for line in events.split("\n")])
+
+    def schedule(self):
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self):
+        try:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+        finally:
+            self.flush_task = None
+
+    def serialize(self, games:dict[str, Game | None], finished:dict[str, Game]) -> tuple[list[tuple[str, str | None]], list[tuple[str, int, str]], list[tuple[str, str, str]], list[tuple[GameLog, int]]]:
+        # the snapshots and the events are taken in the event loop, where the games are modified
+        changes = [(channel_id, json.dumps(game.snapshot(), separators=(",", ":")) if game is not None else None) for (channel_id, game) in games.items()]
+        logs = {id(game.log): game.log for game in [*games.values(), *finished.values()] if game is not None}
+        events = [row for log in logs.values() for row in log.encode_pending()]
+        ended = [(game_id, game.channel_id, json.dumps(game.snapshot(), separators=(",", ":"))) for (game_id, game) in finished.items()]
+        # the number of events written for each log, forgotten once the commit succeeded
+        written = [(log, len(log.pending)) for log in logs.values()]
+        return (changes, events, ended, written)
+
+    async def flush(self):
+        """commit the changes now, after the commit in progress. Called by the group commit and on shutdown"""
+        if self.commit_lock is None:
+            self.commit_lock = asyncio.Lock()
+        async with self.commit_lock:
+            (games, self.dirty) = (self.dirty, {})
+            (finished, self.finished) = (self.finished, {})
+            if len(games) == 0 and len(finished) == 0:
+                return
+            (changes, events, ended, written) = self.serialize(games, finished)
+            try:
+                await get_file_io().run("save_games", self.write, changes, events, ended)
+            except (OSError, TimeoutError, sqlite3.Error) as e:
+                print(e)
+                self.failures += 1
+                # saved again with the next change, unless the game changed since
+                for (channel_id, game) in games.items():
+                    self.dirty.setdefault(channel_id, game)
+                for (game_id, game) in finished.items():
+                    self.finished.setdefault(game_id, game)
+            else:
+                for (log, count) in written:
+                    log.acknowledge(count)
+
+    def write(self, changes:list[tuple[str, str | None]], events:list[tuple[str, int, str]], ended:list[tuple[str, str, str]]):
+        start = time.perf_counter()
+        with self.lock, self.connection:
+            # the events are written again when a failed commit is retried
+            self.connection.executemany("INSERT OR IGNORE INTO game_events (game_id, seq, event) VALUES (?, ?, ?)", events)
+            self.connection.executemany(
+                "INSERT INTO games (channel_id, snapshot) VALUES (?, ?) ON CONFLICT(channel_id) DO UPDATE SET snapshot = excluded.snapshot",
+                [(channel_id, snapshot) for (channel_id, snapshot) in changes if snapshot is not None]
+            )
+            self.connection.executemany(
+                "DELETE FROM games WHERE channel_id = ?",
+                [(channel_id,) for (channel_id, snapshot) in changes if snapshot is None]
+            )
+            # compaction : the events of an ended game are moved in a single row
+            for (game_id, channel_id, snapshot) in ended:
+                lines = [line for (line,) in self.connection.execute("SELECT event FROM game_events WHERE game_id = ? ORDER BY seq", (game_id,))]
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO finished_games (game_id, channel_id, snapshot, events) VALUES (?, ?, ?, ?)",
+                    (game_id, channel_id, snapshot, "\n".join(lines))
+                )
+                self.connection.execute("DELETE FROM game_events WHERE game_id = ?", (game_id,))
+        self.commits += 1
+        self.written += len(changes)
+        self.events += len(events)
+        self.compacted += len(ended)
+        self.last_commit = time.perf_counter() - start
+
+    def close(self):
+        """commit the changes without the event loop and close the database, called when the bot stops"""
+        (games, self.dirty) = (self.dirty, {})
+        (finished, self.finished) = (self.finished, {})
+        if len(games) > 0 or len(finished) > 0:
+            (changes, events, ended, written) = self.serialize(games, finished)
+            self.write(changes, events, ended)
+            for (log, count) in written:
+                log.acknowledge(count)
+        with self.lock:
+            self.connection.close()
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "pending": len(self.dirty),
+            "changes": self.changes,
+            "commits": self.commits,
+            "written": self.written,
+            "events": self.events,
+            "compacted": self.compacted,
+            "failures": self.failures,
+            "last_commit_ms": self.last_commit * 1000,
+        }
+
+
+GAME_STORE:GameStore | None = None
+
+def get_game_store() -> GameStore:
+    """return the store of the games, created from the environment variables on first use
+
+    Returns:
+        GameStore: the shared store
+    """
+    global GAME_STORE
+    if GAME_STORE is None:
+        GAME_STORE = GameStore.from_env()
+    return GAME_STORE
+
+
+if __name__ == "__main__":
+    # the restore time of 10k games : python GameStore.py [database path]
+    import sys
+    import timeit
+    import interactions as di
+    from Creator import Creator
+    from Language import Language
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "games_benchmark.db"
+    game = Game(Creator(Language.EN, creator_id="1", channel_id="0", guild_id="1"), nb_teams=4, default_word_list=True, server_word_list=False)
+    for i in range(8):
+        user = di.User(id=di.Snowflake(1000 + i), username=f"user{i}", avatar="", client="") # type: ignore
+        asyncio.run(game.join(user, game.team_colors[i % 4], True))
+    snapshot = json.dumps(game.snapshot(), separators=(",", ":"))
+    print(f"snapshot: {len(snapshot)}B")
+
+    store = GameStore(path)
+    start = time.perf_counter()
+    store.write([(str(channel_id), snapshot.replace('"channel_id":"0"', f'"channel_id":"{channel_id}"')) for channel_id in range(10_000)], [], [])
+    print(f"write 10k games in one commit: {(time.perf_counter() - start)*1000:.1f}ms")
+
+    start = time.perf_counter()
+    channel_ids = store.channel_ids()
+    print(f"startup, read the {len(channel_ids)} channel ids: {(time.perf_counter() - start)*1000:.1f}ms")
+    print(f"first access of a channel, load and restore: {timeit.timeit(lambda: Game.from_snapshot(store.load('1234')), number=1_000)*1_000:.1f}us")
+    start = time.perf_counter()
+    games = [Game.from_snapshot(store.load(channel_id)) for channel_id in channel_ids]
+    print(f"restore every game: {(time.perf_counter() - start)*1000:.1f}ms")
+    store.close()
+    os.remove(path)
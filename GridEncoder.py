@@ -0,0 +1,155 @@
+import io
+import os
+import time
+from typing import Callable
+from PIL import Image
+
+
+class EncodeResult(object):
+    def __init__(self, encoder:str, data:bytes, duration:float) -> None:
+        """constructor of the EncodeResult object
+
+        Args:
+            encoder (str): the name of the encoder used
+            data (bytes): the encoded image
+            duration (float): the number of seconds spent encoding
+        """
+        super(EncodeResult, self).__init__()
+        self.encoder:str = encoder
+        self.data:bytes = data
+        self.duration:float = duration
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"{{{self.encoder}, {self.size}B, {self.duration*1000:.1f}ms}}"
+
+
+def save_png(canvas:Image.Image, buffer:io.BytesIO):
+    canvas.save(buffer, format="PNG")
+
+def save_png_optimized(canvas:Image.Image, buffer:io.BytesIO):
+    canvas.save(buffer, format="PNG", optimize=True)
+
+def save_png_fast(canvas:Image.Image, buffer:io.BytesIO):
+    canvas.save(buffer, format="PNG", compress_level=1)
+
+def save_palette(canvas:Image.Image, buffer:io.BytesIO):
+    # the grid only has a handful of flat colors, an adaptive palette keeps the transparency
+    canvas.quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(buffer, format="PNG", optimize=True)
+
+def save_webp(canvas:Image.Image, buffer:io.BytesIO):
+    # in lossless mode quality and method both set the compression effort : the default pair halves the size of a low quality for the same time,
+    # method 6 is several seconds per grid
+    canvas.save(buffer, format="WEBP", lossless=True, quality=80, method=4)
+
+
+# name : (save function, file extension)
+ENCODERS:dict[str, tuple[Callable[[Image.Image, io.BytesIO], None], str]] = {
+    "png": (save_png, "png"),
+    "png_optimized": (save_png_optimized, "png"),
+    "png_fast": (save_png_fast, "png"),
+    "palette": (save_palette, "png"),
+    "webp": (save_webp, "webp"),
+}
+
+
+def get_encoder_name() -> str:
+    """return the encoder set by the GRID_ENCODER environment variable
+
+    Returns:
+        str: the name of the encoder in ENCODERS, "png" if not set or unknown
+    """
+    encoder = os.getenv('GRID_ENCODER')
+    return encoder if encoder in ENCODERS else "png"
+
+def get_extension(encoder:str | None = None) -> str:
+    """return the file extension of the images produced by an encoder
+
+    Args:
+        encoder (str | None, optional): the name of the encoder. Defaults to the GRID_ENCODER encoder.
+
+    Returns:
+        str: the file extension, without dot
+    """
+    return ENCODERS[encoder or get_encoder_name()][1]
+
+def encode(canvas:Image.Image, encoder:str) -> EncodeResult:
+    """encode a grid, run in the render processes
+
+    Args:
+        canvas (Image.Image): the grid
+        encoder (str): the name of the encoder in ENCODERS
+
+    Returns:
+        EncodeResult: the encoded image, its size and the encoding time
+    """
+    (save, _) = ENCODERS[encoder]
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    save(canvas, buffer)
+    return EncodeResult(encoder, buffer.getvalue(), time.perf_counter() - start)
+
+def compare(canvas:Image.Image) -> list[EncodeResult]:
+    """encode a grid with every encoder, used to choose GRID_ENCODER
+
+    Args:
+        canvas (Image.Image): the grid
+
+    Returns:
+        list[EncodeResult]: the result of each encoder
+    """
+    return [encode(canvas, encoder) for encoder in ENCODERS]
+
+
+class EncoderStats(object):
+    def __init__(self) -> None:
+        """constructor of the EncoderStats object, the totals of the encoded grids per encoder
+        """
+        super(EncoderStats, self).__init__()
+        self.count:dict[str, int] = {}
+        self.bytes:dict[str, int] = {}
+        self.duration:dict[str, float] = {}
+
+    def add(self, result:EncodeResult):
+        self.count[result.encoder] = self.count.get(result.encoder, 0) + 1
+        self.bytes[result.encoder] = self.bytes.get(result.encoder, 0) + result.size
+        self.duration[result.encoder] = self.duration.get(result.encoder, 0) + result.duration
+
+    def report(self) -> dict[str, dict[str, float]]:
+        """return the average size and encoding time of each encoder used
+
+        Returns:
+            dict[str, dict[str, float]]: {encoder: {"count", "average_bytes", "average_ms"}}
+        """
+        return {
+            encoder: {
+                "count": count,
+                "average_bytes": self.bytes[encoder] / count,
+                "average_ms": self.duration[encoder] * 1000 / count,
+            }
+            for (encoder, count) in self.count.items()
+        }
+
+
+ENCODER_STATS = EncoderStats()
+
+
+if __name__ == "__main__":
+    import asyncio
+    from BoardRenderer import BoardRenderer
+    from CardGrid import CardGrid
+    from ColorCard import ColorCard
+    from Language import Language
+    import RenderExecutor
+
+    RenderExecutor.RENDER_EXECUTOR = RenderExecutor.RenderExecutor(workers=0)
+    for team_list in [[ColorCard.BLUE, ColorCard.RED], [ColorCard.BLUE, ColorCard.RED, ColorCard.GREEN, ColorCard.YELLOW]]:
+        card_grid = CardGrid(language=Language.EN, starting_team_color=ColorCard.BLUE, team_list=team_list)
+        renderer = BoardRenderer(card_grid, channel_id="encoder_benchmark")
+        asyncio.run(renderer.render(isSpy=True))
+        print(f"{card_grid.grid_size}x{card_grid.grid_size}:")
+        for result in compare(renderer.canvases[True]):
+            print(f"    {result.encoder:<14} {result.size/1000:>7.1f}kB {result.duration*1000:>7.1f}ms")
@@ -0,0 +1,275 @@
+import os
+import abc
+import glob
+import random
+import sqlite3
+import threading
+from typing import Iterable, Sequence
+from WordListRepository import get_word_list_repository, get_guild_list_path
+from CompiledWordList import compile_list_file
+from word_list import write_words, read_weighted_list_file
+from FileIO import get_file_io
+
+
+class GuildWordStore(abc.ABC):
+    """the storage of the guild word lists, used by the word pools and /upload.
+
+    The words returned are normalized and without duplicates. get_words returns the same object while a list is unchanged
+    """
+
+    @abc.abstractmethod
+    def get_words(self, guild_id:str) -> Sequence[str]:
+        """return the words of a guild, may access the disk : see refresh
+
+        Args:
+            guild_id (str): the guild id
+
+        Raises:
+            FileNotFoundError: if the guild has no word list
+
+        Returns:
+            Sequence[str]: the words
+        """
+
+    @abc.abstractmethod
+    def get_weights(self, guild_id:str) -> Sequence[float] | None:
+        """return the weight of each word of a guild read by get_words or refresh
+
+        Args:
+            guild_id (str): the guild id
+
+        Returns:
+            Sequence[float] | None: the weights, None if the words have no weight
+        """
+
+    @abc.abstractmethod
+    async def refresh(self, guild_id:str) -> Sequence[str]:
+        """return the words of a guild like get_words, the disk is accessed by the file I/O threads.
+        The list is read again if it was replaced since it was loaded, by this process or another one
+
+        Args:
+            guild_id (str): the guild id
+
+        Raises:
+            FileNotFoundError: if the guild has no word list
+            TimeoutError: if the disk took too long
+
+        Returns:
+            Sequence[str]: the words
+        """
+
+    @abc.abstractmethod
+    def replace(self, guild_id:str, words:Iterable[tuple[str, float | None]]):
+        """replace the word list of a guild, run it in a thread
+
+        Args:
+            guild_id (str): the guild id
+            words (Iterable[tuple[str, float | None]]): the words and their weight, read once
+        """
+
+    def count(self, guild_id:str) -> int:
+        return len(self.get_words(guild_id))
+
+    def sample(self, guild_id:str, k:int) -> list[str]:
+        return random.sample(self.get_words(guild_id), k)
+
+    def invalidate(self, guild_id:str):
+        """forget the cached words of a guild, called after replace"""
+        pass
+
+
+class FileGuildWordStore(GuildWordStore):
+    """the guild word lists stored in words/servers/{guild_id}_word_list.txt and read through the WordListRepository"""
+
+    def get_words(self, guild_id:str) -> Sequence[str]:
+        return get_word_list_repository().get_guild_list(guild_id)
+
+    def get_weights(self, guild_id:str) -> Sequence[float] | None:
+        return get_word_list_repository().get_weights(get_guild_list_path(guild_id))
+
+    async def refresh(self, guild_id:str) -> Sequence[str]:
+        return await get_word_list_repository().refresh(get_guild_list_path(guild_id))
+
+    def replace(self, guild_id:str, words:Iterable[tuple[str, float | None]]):
+        path = get_guild_list_path(guild_id)
+        write_words(path, words)
+        compile_list_file(path)
+
+    def invalidate(self, guild_id:str):
+        get_word_list_repository().invalidate(get_guild_list_path(guild_id))
+
+
+class SqliteGuildWordStore(GuildWordStore):
+    def __init__(self, path:str, batch_size:int=500) -> None:
+        """constructor of the SqliteGuildWordStore object.
+
+        Store the guild word lists in a SQLite database indexed by (guild_id, word),
+        the words of each guild are loaded once and kept until the list is replaced.
+        Each list has a version incremented by replace : refresh reads it again when another process sharing the database replaced it
+
+        Args:
+            path (str): the path of the database file
+            batch_size (int, optional): the number of words inserted by statement. Defaults to 500.
+        """
+        super(SqliteGuildWordStore, self).__init__()
+        self.path:str = path
+        self.batch_size:int = batch_size
+        # the connection is used by the file I/O threads, one at a time
+        self.lock:threading.Lock = threading.Lock()
+        self.connection:sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS guild_words ("
+                "guild_id TEXT NOT NULL, "
+                "word TEXT NOT NULL, "
+                "weight REAL, "
+                "PRIMARY KEY (guild_id, word))"
+            )
+            # databases created before the weights
+            columns = [column[1] for column in self.connection.execute("PRAGMA table_info(guild_words)")]
+            if "weight" not in columns:
+                self.connection.execute("ALTER TABLE guild_words ADD COLUMN weight REAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS guild_versions ("
+                "guild_id TEXT PRIMARY KEY, "
+                "version INTEGER NOT NULL)"
+            )
+        # guild_id -> words, in insertion order
+        self.words:dict[str, tuple[str, ...]] = {}
+        # guild_id -> weight of each word, only for the lists with weights
+        self.weights:dict[str, tuple[float, ...]] = {}
+        # guild_id -> version of the loaded words
+        self.versions:dict[str, int] = {}
+
+    def get_version(self, guild_id:str) -> int:
+        """return the version of the list of a guild in the database, 0 for the lists saved before the versions"""
+        with self.lock:
+            row = self.connection.execute("SELECT version FROM guild_versions WHERE guild_id = ?", (guild_id,)).fetchone()
+        return row[0] if row is not None else 0
+
+    def load(self, guild_id:str) -> tuple[tuple[str, ...], tuple[float, ...] | None, int]:
+        # the version is read first : a list replaced in between is read again by the next refresh
+        version = self.get_version(guild_id)
+        with self.lock:
+            rows = self.connection.execute("SELECT word, weight FROM guild_words WHERE guild_id = ? ORDER BY rowid", (guild_id,)).fetchall()
+        if len(rows) == 0:
+            raise FileNotFoundError(f"no word list for the guild {guild_id}")
+        words = tuple(word for (word, _) in rows)
+        if all(weight is None for (_, weight) in rows):
+            return (words, None, version)
+        return (words, tuple(weight if weight is not None else 1 for (_, weight) in rows), version)
+
+    def store(self, guild_id:str, loaded:tuple[tuple[str, ...], tuple[float, ...] | None, int]) -> tuple[str, ...]:
+        (words, weights, version) = loaded
+        # a concurrent refresh may have loaded it first : keep a single object per list
+        if guild_id in self.words and self.versions.get(guild_id) == version:
+            return self.words[guild_id]
+        self.words[guild_id] = words
+        self.versions[guild_id] = version
+        if weights is not None:
+            self.weights[guild_id] = weights
+        else:
+            self.weights.pop(guild_id, None)
+        return words
+
+    def get_words(self, guild_id:str) -> Sequence[str]:
+        words = self.words.get(guild_id)
+        if words is None:
+            words = self.store(guild_id, self.load(guild_id))
+        return words
+
+    def get_weights(self, guild_id:str) -> Sequence[float] | None:
+        return self.weights.get(guild_id)
+
+    async def refresh(self, guild_id:str) -> Sequence[str]:
+        words = self.words.get(guild_id)
+        if words is not None and self.versions.get(guild_id) == await get_file_io().run("guild_words_version", self.get_version, guild_id):
+            return words
+        return self.store(guild_id, await get_file_io().run("load_guild_words", self.load, guild_id))
+
+    def replace(self, guild_id:str, words:Iterable[tuple[str, float | None]]):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM guild_words WHERE guild_id = ?", (guild_id,))
+            batch:list[tuple[str, str, float | None]] = []
+            for (word, weight) in words:
+                batch.append((guild_id, word.upper(), weight))
+                if len(batch) >= self.batch_size:
+                    self.connection.executemany("INSERT OR IGNORE INTO guild_words (guild_id, word, weight) VALUES (?, ?, ?)", batch)
+                    batch = []
+            self.connection.executemany("INSERT OR IGNORE INTO guild_words (guild_id, word, weight) VALUES (?, ?, ?)", batch)
+            self.connection.execute(
+                "INSERT INTO guild_versions (guild_id, version) VALUES (?, 1) ON CONFLICT(guild_id) DO UPDATE SET version = version + 1", (guild_id,)
+            )
+
+    def count(self, guild_id:str) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM guild_words WHERE guild_id = ?", (guild_id,)).fetchone()[0]
+
+    def sample(self, guild_id:str, k:int) -> list[str]:
+        """draw k different words of a guild in the database, without loading its list
+
+        Args:
+            guild_id (str): the guild id
+            k (int): the number of words
+
+        Returns:
+            list[str]: the words, less than k if the list is too small
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT word FROM guild_words WHERE guild_id = ? ORDER BY RANDOM() LIMIT ?", (guild_id, k)).fetchall()
+        return [word for (word,) in rows]
+
+    def invalidate(self, guild_id:str):
+        self.words.pop(guild_id, None)
+        self.weights.pop(guild_id, None)
+        self.versions.pop(guild_id, None)
+
+    def import_list_files(self, servers_dir:str="words/servers") -> dict[str, int]:
+        """import the guild word list files in the database, the lists already in the database are replaced
+
+        Args:
+            servers_dir (str, optional): the directory of the guild word lists. Defaults to "words/servers".
+
+        Returns:
+            dict[str, int]: the number of words imported for each guild id
+        """
+        imported:dict[str, int] = {}
+        for path in sorted(glob.glob(os.path.join(servers_dir, "*_word_list.txt"))):
+            guild_id = os.path.basename(path)[:-len("_word_list.txt")]
+            (words, weights) = read_weighted_list_file(path)
+            self.replace(guild_id, zip(words, weights if weights is not None else [None] * len(words)))
+            self.invalidate(guild_id)
+            imported[guild_id] = self.count(guild_id)
+        return imported
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+GUILD_WORD_STORE:GuildWordStore | None = None
+
+def get_guild_word_store() -> GuildWordStore:
+    """return the store of the guild word lists set by the GUILD_WORD_STORE environment variable : "sqlite" or "file" (default).
+
+    The SQLite database is GUILD_WORD_DB, words/guild_words.db by default
+
+    Returns:
+        GuildWordStore: the shared store
+    """
+    global GUILD_WORD_STORE
+    if GUILD_WORD_STORE is None:
+        if os.getenv('GUILD_WORD_STORE') == "sqlite":
+            GUILD_WORD_STORE = SqliteGuildWordStore(os.getenv('GUILD_WORD_DB') or "words/guild_words.db")
+        else:
+            GUILD_WORD_STORE = FileGuildWordStore()
+    return GUILD_WORD_STORE
+
+
+if __name__ == "__main__":
+    # import the guild word list files in the database : python GuildWordStore.py [database path]
+    import sys
+    store = SqliteGuildWordStore(sys.argv[1] if len(sys.argv) > 1 else os.getenv('GUILD_WORD_DB') or "words/guild_words.db")
+    for (guild_id, count) in store.import_list_files().items():
+        print(f"{guild_id}: {count} words")
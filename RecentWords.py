@@ -0,0 +1,216 @@
+import os
+import time
+import random
+from array import array
+from collections import OrderedDict, deque
+from WordPool import WordPool, PoolKey
+
+
+class WordHistory(object):
+    def __init__(self, pool:WordPool, window:int) -> None:
+        """constructor of the WordHistory object, the words of the last games of a channel or a guild.
+
+        The words are stored as a bitset over the indexes of the pool, a game older than the window is forgotten
+
+        Args:
+            pool (WordPool): the pool the indexes refer to
+            window (int): the number of games remembered
+        """
+        super(WordHistory, self).__init__()
+        self.pool:WordPool = pool
+        self.bits:bytearray = bytearray((len(pool) + 7) // 8)
+        self.games:deque[array] = deque(maxlen=window)
+        self.last_used:float = time.monotonic()
+
+    def contains(self, index:int) -> bool:
+        return self.bits[index >> 3] & (1 << (index & 7)) != 0
+
+    def add_game(self, indexes:list[int]):
+        """remember the words of a game, forget the oldest game if the window is full
+
+        Args:
+            indexes (list[int]): the indexes of the words in the pool
+        """
+        if self.games.maxlen == 0:
+            return
+        if len(self.games) == self.games.maxlen:
+            for index in self.games[0]:
+                self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        game = array('I', indexes)
+        self.games.append(game)
+        for index in game:
+            self.bits[index >> 3] |= 1 << (index & 7)
+
+    def memory_usage(self) -> int:
+        return len(self.bits) + sum(game.itemsize * len(game) for game in self.games)
+
+
+class RecentWords(object):
+    def __init__(self, window:int=3, max_histories:int=10_000, idle_ttl:float=86_400) -> None:
+        """constructor of the RecentWords object.
+
+        Remember the words of the last games of each channel and guild so the next grids avoid them.
+        The least recently used histories are evicted when there are too many or when they are idle
+
+        Args:
+            window (int, optional): the number of games remembered by each history. Defaults to 3.
+            max_histories (int, optional): the maximum number of histories kept. Defaults to 10_000.
+            idle_ttl (float, optional): the number of seconds an unused history is kept. Defaults to 86_400.
+        """
+        super(RecentWords, self).__init__()
+        self.window:int = window
+        self.max_histories:int = max_histories
+        self.idle_ttl:float = idle_ttl
+        # (scope, pool key) -> history, least recently used first
+        self.histories:OrderedDict[tuple[str, PoolKey], WordHistory] = OrderedDict()
+
+        self.samples:int = 0
+        self.rejections:int = 0
+        self.fallbacks:int = 0
+        self.evictions:int = 0
+
+    @classmethod
+    def from_env(cls) -> "RecentWords":
+        """create a RecentWords configured with the RECENT_WORDS_WINDOW, RECENT_WORDS_MAX_HISTORIES and RECENT_WORDS_IDLE_TTL environment variables
+
+        Returns:
+            RecentWords: the recent words
+        """
+        window = os.getenv('RECENT_WORDS_WINDOW')
+        max_histories = os.getenv('RECENT_WORDS_MAX_HISTORIES')
+        idle_ttl = os.getenv('RECENT_WORDS_IDLE_TTL')
+        return cls(
+            window=int(window) if window != None and window.isnumeric() else 3,
+            max_histories=int(max_histories) if max_histories != None and max_histories.isnumeric() else 10_000,
+            idle_ttl=int(idle_ttl) if idle_ttl != None and idle_ttl.isnumeric() else 86_400
+        )
+
+    def get_history(self, scope:str, pool_key:PoolKey, pool:WordPool) -> WordHistory:
+        """return the history of a channel or a guild for a pool, a new history is created when the pool was rebuilt
+
+        Args:
+            scope (str): the channel or guild of the history
+            pool_key (PoolKey): the key of the pool in the WordPoolIndex
+            pool (WordPool): the pool
+
+        Returns:
+            WordHistory: the history
+        """
+        now = time.monotonic()
+        key = (scope, pool_key)
+        history = self.histories.pop(key, None)
+        if history is None or history.pool is not pool:
+            history = WordHistory(pool, self.window)
+        history.last_used = now
+        self.histories[key] = history
+        self.evict(now)
+        return history
+
+    def evict(self, now:float):
+        while len(self.histories) > 0:
+            (key, oldest) = next(iter(self.histories.items()))
+            if len(self.histories) <= self.max_histories and now - oldest.last_used <= self.idle_ttl:
+                return
+            self.histories.pop(key)
+            self.evictions += 1
+
+    def sample_indexes(self, pool:WordPool, pool_key:PoolKey, k:int, scopes:list[str], rng:random.Random | None = None) -> list[int]:
+        """draw k different words of a pool avoiding the recent words of the scopes, then remember them.
+
+        The words are drawn at random, according to their weight, and redrawn while they are recent : the cost depends on k and on the
+        proportion of recent words, bounded by the window. If the pool has too few words that are not recent,
+        the grid is completed with recent words
+
+        Args:
+            pool (WordPool): the pool
+            pool_key (PoolKey): the key of the pool in the WordPoolIndex
+            k (int): the number of words
+            scopes (list[str]): the channels and guilds whose recent words are avoided
+            rng (random.Random | None, optional): the random generator. Defaults to the random module.
+
+        Raises:
+            ValueError: if the pool has less than k words
+
+        Returns:
+            list[int]: the indexes of the words in the pool
+        """
+        if k > len(pool):
+            raise ValueError("sample larger than the pool")
+        rng = rng or random
+        histories = [self.get_history(scope, pool_key, pool) for scope in scopes]
+        size = len(pool)
+        chosen:list[int] = []
+        chosen_set:set[int] = set()
+
+        attempts = 0
+        max_attempts = 8*k + 32
+        while len(chosen) < k and attempts < max_attempts:
+            attempts += 1
+            index = pool.draw_index(rng)
+            if index in chosen_set or any(history.contains(index) for history in histories):
+                self.rejections += 1
+                continue
+            chosen.append(index)
+            chosen_set.add(index)
+
+        if len(chosen) < k:
+            # most of the pool is recent : scan it, complete with the words that are not recent then the recent ones
+            self.fallbacks += 1
+            available = [index for index in range(size) if index not in chosen_set and not any(history.contains(index) for history in histories)]
+            recent = [index for index in range(size) if index not in chosen_set and any(history.contains(index) for history in histories)]
+            for candidates in (available, recent):
+                missing = k - len(chosen)
+                chosen.extend(pool.weighted_sample(candidates, missing, rng))
+
+        for history in histories:
+            history.add_game(chosen)
+        self.samples += 1
+        return chosen
+
+    def sample(self, pool:WordPool, pool_key:PoolKey, k:int, scopes:list[str], rng:random.Random | None = None) -> list[str]:
+        """draw k different words of a pool avoiding the recent words of the scopes, see sample_indexes
+
+        Returns:
+            list[str]: the words
+        """
+        return [pool[index] for index in self.sample_indexes(pool, pool_key, k, scopes, rng)]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "histories": len(self.histories),
+            "size_bytes": sum(history.memory_usage() for history in self.histories.values()),
+            "samples": self.samples,
+            "rejections": self.rejections,
+            "fallbacks": self.fallbacks,
+            "evictions": self.evictions,
+        }
+
+
+RECENT_WORDS:RecentWords | None = None
+
+def get_recent_words() -> RecentWords:
+    """return the recent words shared by every game, created from the environment variables on first use
+
+    Returns:
+        RecentWords: the shared recent words
+    """
+    global RECENT_WORDS
+    if RECENT_WORDS is None:
+        RECENT_WORDS = RecentWords.from_env()
+    return RECENT_WORDS
+
+
+if __name__ == "__main__":
+    import timeit
+    from Language import Language
+
+    # the cost of a 7x7 grid after more and more games in the same channel
+    for size in (400, 10_000):
+        pool = WordPool((tuple(f"WORD{i}" for i in range(size)),))
+        pool_key:PoolKey = (Language.EN, True, None)
+        for window in (0, 3, 6):
+            recent_words = RecentWords(window=window)
+            print(f"{size} words, window {window}:")
+            for games in (1, 10, 100, 1000):
+                duration = timeit.timeit(lambda: recent_words.sample(pool, pool_key, 49, ["channel", "guild"]), number=games)
+                print(f"    next {games:>4} games: {duration/games*1_000_000:>7.1f}us per grid")
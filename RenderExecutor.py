@@ -0,0 +1,116 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+
+class RenderExecutor(object):
+    def __init__(self, workers:int, max_queued:int=64, timeout:float=20) -> None:
+        """constructor of the RenderExecutor object.
+
+        Run the CPU bound rendering functions in a pool of processes so the event loop is never blocked
+
+        Args:
+            workers (int): the number of render processes. 0 : the jobs are run in the current process
+            max_queued (int, optional): the number of jobs submitted at the same time, the next ones wait their turn. Defaults to 64.
+            timeout (float, optional): the number of seconds allowed to a job. Defaults to 20.
+        """
+        super(RenderExecutor, self).__init__()
+        self.workers:int = workers
+        self.max_queued:int = max_queued
+        self.timeout:float = timeout
+        self.pool:ProcessPoolExecutor | None = None
+        self.restarts:int = 0
+        # created on first use to be bound to the running event loop
+        self.queue_slots:asyncio.Semaphore | None = None
+
+    @classmethod
+    def from_env(cls) -> "RenderExecutor":
+        """create a RenderExecutor configured with the RENDER_WORKERS, RENDER_QUEUE_SIZE and RENDER_TIMEOUT environment variables
+
+        Returns:
+            RenderExecutor: the executor
+        """
+        workers = os.getenv('RENDER_WORKERS')
+        max_queued = os.getenv('RENDER_QUEUE_SIZE')
+        try:
+            # a timeout can have decimals, isnumeric would reject them
+            timeout = float(os.getenv('RENDER_TIMEOUT', ""))
+        except ValueError:
+            timeout = 20
+        return cls(
+            workers=int(workers) if workers != None and workers.isnumeric() else min(4, os.cpu_count() or 1),
+            max_queued=int(max_queued) if max_queued != None and max_queued.isnumeric() else 64,
+            timeout=timeout
+        )
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    def restart(self):
+        """stop every render process and create a new pool on the next job. Used after a crash or a timeout
+        """
+        if self.pool is None:
+            return
+        # a stuck process is never stopped by shutdown, kill it
+        for process in list(getattr(self.pool, "_processes", {}).values()):
+            process.terminate()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = None
+        self.restarts += 1
+
+    async def run(self, func:Callable[..., Any], *args:Any) -> Any:
+        """run a function in a render process and wait for its result without blocking the event loop
+
+        Args:
+            func (Callable[..., Any]): a picklable module level function
+            *args (Any): the picklable arguments of the function
+
+        Raises:
+            TimeoutError: if the job did not finish in time
+            BrokenProcessPool: if the job crashed the render process twice
+
+        Returns:
+            Any: the result of the function
+        """
+        if self.workers <= 0:
+            return func(*args)
+
+        if self.queue_slots is None:
+            self.queue_slots = asyncio.Semaphore(self.max_queued)
+
+        async with self.queue_slots:
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                try:
+                    return await asyncio.wait_for(loop.run_in_executor(self.get_pool(), func, *args), self.timeout)
+                except BrokenProcessPool:
+                    # a render process died, retry once in a new pool
+                    self.restart()
+                    if attempt > 0:
+                        raise
+                except asyncio.TimeoutError:
+                    self.restart()
+                    raise TimeoutError(f"render job {func.__name__} took more than {self.timeout}s")
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+
+
+RENDER_EXECUTOR:RenderExecutor | None = None
+
+def get_render_executor() -> RenderExecutor:
+    """return the executor shared by every game, created from the environment variables on first use
+
+    Returns:
+        RenderExecutor: the shared executor
+    """
+    global RENDER_EXECUTOR
+    if RENDER_EXECUTOR is None:
+        RENDER_EXECUTOR = RenderExecutor.from_env()
+    return RENDER_EXECUTOR
@@ -0,0 +1,79 @@
+import asyncio
+from BoardRenderer import BoardRenderer
+
+
+class RenderScheduler(object):
+    def __init__(self, renderer:BoardRenderer) -> None:
+        """constructor of the RenderScheduler object.
+
+        Run at most one render of a game at a time. Render requests made during a render are coalesced :
+        the next render draws the newest board state and satisfies every request made before it
+
+        Args:
+            renderer (BoardRenderer): the renderer of the game
+        """
+        super(RenderScheduler, self).__init__()
+        self.renderer:BoardRenderer = renderer
+        # newest board version requested and last board version rendered
+        self.requested_version:int = 0
+        self.rendered_version:int = 0
+        self.renders:int = 0
+        self.task:asyncio.Task | None = None
+        self.error:BaseException | None = None
+        # created on first use to be bound to the running event loop
+        self.condition:asyncio.Condition | None = None
+
+    def get_condition(self) -> asyncio.Condition:
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+        return self.condition
+
+    def request(self, version:int, force:bool=False):
+        """ask for a render of the board, start the render loop if no render is in progress
+
+        Args:
+            version (int): the board version to render
+            force (bool, optional): render even if this version was already rendered, used when a grid was evicted. Defaults to False.
+        """
+        if force:
+            self.rendered_version = min(self.rendered_version, version - 1)
+        self.requested_version = max(self.requested_version, version)
+        if self.task is None or self.task.done():
+            self.error = None
+            self.task = asyncio.get_running_loop().create_task(self.render_loop())
+
+    async def render_loop(self):
+        condition = self.get_condition()
+        while self.rendered_version < self.requested_version:
+            # the board is read before the first await of the render : the image is the one of this version
+            version = self.requested_version
+            try:
+                await self.renderer.render_views([False, True], version)
+                self.rendered_version = version
+                self.renders += 1
+            except Exception as e:
+                # the waiters of this version get the error, the next request will try again
+                self.error = e
+                async with condition:
+                    condition.notify_all()
+                return
+            async with condition:
+                condition.notify_all()
+
+    async def wait_for(self, version:int):
+        """wait until the board version, or a newer one, is rendered
+
+        Args:
+            version (int): the board version
+
+        Raises:
+            Exception: the error raised by the render of this version
+        """
+        condition = self.get_condition()
+        async with condition:
+            while self.rendered_version < version:
+                if self.task is None or self.task.done():
+                    self.request(version)
+                await condition.wait()
+                if self.error is not None and self.rendered_version < version:
+                    raise self.error
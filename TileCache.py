@@ -0,0 +1,102 @@
+import os
+from collections import OrderedDict
+from PIL import Image
+from ColorCard import ColorCard
+
+# (word, card_id, theme, color, guessed) : the view is not part of the key, a card looks the same in every view with the same visible state
+TileKey = tuple[str, int, str, ColorCard, bool]
+
+
+class TileCache(object):
+    def __init__(self, max_bytes:int) -> None:
+        """constructor of the TileCache object.
+
+        Keep the rendered cards shared by every game, the least recently used ones are evicted when the cache is full.
+        The cards are shared : they must not be drawn on
+
+        Args:
+            max_bytes (int): the maximum number of bytes of pixels kept in the cache
+        """
+        super(TileCache, self).__init__()
+        self.max_bytes:int = max_bytes
+        self.tiles:OrderedDict[TileKey, Image.Image] = OrderedDict()
+        self.size_bytes:int = 0
+
+        self.hits:int = 0
+        self.misses:int = 0
+        self.evictions:int = 0
+
+    @classmethod
+    def from_env(cls) -> "TileCache":
+        """create a TileCache configured with the TILE_CACHE_MAX_BYTES environment variable
+
+        Returns:
+            TileCache: the cache
+        """
+        max_bytes = os.getenv('TILE_CACHE_MAX_BYTES')
+        return cls(max_bytes=int(max_bytes) if max_bytes != None and max_bytes.isnumeric() else 64_000_000)
+
+    @staticmethod
+    def tile_size(tile:Image.Image) -> int:
+        return tile.width * tile.height * len(tile.getbands())
+
+    def get(self, key:TileKey) -> Image.Image | None:
+        """return a rendered card
+
+        Args:
+            key (TileKey): the (word, card_id, theme, color, guessed) of the card
+
+        Returns:
+            Image.Image | None: the card or None if it is not in the cache
+        """
+        tile = self.tiles.get(key)
+        if tile is None:
+            self.misses += 1
+            return None
+        self.tiles.move_to_end(key)
+        self.hits += 1
+        return tile
+
+    def put(self, key:TileKey, tile:Image.Image):
+        """add a rendered card to the cache, evict the least recently used cards if the cache is full
+
+        Args:
+            key (TileKey): the (word, card_id, theme, color, guessed) of the card
+            tile (Image.Image): the card
+        """
+        size = self.tile_size(tile)
+        if size > self.max_bytes:
+            return
+        previous = self.tiles.pop(key, None)
+        if previous is not None:
+            self.size_bytes -= self.tile_size(previous)
+        self.tiles[key] = tile
+        self.size_bytes += size
+
+        while self.size_bytes > self.max_bytes:
+            (_, evicted) = self.tiles.popitem(last=False)
+            self.size_bytes -= self.tile_size(evicted)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "tiles": len(self.tiles),
+            "size_bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+TILE_CACHE:TileCache | None = None
+
+def get_tile_cache() -> TileCache:
+    """return the cache shared by every game, created from the environment variables on first use
+
+    Returns:
+        TileCache: the shared cache
+    """
+    global TILE_CACHE
+    if TILE_CACHE is None:
+        TILE_CACHE = TileCache.from_env()
+    return TILE_CACHE
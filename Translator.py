@@ -2,6 +2,7 @@ from Game import Game, State
 import random
 from ColorCard import ColorCard
 from Language import Language
+from word_list import UploadReport
 
 def get_team_message(game:Game, color:ColorCard, withSpy:bool=True) -> str:
     """return the list of player in a specific team 
@@ -15,7 +16,7 @@ def get_team_message(game:Game, color:ColorCard, withSpy:bool=True) -> str:
         str: the list of player @ for discord uses, seperatded by commas
     """
     return (str(
-        [f"{random.choice([':detective:', ':man_detective:', ':woman_detective:']) if p.can_be_spy or p.isSpy else ''}<@{p.user.id}>" for p in game.teams[color] if withSpy or not p.isSpy])
+        [f"{random.choice([':detective:', ':man_detective:', ':woman_detective:']) if p.can_be_spy or p.isSpy else ''}<@{p.user_id}>" for p in game.get_team(color) if withSpy or not p.isSpy])
         .translate({ord('['):None, ord('\''):None, ord(']'):None}))
 
 
@@ -72,9 +73,9 @@ def starting_message(game:Game) -> str:
             # TODO set color emoji at the start of the sentence in every language.
 
             case Language.FR:
-                msg += f"\nESPION {team_color.display(language=language)} : <@{game.spies[team_color].user.id}>{'🔲 `COMMENCE`' if team_color == game.color_state else ''}"
+                msg += f"\nESPION {team_color.display(language=language)} : <@{game.spies[team_color].user_id}>{'🔲 `COMMENCE`' if team_color == game.color_state else ''}"
             case _:
-                msg += f"\n{team_color.display()} SPY: <@{game.spies[team_color].user.id}>{'🔲 `STARTS`' if team_color == game.color_state else ''}"
+                msg += f"\n{team_color.display()} SPY: <@{game.spies[team_color].user_id}>{'🔲 `STARTS`' if team_color == game.color_state else ''}"
                 
     return msg
 
@@ -85,9 +86,9 @@ def remaining_words_messages(game:Game) -> str:
         match language:
             case Language.FR:
                 # TODO set color emoji at the start of the sentence in every language.
-                msg += f"\nMots {tc.display(language=language)} restants : `{game.card_grid.remaining_words_count[tc]}`"
+                msg += f"\nMots {tc.display(language=language)} restants : `{game.card_grid.remaining_count(tc)}`"
             case _:
-                msg += f"\n{tc.display()} words remaining : `{game.card_grid.remaining_words_count[tc]}`"
+                msg += f"\n{tc.display()} words remaining : `{game.card_grid.remaining_count(tc)}`"
                 
     return msg
 
@@ -96,9 +97,9 @@ def spy_turn_message(game:Game) -> str:
     match language:
         case Language.FR:
             # TODO set color emoji at the start of the sentence in every language.
-            return f"Tour de l'ESPION {game.color_state.display(language=language)} : <@{game.spies[game.color_state].user.id}>\n`/display` pour afficher votre propre grille\n`/suggest` pour proposer un indice à votre équipe"
+            return f"Tour de l'ESPION {game.color_state.display(language=language)} : <@{game.spies[game.color_state].user_id}>\n`/display` pour afficher votre propre grille\n`/suggest` pour proposer un indice à votre équipe"
         case _:
-            return f"{game.color_state.display()} SPY's turn: <@{game.spies[game.color_state].user.id}>\n`/display` to see your own grid\n`/suggest` to suggest a hint to your teammates"
+            return f"{game.color_state.display()} SPY's turn: <@{game.spies[game.color_state].user_id}>\n`/display` to see your own grid\n`/suggest` to suggest a hint to your teammates"
 
 def state_message(game:Game) -> str:
 
@@ -183,3 +184,15 @@ def get_error_message(language:Language):
             return f"Une erreur est survenue. Réessayez."
         case _:
             return f"An error occured. Try again"
+
+def get_upload_report_message(report:UploadReport, max_word:int, language:Language):
+    match language:
+        case Language.FR:
+            msg = f"Liste de mots ajoutée : `{report.accepted}` mots acceptés dont `{report.in_default_list}` déjà dans la liste par défaut, `{report.rejected}` refusés, `{report.duplicated}` en double"
+            if report.truncated:
+                msg += f"\nSeuls les {max_word} premiers mots ont été gardés"
+        case _:
+            msg = f"Word list added: `{report.accepted}` words accepted including `{report.in_default_list}` also in the default list, `{report.rejected}` rejected, `{report.duplicated}` duplicated"
+            if report.truncated:
+                msg += f"\nOnly the first {max_word} words were kept"
+    return msg
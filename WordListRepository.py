@@ -0,0 +1,206 @@
+import os
+import time
+from typing import Sequence
+from Language import Language
+from CompiledWordList import CompiledWordList, get_compiled_path, deduplicate
+from word_list import read_weighted_list_file
+from FileIO import get_file_io
+
+
+def get_default_list_path(language:Language) -> str:
+    return f"words/{language.value}_word_list.txt"
+
+def get_guild_list_path(guild_id:str) -> str:
+    return f"words/servers/{guild_id}_word_list.txt"
+
+
+class WordListRepository(object):
+    def __init__(self, check_interval:float=5) -> None:
+        """constructor of the WordListRepository object.
+
+        Keep the normalized words of each list file, shared by every game.
+        The compiled file of a list is opened instead of the text file when it is up to date.
+        A list is read again when the modification time of its files changes,
+        the files are checked at most once every check_interval seconds
+
+        Args:
+            check_interval (float, optional): the minimum number of seconds between two checks of a file. Defaults to 5.
+        """
+        super(WordListRepository, self).__init__()
+        self.check_interval:float = check_interval
+        # path -> (modification times of the text and compiled files, time of the last check, words)
+        self.lists:dict[str, tuple[tuple[float, float | None], float, Sequence[str]]] = {}
+        # path -> weight of each word, only for the lists with weights
+        self.weights:dict[str, Sequence[float]] = {}
+
+        self.hits:int = 0
+        self.misses:int = 0
+        self.reloads:int = 0
+
+    @classmethod
+    def from_env(cls) -> "WordListRepository":
+        """create a WordListRepository configured with the WORD_LIST_CHECK_INTERVAL environment variable
+
+        Returns:
+            WordListRepository: the repository
+        """
+        check_interval = os.getenv('WORD_LIST_CHECK_INTERVAL')
+        return cls(check_interval=int(check_interval) if check_interval != None and check_interval.isnumeric() else 5)
+
+    def get_modification_times(self, path:str) -> tuple[float, float | None]:
+        """return the modification times of the text file and of the compiled file of a list
+
+        Args:
+            path (str): the path of the text file
+
+        Raises:
+            FileNotFoundError: if the text file does not exist
+
+        Returns:
+            tuple[float, float | None]: the modification times, None if the list is not compiled
+        """
+        mtime = os.stat(path).st_mtime
+        try:
+            compiled_mtime = os.stat(get_compiled_path(path)).st_mtime
+        except FileNotFoundError:
+            compiled_mtime = None
+        return (mtime, compiled_mtime)
+
+    def load(self, path:str, mtimes:tuple[float, float | None]) -> tuple[Sequence[str], Sequence[float] | None]:
+        (mtime, compiled_mtime) = mtimes
+        if compiled_mtime is not None and compiled_mtime >= mtime:
+            try:
+                words = CompiledWordList(get_compiled_path(path))
+                return (words, words.weights)
+            except ValueError as e:
+                # built by another version of the bot : read the text file
+                print(e)
+        return deduplicate(*read_weighted_list_file(path))
+
+    def store(self, path:str, mtimes:tuple[float, float | None], now:float, loaded:tuple[Sequence[str], Sequence[float] | None]) -> Sequence[str]:
+        (words, weights) = loaded
+        self.lists[path] = (mtimes, now, words)
+        if weights is not None:
+            self.weights[path] = weights
+        else:
+            self.weights.pop(path, None)
+        return words
+
+    def get_checked(self, path:str, now:float) -> Sequence[str] | None:
+        # the words of a list checked less than check_interval seconds ago
+        entry = self.lists.get(path)
+        if entry is None or now - entry[1] >= self.check_interval:
+            return None
+        self.hits += 1
+        return entry[2]
+
+    def get_unchanged(self, path:str, mtimes:tuple[float, float | None], now:float) -> Sequence[str] | None:
+        # the words of a list whose files did not change since it was read
+        entry = self.lists.get(path)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != mtimes:
+            self.reloads += 1
+            return None
+        self.lists[path] = (mtimes, now, entry[2])
+        self.hits += 1
+        return entry[2]
+
+    def get(self, path:str) -> Sequence[str]:
+        """return the normalized words of a list file, without duplicates.
+
+        The files are read in the event loop if the list is not up to date, see refresh
+
+        Args:
+            path (str): the path of the text file
+
+        Raises:
+            FileNotFoundError: if the file does not exist
+
+        Returns:
+            Sequence[str]: the words, shared by every game. The same object is returned while the list is unchanged
+        """
+        now = time.monotonic()
+        words = self.get_checked(path, now)
+        if words is not None:
+            return words
+        # the modification times are read before the files : a change during the read is seen at the next check
+        mtimes = self.get_modification_times(path)
+        words = self.get_unchanged(path, mtimes, now)
+        if words is None:
+            words = self.store(path, mtimes, now, self.load(path, mtimes))
+        return words
+
+    async def refresh(self, path:str) -> Sequence[str]:
+        """return the normalized words of a list file like get, the files are read by the file I/O threads
+
+        Args:
+            path (str): the path of the text file
+
+        Raises:
+            FileNotFoundError: if the file does not exist
+            TimeoutError: if the disk took too long
+
+        Returns:
+            Sequence[str]: the words, shared by every game. The same object is returned while the list is unchanged
+        """
+        now = time.monotonic()
+        words = self.get_checked(path, now)
+        if words is not None:
+            return words
+        file_io = get_file_io()
+        mtimes = await file_io.run("stat_word_list", self.get_modification_times, path)
+        words = self.get_unchanged(path, mtimes, now)
+        if words is None:
+            words = self.store(path, mtimes, now, await file_io.run("read_word_list", self.load, path, mtimes))
+        return words
+
+    def get_weights(self, path:str) -> Sequence[float] | None:
+        """return the weight of each word of a list read by get or refresh
+
+        Args:
+            path (str): the path of the text file
+
+        Returns:
+            Sequence[float] | None: the weights, None if the words have no weight
+        """
+        return self.weights.get(path)
+
+    def get_default_list(self, language:Language) -> Sequence[str]:
+        return self.get(get_default_list_path(language))
+
+    def get_guild_list(self, guild_id:str) -> Sequence[str]:
+        return self.get(get_guild_list_path(guild_id))
+
+    def invalidate(self, path:str):
+        """forget a list, the file is read again on next use. Called when a list file is replaced
+
+        Args:
+            path (str): the path of the file
+        """
+        self.lists.pop(path, None)
+        self.weights.pop(path, None)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "lists": len(self.lists),
+            "words": sum(len(words) for (_, _, words) in self.lists.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+        }
+
+
+WORD_LIST_REPOSITORY:WordListRepository | None = None
+
+def get_word_list_repository() -> WordListRepository:
+    """return the repository shared by every game, created from the environment variables on first use
+
+    Returns:
+        WordListRepository: the shared repository
+    """
+    global WORD_LIST_REPOSITORY
+    if WORD_LIST_REPOSITORY is None:
+        WORD_LIST_REPOSITORY = WordListRepository.from_env()
+    return WORD_LIST_REPOSITORY
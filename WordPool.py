@@ -0,0 +1,392 @@
+import random
+import heapq
+import hashlib
+from array import array
+from typing import Sequence
+from AliasTable import AliasTable
+from Language import Language
+from WordListRepository import get_word_list_repository, get_default_list_path
+from GuildWordStore import get_guild_word_store
+from CompiledWordList import CompiledWordList
+from FileIO import get_file_io
+
+# (language, default word list used, guild id of the guild word list or None)
+PoolKey = tuple[Language, bool, str | None]
+
+
+def get_list_digest(words:Sequence[str], weights:Sequence[float] | None) -> bytes:
+    """return the hash of a word list and its weights, a compiled list is hashed from its mapped file without decoding its words
+
+    Args:
+        words (Sequence[str]): the word list
+        weights (Sequence[float] | None): the weights of the words, None if they have no weight
+
+    Returns:
+        bytes: the hash
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    if isinstance(words, CompiledWordList):
+        # the file holds the words and the weights
+        digest.update(words.mmap)
+    else:
+        digest.update("\n".join(words).encode())
+        if weights is not None:
+            digest.update(array('d', weights).tobytes())
+    return digest.digest()
+
+
+class WordPool(object):
+    def __init__(self, sources:tuple[Sequence[str], ...], weights:tuple[Sequence[float] | None, ...] = (), base_table:AliasTable | None = None) -> None:
+        """constructor of the WordPool object, the words of several lists without duplicates.
+
+        The words are not copied : the pool keeps the lists and the index of the words
+        of the other lists missing from the first one.
+        If a list has weights, the words are drawn with a probability proportional to their weight through an alias table per list,
+        a duplicated word keeps the weight of its first list
+
+        Args:
+            sources (tuple[Sequence[str], ...]): the word lists merged, in order. The lists have no duplicate
+            weights (tuple[Sequence[float] | None, ...], optional): the weights of each list, None for a list without weight. Defaults to () : no weight.
+            base_table (AliasTable | None, optional): the alias table of the first list, reused from a previous pool. Defaults to None : built.
+        """
+        super(WordPool, self).__init__()
+        self.sources:tuple[Sequence[str], ...] = sources
+        self.weights:tuple[Sequence[float] | None, ...] = weights if len(weights) == len(sources) else (None,) * len(sources)
+        self.base:Sequence[str] = sources[0] if len(sources) > 0 else ()
+        # (list, index in the list) of the words missing from the first list, grouped by list
+        self.extra_sources:array = array('B')
+        self.extra_indexes:array = array('I')
+        # list -> (first extra, end of the extras) of the words it adds
+        extra_ranges:dict[int, tuple[int, int]] = {}
+        if len(sources) > 1:
+            # the first list may be a compiled list of 100k+ words : it is read once and only its words also in the other lists are kept
+            other_words:set[str] = set().union(*sources[1:])
+            seen = {word for word in self.base if word in other_words}
+            for (source_index, source) in enumerate(sources[1:], start=1):
+                start = len(self.extra_indexes)
+                for (index, word) in enumerate(source):
+                    if word not in seen:
+                        seen.add(word)
+                        self.extra_sources.append(source_index)
+                        self.extra_indexes.append(index)
+                extra_ranges[source_index] = (start, len(self.extra_indexes))
+
+        self.weighted:bool = any(source_weights is not None for source_weights in self.weights)
+        # (first pool index, alias table) of the words of each list
+        self.tables:list[tuple[int, AliasTable]] = []
+        if self.weighted:
+            self.tables.append((0, base_table if base_table is not None else AliasTable(self.weights[0], len(self.base))))
+            for (source_index, (start, end)) in extra_ranges.items():
+                source_weights = self.weights[source_index]
+                extra_weights = [source_weights[self.extra_indexes[j]] for j in range(start, end)] if source_weights is not None else None
+                self.tables.append((len(self.base) + start, AliasTable(extra_weights, end - start)))
+            self.tables = [(start, table) for (start, table) in self.tables if table.size > 0]
+        self.total_weight:float = sum(table.total for (_, table) in self.tables)
+        self._version:str | None = None
+
+    @property
+    def version(self) -> str:
+        """the hash of the lists and weights of the pool, computed on first use : two pools with the same version draw the same words with the same seed.
+        The pools of the grids are built by WordPoolIndex.refresh in the file I/O threads, with their version
+
+        Returns:
+            str: the hexadecimal hash
+        """
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=8)
+            for (source, source_weights) in zip(self.sources, self.weights):
+                digest.update(get_list_digest(source, source_weights))
+            self._version = digest.hexdigest()
+        return self._version
+
+    def is_built_from(self, sources:tuple[Sequence[str], ...]) -> bool:
+        """return if the pool is built from these lists, the repository and the guild word store return the same object while a list is unchanged
+
+        Args:
+            sources (tuple[Sequence[str], ...]): the word lists
+
+        Returns:
+            bool: True if the pool is up to date
+        """
+        return len(sources) == len(self.sources) and all(a is b for (a, b) in zip(sources, self.sources))
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.extra_indexes)
+
+    def __getitem__(self, index:int) -> str:
+        if index < len(self.base):
+            return self.base[index]
+        index -= len(self.base)
+        return self.sources[self.extra_sources[index]][self.extra_indexes[index]]
+
+    def weight(self, index:int) -> float:
+        """return the weight of a word of the pool, 1 if its list has no weight
+
+        Args:
+            index (int): the index of the word in the pool
+
+        Returns:
+            float: the weight
+        """
+        if index < len(self.base):
+            source_index = 0
+        else:
+            source_index = self.extra_sources[index - len(self.base)]
+            index = self.extra_indexes[index - len(self.base)]
+        source_weights = self.weights[source_index]
+        return source_weights[index] if source_weights is not None else 1
+
+    def draw_index(self, rng:random.Random | None = None) -> int:
+        """draw the index of a word with a probability proportional to its weight, in O(1)
+
+        Args:
+            rng (random.Random | None, optional): the random generator. Defaults to the random module.
+
+        Returns:
+            int: the index of the word in the pool, a word can be drawn again
+        """
+        rng = rng or random
+        if not self.weighted:
+            return rng.randrange(len(self))
+        # choose the list, then the word in the list
+        target = rng.random() * self.total_weight
+        for (start, table) in self.tables:
+            if target < table.total:
+                return start + table.draw(rng)
+            target -= table.total
+        (start, table) = self.tables[-1]
+        return start + table.draw(rng)
+
+    def weighted_sample(self, candidates:list[int], k:int, rng:random.Random | None = None) -> list[int]:
+        """draw k different indexes among candidates with a probability proportional to their weight, in O(len(candidates))
+
+        Args:
+            candidates (list[int]): the indexes of the words in the pool
+            k (int): the number of indexes
+            rng (random.Random | None, optional): the random generator. Defaults to the random module.
+
+        Returns:
+            list[int]: the indexes, all the candidates if there are less than k
+        """
+        rng = rng or random
+        if not self.weighted:
+            return rng.sample(candidates, min(k, len(candidates)))
+        # method of Efraimidis and Spirakis : keep the k largest random^(1/weight)
+        return heapq.nlargest(k, candidates, key=lambda index: rng.random() ** (1 / self.weight(index)))
+
+    def sample_indexes(self, k:int, rng:random.Random | None = None) -> list[int]:
+        """draw k different words, the cost only depends on k unless a few words have most of the weight
+
+        Args:
+            k (int): the number of words
+            rng (random.Random | None, optional): the random generator. Defaults to the random module.
+
+        Raises:
+            ValueError: if the pool has less than k words
+
+        Returns:
+            list[int]: the indexes of the words in the pool
+        """
+        rng = rng or random
+        if not self.weighted:
+            return rng.sample(range(len(self)), k)
+
+        if k > len(self):
+            raise ValueError("sample larger than the pool")
+        chosen:dict[int, None] = {}
+        attempts = 0
+        while len(chosen) < k and attempts < 8*k + 32:
+            attempts += 1
+            chosen[self.draw_index(rng)] = None
+        if len(chosen) < k:
+            # a few words have most of the weight : draw the others without alias table
+            candidates = [index for index in range(len(self)) if index not in chosen]
+            for index in self.weighted_sample(candidates, k - len(chosen), rng):
+                chosen[index] = None
+        return list(chosen)
+
+    def sample(self, k:int, rng:random.Random | None = None) -> list[str]:
+        """draw k different words, see sample_indexes
+
+        Returns:
+            list[str]: the words
+        """
+        return [self[i] for i in self.sample_indexes(k, rng)]
+
+
+class WordPoolIndex(object):
+    def __init__(self) -> None:
+        """constructor of the WordPoolIndex object.
+
+        Keep the merged word lists used to create the grids of each (language, default list, guild list),
+        a pool is only merged again when one of its lists changed. The pools are merged by refresh in the file I/O threads
+        """
+        super(WordPoolIndex, self).__init__()
+        self.pools:dict[PoolKey, WordPool] = {}
+        # id of a first list -> (list, alias table), shared by the pools starting with the same list
+        self.base_tables:dict[int, tuple[Sequence[str], AliasTable]] = {}
+
+        self.hits:int = 0
+        self.builds:int = 0
+        # builds made by get_pool in the event loop, without refresh
+        self.sync_builds:int = 0
+        self.table_reuses:int = 0
+
+    def get_pool(self, language:Language, default_word_list:bool, guild_id:str | None) -> WordPool:
+        """return the words available for a grid
+
+        Args:
+            language (Language): the language of the default word list
+            default_word_list (bool): True if the default word list of the language is used
+            guild_id (str | None): the guild id of the guild word list used, None if not used
+
+        Raises:
+            FileNotFoundError: if the word list of the guild does not exist
+
+        Returns:
+            WordPool: the pool
+        """
+        (sources, weights) = self.get_sources(language, default_word_list, guild_id)
+        key:PoolKey = (language, default_word_list, guild_id)
+        pool = self.pools.get(key)
+        if pool is not None and pool.is_built_from(sources):
+            self.hits += 1
+            return pool
+        # refresh was not called : the pool is merged in the event loop
+        self.sync_builds += 1
+        return self.add_pool(key, self.build(sources, weights, self.get_base_table(sources, weights)))
+
+    def get_sources(self, language:Language, default_word_list:bool, guild_id:str | None) -> tuple[tuple[Sequence[str], ...], tuple[Sequence[float] | None, ...]]:
+        # the lists of a pool and their weights, read by the repository and the guild word store
+        repository = get_word_list_repository()
+        sources:list[Sequence[str]] = []
+        weights:list[Sequence[float] | None] = []
+        if default_word_list:
+            sources.append(repository.get_default_list(language))
+            weights.append(repository.get_weights(get_default_list_path(language)))
+        if guild_id is not None:
+            store = get_guild_word_store()
+            sources.append(store.get_words(guild_id))
+            weights.append(store.get_weights(guild_id))
+        return (tuple(sources), tuple(weights))
+
+    def build(self, sources:tuple[Sequence[str], ...], weights:tuple[Sequence[float] | None, ...], base_table:AliasTable | None) -> WordPool:
+        """merge the lists of a pool and hash them, run it in a thread
+
+        Returns:
+            WordPool: the pool, with its version computed
+        """
+        pool = WordPool(sources, weights, base_table)
+        pool.version
+        return pool
+
+    def add_pool(self, key:PoolKey, pool:WordPool) -> WordPool:
+        self.builds += 1
+        self.pools[key] = pool
+        if pool.weighted and len(pool.base) > 0:
+            self.base_tables[id(pool.base)] = (pool.base, pool.tables[0][1])
+        return pool
+
+    def get_base_table(self, sources:tuple[Sequence[str], ...], weights:tuple[Sequence[float] | None, ...]) -> AliasTable | None:
+        """return the alias table of the first list of a pool if another pool already built it : a pool rebuilt
+        because its guild list changed keeps the table of the default list
+
+        Args:
+            sources (tuple[Sequence[str], ...]): the word lists of the pool
+            weights (tuple[Sequence[float] | None, ...]): the weights of each list
+
+        Returns:
+            AliasTable | None: the table, None if it must be built
+        """
+        if len(sources) == 0 or not any(source_weights is not None for source_weights in weights):
+            return None
+        # forget the tables of the lists no pool uses anymore
+        used = {id(pool.base) for pool in self.pools.values()}
+        for base_id in [base_id for base_id in self.base_tables if base_id not in used]:
+            self.base_tables.pop(base_id)
+        entry = self.base_tables.get(id(sources[0]))
+        if entry is None or entry[0] is not sources[0]:
+            return None
+        self.table_reuses += 1
+        return entry[1]
+
+    async def refresh(self, language:Language, default_word_list:bool, guild_id:str | None):
+        """read the lists of a pool that are not up to date and merge the pool with the file I/O threads,
+        the next get_pool does not access the disk and does not merge the lists in the event loop
+
+        Args:
+            language (Language): the language of the default word list
+            default_word_list (bool): True if the default word list of the language is used
+            guild_id (str | None): the guild id of the guild word list used, None if not used
+
+        Raises:
+            FileNotFoundError: if the word list of the guild does not exist
+            TimeoutError: if the disk took too long
+        """
+        repository = get_word_list_repository()
+        if default_word_list:
+            await repository.refresh(get_default_list_path(language))
+        if guild_id is not None:
+            await get_guild_word_store().refresh(guild_id)
+
+        (sources, weights) = self.get_sources(language, default_word_list, guild_id)
+        key:PoolKey = (language, default_word_list, guild_id)
+        pool = self.pools.get(key)
+        if pool is not None and pool.is_built_from(sources):
+            return
+        pool = await get_file_io().run("build_word_pool", self.build, sources, weights, self.get_base_table(sources, weights))
+        # a concurrent refresh may have built it first
+        current = self.pools.get(key)
+        if current is None or not current.is_built_from(sources):
+            self.add_pool(key, pool)
+
+    def invalidate_guild(self, guild_id:str):
+        """forget the pools using the word list of a guild
+
+        Args:
+            guild_id (str): the guild id
+        """
+        for key in [key for key in self.pools if key[2] == guild_id]:
+            self.pools.pop(key)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pools": len(self.pools),
+            "hits": self.hits,
+            "builds": self.builds,
+            "sync_builds": self.sync_builds,
+            "table_reuses": self.table_reuses,
+        }
+
+
+WORD_POOL_INDEX:WordPoolIndex | None = None
+
+def get_word_pool_index() -> WordPoolIndex:
+    """return the index shared by every game
+
+    Returns:
+        WordPoolIndex: the shared index
+    """
+    global WORD_POOL_INDEX
+    if WORD_POOL_INDEX is None:
+        WORD_POOL_INDEX = WordPoolIndex()
+    return WORD_POOL_INDEX
+
+
+if __name__ == "__main__":
+    import timeit
+
+    # a default list and a 1000 words guild list
+    default = tuple(f"WORD{i}" for i in range(400))
+    guild = tuple(f"GUILD{i}" for i in range(1000))
+    pool = WordPool((default, guild))
+    print(f"{len(pool)} words")
+    print(f"pool.sample(25): {timeit.timeit(lambda: pool.sample(25), number=10_000)*100:.1f}us")
+    print(f"merge + random.sample(25): {timeit.timeit(lambda: random.sample(list(dict.fromkeys(default + guild)), 25), number=10_000)*100:.1f}us")
+
+    # the same lists with weights : alias tables against random.choices over the cumulated weights
+    weights = (tuple(float(1 + i % 10) for i in range(len(default))), tuple(float(1 + i % 3) for i in range(len(guild))))
+    print(f"build the alias tables: {timeit.timeit(lambda: WordPool((default, guild), weights), number=100)*10_000:.1f}us")
+    pool = WordPool((default, guild), weights)
+    print(f"weighted pool.sample(25): {timeit.timeit(lambda: pool.sample(25), number=10_000)*100:.1f}us")
+    print(f"random.choices(25): {timeit.timeit(lambda: random.choices(default + guild, weights[0] + weights[1], k=25), number=10_000)*100:.1f}us")
@@ -1,126 +1,240 @@
 import unidecode
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 from ColorCard import ColorCard
 from CardGrid import CardGrid, GRID_SIZE
 from Language import Language
-import asyncio
-
-# Font used
-
-FONT = 'font/KeepCalm.ttf'
-
-
-# Height and width of cards
-CARD_HEIGHT = 430
-CARD_WIDTH = 660
-
-# padding around cards
-PADDING = 10
-
-
-IMAGE = Image.open('images/BASE.png')
-
-def addTextTo(img, text:str, card_id:int) -> Image.Image:
+import functools
+from typing import Iterable
+from CardAssets import get_card_assets
+
+# number of word and card number masks kept by each process
+TEXT_MASK_CACHE_SIZE = 4096
+
+# color of the texts drawn on the cards
+WORD_COLOR = (0, 0, 0, 255)
+CARD_ID_COLOR = (90, 90, 90, 255)
+
+def drawTextMask(text:str, position:tuple[float, float], theme:str) -> tuple[Image.Image, tuple[int, int]]:
+    """draw a text on a transparent mask of the card size and crop it
+
+    Args:
+        text (str): the text to draw
+        position (tuple[float, float]): the coordinates of the text in the card
+        theme (str): the theme of the card
+
+    Returns:
+        tuple[Image.Image, tuple[int, int]]: the cropped 'L' mask and its coordinates in the card
+    """
+    assets = get_card_assets(theme)
+    mask = Image.new('L', (assets.card_width, assets.card_height), 0)
+    ImageDraw.Draw(mask).text(position, text, font=assets.font, fill=255)
+    box = mask.getbbox()
+    if box is None:
+        return (Image.new('L', (0, 0)), (0, 0))
+    return (mask.crop(box), (box[0], box[1]))
+
+@functools.lru_cache(maxsize=TEXT_MASK_CACHE_SIZE)
+def getWordMask(text:str, theme:str="default") -> tuple[Image.Image, tuple[int, int]]:
+    """return the mask of a word centered on a card, rendered once per process
+
+    Args:
+        text (str): the word
+        theme (str, optional): the theme of the card. Defaults to "default".
+
+    Returns:
+        tuple[Image.Image, tuple[int, int]]: the cropped 'L' mask and its coordinates in the card
+    """
     # remove or replace special characters
     text_u = unidecode.unidecode(text).upper()
-    card_id_str = f"#{card_id}"
-
-    # create a drawing interface to add text
-    draw = ImageDraw.Draw(img)
-
-    # select the font
-    font = ImageFont.truetype(FONT, 75)
 
     # get the text height and width
-    _, top, _, bottom = draw.textbbox((0, 0), text_u, font)
+    draw = ImageDraw.Draw(Image.new('L', (0, 0)))
+    assets = get_card_assets(theme)
+    _, top, _, bottom = draw.textbbox((0, 0), text_u, assets.font)
     text_height = bottom - top
-    text_width = draw.textlength(text_u, font)
-
-    # place the word text and draw it on the card
-    x_text = (CARD_WIDTH - text_width) / 2
-    y_text = (CARD_HEIGHT) / 2 + text_height - 4
-    draw.text((x_text, y_text), text_u, font=font, fill=(0, 0, 0, 255))
-
-
-    # place the card_id text and draw it on the card
-    
-    x_card_id = 70
-    y_card_id = 120
-    draw.text((x_card_id, y_card_id), card_id_str, font=font, fill=(90, 90, 90, 255))
+    text_width = draw.textlength(text_u, assets.font)
+
+    # place the word text in the card
+    x_text = (assets.card_width - text_width) / 2
+    y_text = (assets.card_height) / 2 + text_height - assets.scaled(4)
+    return drawTextMask(text_u, (x_text, y_text), theme)
+
+@functools.lru_cache(maxsize=TEXT_MASK_CACHE_SIZE)
+def getCardIdMask(card_id:int, theme:str="default") -> tuple[Image.Image, tuple[int, int]]:
+    """return the mask of a card number, rendered once per process
+
+    Args:
+        card_id (int): the number of the card
+        theme (str, optional): the theme of the card. Defaults to "default".
+
+    Returns:
+        tuple[Image.Image, tuple[int, int]]: the cropped 'L' mask and its coordinates in the card
+    """
+    assets = get_card_assets(theme)
+    x_card_id = assets.scaled(70)
+    y_card_id = assets.scaled(120)
+    return drawTextMask(f"#{card_id}", (x_card_id, y_card_id), theme)
+
+def warmUpTextMasks(words:Iterable[str], theme:str="default"):
+    """render the masks of words before the first games, the processes created after share them
+
+    Args:
+        words (Iterable[str]): the words to render
+        theme (str, optional): the theme of the cards. Defaults to "default".
+    """
+    for word in words:
+        getWordMask(word, theme)
+
+def addTextTo(img, text:str, card_id:int, theme:str="default") -> Image.Image:
+    # draw the word and the card_id on the card through their masks
+    (word_mask, word_position) = getWordMask(text, theme)
+    img.paste(WORD_COLOR, word_position, word_mask)
+
+    (card_id_mask, card_id_position) = getCardIdMask(card_id, theme)
+    img.paste(CARD_ID_COLOR, card_id_position, card_id_mask)
 
     return img
 
 
 
-def getImageColored(img: Image.Image, color: ColorCard, guessed:bool, isSpy:bool=False) -> Image.Image:
-    # get the value of the color, used in files like "RED_GUESS.png"
-    color_name = color.value
-
+def getImageColored(img: Image.Image, color: ColorCard, guessed:bool, isSpy:bool=False, theme:str="default") -> Image.Image:
     # create a transparent canvas with img size and paste img
     canvas:Image.Image = Image.new('RGBA', img.size, (0, 0, 0, 0))
     canvas.paste(img, (0, 0))
 
+    assets = get_card_assets(theme)
     if isSpy and not guessed:
         if color != ColorCard.WHITE:
-            img2 = Image.open(f'images/{color_name}.png')
-            canvas.paste(img2, (0, 0), img2)
+            overlay = assets.overlays[color]
+            canvas.paste(overlay, (0, 0), overlay)
 
     elif guessed:
         # white base is equal to BASE.png so nothing to add
         if color != ColorCard.WHITE:
-            img2 = Image.open(f'images/{color_name}.png')
-            canvas.paste(img2, (0, 0), img2)
+            overlay = assets.overlays[color]
+            canvas.paste(overlay, (0, 0), overlay)
         # black does not exist because when it is guessed the party is finished
         if color != ColorCard.BLACK:
-            img3 = Image.open(f'images/{color_name}_GUESS.png')
-            canvas.paste(img3, (0, 0), img3)
+            guess_overlay = assets.guess_overlays[color]
+            canvas.paste(guess_overlay, (0, 0), guess_overlay)
 
     return canvas
 
 
 
-async def generateGrid(card_grid:CardGrid, isSpy:bool, channel_id:str):
-    # height and width of the final grid
-    height: int = (CARD_HEIGHT + PADDING) * card_grid.grid_size
-    width: int = (CARD_WIDTH + PADDING) * card_grid.grid_size
+def generateTileViews(word:str, card_id:int, states:list[tuple[ColorCard, bool]], theme:str="default") -> list[Image.Image]:
+    """render the same card in several visible states, the text layer is drawn once and shared by every state
 
-    # Créer une image noire
-    canvas:Image.Image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    Args:
+        word (str): the word of the card
+        card_id (int): the number displayed on the card
+        states (list[tuple[ColorCard, bool]]): the visible (color, guessed) states, a white unguessed card looks the same in both views
+        theme (str, optional): the theme of the card. Defaults to "default".
 
-    # Loop on the 25 cards
-    for i in range(card_grid.grid_size):
-        for j in range(card_grid.grid_size):
-            image = IMAGE.copy()
-            card = card_grid.card_list[i][j]
+    Returns:
+        list[Image.Image]: the card with transparent corners in each state, in the same order
+    """
+    # the shared base card is copied before drawing on it
+    image = get_card_assets(theme).base.copy()
 
-            # get the coordinates of the image in the grid
-            x = j * (CARD_WIDTH + PADDING)
-            y = i * (CARD_HEIGHT + PADDING)
+    # add text to the image
+    img_with_text:Image.Image = addTextTo(image, word, card_id=card_id, theme=theme)
 
-            # add text to the image
-            
-            img_with_text:Image.Image = addTextTo(image, card.word, card_id=(i*card_grid.grid_size+j+1))
+    tiles:list[Image.Image] = []
+    for (color, guessed) in states:
+        # add the layer depending on the color and guessed state, the visible color of an unguessed card is only shown to spies
+        img_with_color:Image.Image = getImageColored(img_with_text, color=color, guessed=guessed, isSpy=True, theme=theme)
 
-            # add the layer depending on the color, guessed state and isSpy booleans
+        # cut the card on a transparent background using the base card as mask
+        tile:Image.Image = Image.new('RGBA', image.size, (0, 0, 0, 0))
+        tile.paste(img_with_color, (0, 0), img_with_text)
+        tiles.append(tile)
+    return tiles
 
-            img_with_color:Image.Image = getImageColored(img_with_text, color=card.color, guessed=card.guessed, isSpy=isSpy)
-            
-            # paste the card to the canvas grid
-            canvas.paste(img_with_color, (x, y), image)
 
+def generateTile(word:str, card_id:int, color:ColorCard, guessed:bool, isSpy:bool=False, theme:str="default") -> Image.Image:
+    """render a single card of the grid at the output resolution of the theme
 
-    c:Image.Image = canvas.reduce(2)
-    c.save(f"render/{channel_id}{'_SPY' if isSpy else '_PLAYER'}.png")
+    Args:
+        word (str): the word of the card
+        card_id (int): the number displayed on the card
+        color (ColorCard): the color of the card
+        guessed (bool): True if the card has been guessed
+        isSpy (bool, optional): True to render the card for the spies. Defaults to False.
+        theme (str, optional): the theme of the card. Defaults to "default".
+
+    Returns:
+        Image.Image: the card with transparent corners
+    """
+    # unguessed cards all look white for the players
+    visible_color = color if isSpy or guessed else ColorCard.WHITE
+    return generateTileViews(word, card_id, [(visible_color, guessed)], theme)[0]
+
+
+def generateTiles(tiles:list[tuple[str, int, list[tuple[ColorCard, bool]], str]]) -> list[list[Image.Image]]:
+    """render several cards in several states, used to send a batch of cards to a render process
+
+    Args:
+        tiles (list[tuple[str, int, list[tuple[ColorCard, bool]], str]]): the (word, card_id, states, theme) of each card
+
+    Returns:
+        list[list[Image.Image]]: the cards in each of their states, in the same order
+    """
+    return [generateTileViews(*tile) for tile in tiles]
+
+
+def getTilePosition(index:int, grid_size:int, theme:str="default") -> tuple[int, int]:
+    """return the coordinates of a card in the output grid
+
+    Args:
+        index (int): the index of the card in the grid (card_id - 1)
+        grid_size (int): the number of cards on a row
+        theme (str, optional): the theme of the grid. Defaults to "default".
+
+    Returns:
+        tuple[int, int]: the (x, y) coordinates of the top left corner of the card
+    """
+    assets = get_card_assets(theme)
+    i = index // grid_size
+    j = index % grid_size
+    return (j * (assets.card_width + assets.padding), i * (assets.card_height + assets.padding))
+
+
+def newCanvas(grid_size:int, theme:str="default") -> Image.Image:
+    """create an empty transparent canvas at the output resolution
+
+    Args:
+        grid_size (int): the number of cards on a row
+        theme (str, optional): the theme of the grid. Defaults to "default".
+
+    Returns:
+        Image.Image: the transparent canvas
+    """
+    assets = get_card_assets(theme)
+    # height and width of the final grid
+    height: int = (assets.card_height + assets.padding) * grid_size
+    width: int = (assets.card_width + assets.padding) * grid_size
+    return Image.new('RGBA', (width, height), (0, 0, 0, 0))
 
 
 
 if __name__ == "__main__":
-    cardGrid = CardGrid(language=Language.FR, starting_team_color=ColorCard.BLUE, team_list=[ColorCard.BLUE, ColorCard.RED, ColorCard.GREEN, ColorCard.YELLOW])
-    cardGrid.card_list[0][0].guessed = True
-    cardGrid.card_list[3][2].guessed = True
-    cardGrid.card_list[0][4].guessed = True
-    cardGrid.card_list[3][0].guessed = True
-    cardGrid.card_list[2][0].guessed = True
-    cardGrid.card_list[0][0].guessed = True
-    cardGrid.card_list[0][0].guessed = True
-    asyncio.run(generateGrid(cardGrid, isSpy=False, channel_id="123456789"))
+    # render a grid with guessed cards in a temporary file : python grid_generator.py
+    import asyncio
+    import tempfile
+    import GridEncoder
+    from BoardRenderer import BoardRenderer
+
+    async def render_example() -> str:
+        cardGrid = CardGrid(language=Language.FR, starting_team_color=ColorCard.BLUE, team_list=[ColorCard.BLUE, ColorCard.RED, ColorCard.GREEN, ColorCard.YELLOW])
+        for card_id in [1, 18, 5, 16, 11]:
+            word = cardGrid.get_word_by_number(card_id)
+            # the cards of several words can not be guessed by their first word
+            if " " not in word:
+                cardGrid.guess(word)
+        data = await BoardRenderer(cardGrid, "123456789").render(isSpy=False)
+        with tempfile.NamedTemporaryFile(suffix=f".{GridEncoder.get_extension()}", delete=False) as f:
+            f.write(data)
+        return f.name
+
+    print(asyncio.run(render_example()))
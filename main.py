@@ -2,6 +2,7 @@ import interactions
 import os
 from dotenv import load_dotenv
 from GameList import GameList
+from GameStore import get_game_store
 from Language import Language
 from ColorCard import ColorCard
 from CodeGameExceptions import *
@@ -11,8 +12,18 @@ import CodeNamesModal as CNTextInput
 from CodeNamesButton import CodeNamesButton
 from Creator import Creator
 import io
-from word_list import write_list_file
+import sqlite3
+from word_list import parse_upload, UploadReport
+from WordListRepository import get_word_list_repository, get_default_list_path
+from WordPool import get_word_pool_index
+from GuildWordStore import get_guild_word_store
+from FileIO import get_file_io
 import Translator
+from CardAssets import get_card_assets
+import grid_generator
+from BoardRenderer import get_view_themes
+import GridEncoder
+from AttachmentCache import get_attachment_cache
 
 load_dotenv()
 
@@ -22,7 +33,26 @@ GUILD_ID = int(GUILD_ID) if GUILD_ID != None and GUILD_ID.isnumeric() else None
 
 bot = interactions.Client(token=BOT_TOKEN, default_scope=GUILD_ID)#, presence=interactions.ClientPresence(status=interactions.StatusType.INVISIBLE))
 
-GAME_LIST = GameList()
+# the games are saved in GAME_DB and restored after a restart
+GAME_LIST = GameList(get_game_store())
+
+# limits of the uploaded word lists
+UPLOAD_MAX_BYTES = os.getenv('UPLOAD_MAX_BYTES')
+UPLOAD_MAX_BYTES = int(UPLOAD_MAX_BYTES) if UPLOAD_MAX_BYTES != None and UPLOAD_MAX_BYTES.isnumeric() else 200_000
+UPLOAD_MAX_WORDS = os.getenv('UPLOAD_MAX_WORDS')
+UPLOAD_MAX_WORDS = int(UPLOAD_MAX_WORDS) if UPLOAD_MAX_WORDS != None and UPLOAD_MAX_WORDS.isnumeric() else 10_000
+
+# decode the card images once, before the render processes are created so they share them
+for theme in set(get_view_themes().values()):
+    card_assets = get_card_assets(theme)
+    print(f"Card assets loaded ({theme}): {card_assets.memory_usage()/1_000_000:.1f}MB")
+
+# render the words of the default lists before the first games
+if os.getenv('WARM_UP_TILES') in ("1", "true", "True"):
+    for theme in set(get_view_themes().values()):
+        for lang in Language:
+            grid_generator.warmUpTextMasks(get_word_list_repository().get_default_list(lang), theme)
+    print(f"Word tiles warmed up: {grid_generator.getWordMask.cache_info().currsize} words")
 
 
 
@@ -47,6 +77,25 @@ async def test(ctx: interactions.CommandContext):
 
 
 
+def grid_file(data:bytes, encoder:str) -> interactions.File:
+    """wrap an encoded grid in a discord file sent from memory, named after the encoder that produced it"""
+    return interactions.File(filename=f"grid.{GridEncoder.get_extension(encoder)}", fp=io.BytesIO(data))
+
+async def send_grid(ctx:interactions.CommandContext, game:Game, isSpy:bool, content:str | None = None, **kwargs) -> interactions.Message:
+    """send a message with the grid of the game, a grid already sent is displayed from its discord url instead of being uploaded again"""
+    attachment_cache = get_attachment_cache()
+    url = attachment_cache.get(game.get_image_hash(isSpy))
+    if url is not None:
+        embed = interactions.Embed()
+        embed.set_image(url=url)
+        return await ctx.send(content, embeds=embed, **kwargs)
+
+    (data, state_hash) = await game.get_image_and_hash(isSpy) # can raise GameNotStarted, RenderFailed
+    message = await ctx.send(content, files=grid_file(data, game.renderer.encoder), **kwargs)
+    attachments = message.attachments if message is not None else None
+    attachment_cache.put(state_hash, attachments[0].url if attachments else None)
+    return message
+
 async def send_modal(ctx:interactions.CommandContext, game:Game):
     modal = CNTextInput.state_modal(game)
     if modal is None:
@@ -78,20 +127,15 @@ async def display(ctx: interactions.CommandContext):
     """Display the grid depending on your role"""
     try:
         game = await GAME_LIST.get_game(str(ctx.channel_id), language=Language.get_discord_equivalent(ctx.locale))
-        image = interactions.File(game.get_user_image_path(ctx.user))
-        await ctx.send(files=image, ephemeral=True)
-    except (GameNotFound, GameNotStarted, NotInGame, FileNotFoundError) as e:
-        if isinstance(e, FileNotFoundError):
-            message = Translator.get_error_message(language=Language.get_discord_equivalent(ctx.locale))
-        else :
-            message = e.message
-        await ctx.send(message, ephemeral=True)
+        await send_grid(ctx, game, game.get_user_view(ctx.user), ephemeral=True)
+    except (GameNotFound, GameNotStarted, NotInGame, RenderFailed) as e:
+        await ctx.send(e.message, ephemeral=True)
 
 @bot.component(CodeNamesButton.SPY_BUTTON.value)
 async def spy(ctx: interactions.ComponentContext):
     try:
         game = await GAME_LIST.get_game(str(ctx.channel_id), language=Language.get_discord_equivalent(ctx.locale))
-        game.invert_can_be_spy(user=ctx.user)
+        await game.actor.submit("invert_can_be_spy", game.invert_can_be_spy, user=ctx.user)
 
         if ctx.message is None:
             await ctx.send(Translator.get_error_message(language=game.language))
@@ -104,7 +148,7 @@ async def spy(ctx: interactions.ComponentContext):
         )
         await ctx.edit(ctx.message.content)
 
-    except (GameNotFound, NotInGame, GameAlreadyStarted) as e:
+    except (GameNotFound, GameBusy, NotInGame, GameAlreadyStarted) as e:
         await ctx.send(e.message, ephemeral=True)
 
 
@@ -182,7 +226,7 @@ async def join_team(
     color = ColorCard.get_by_string(color_string=team)
     try:
         game:Game = await GAME_LIST.get_game(str(ctx.channel_id), language=Language.get_discord_equivalent(ctx.locale))
-        await game.join(ctx.user, team_color=color, can_be_spy=spy)
+        await game.actor.submit("join", game.join, ctx.user, team_color=color, can_be_spy=spy)
         if message is None:
             await ctx.send(Translator.get_joined_message(ctx.user.username, color, language=game.language))
             return
@@ -198,7 +242,7 @@ async def join_team(
             return
         await ctx.edit(ctx.message.content)
 
-    except (GameNotFound, GameAlreadyStarted, TeamNotAvailable) as e:
+    except (GameNotFound, GameBusy, GameAlreadyStarted, TeamNotAvailable) as e:
         await ctx.send(e.message, ephemeral=True)
 
 
@@ -265,7 +309,7 @@ async def leave(ctx: interactions.CommandContext):
     """leave a game that did not start"""
     try:
         game:Game = await GAME_LIST.get_game(str(ctx.channel_id), language=Language.get_discord_equivalent(ctx.locale))
-        await game.leave(ctx.user)
+        await game.actor.submit("leave", game.leave, ctx.user)
         if(ctx.message != None):
             await ctx.message.edit(
                 content=Translator.get_create_message(game), 
@@ -275,7 +319,7 @@ async def leave(ctx: interactions.CommandContext):
             await ctx.send(Translator.get_global_left_message(language=game.language), ephemeral=True)
         else:
             await ctx.send(Translator.get_left_message(ctx.user.username, language=game.language))
-    except (GameNotFound, NotInGame, GameAlreadyStarted) as e:
+    except (GameNotFound, GameBusy, NotInGame, GameAlreadyStarted) as e:
         await ctx.send(e.message, ephemeral=True)
 
 
@@ -286,17 +330,17 @@ async def start(ctx: interactions.CommandContext):
     """Start the game of Code Names"""
     try:
         game = await GAME_LIST.get_game(str(ctx.channel_id), language=Language.get_discord_equivalent(ctx.locale))
-        await game.start(str(ctx.user.id))
-        image = interactions.File(game.get_image_path())
-        await ctx.send(f"\n{Translator.starting_message(game)}\
+        await game.actor.submit("start", game.start, str(ctx.user.id))
+        # the render is awaited outside of the actor, the next commands of the game do not wait for it
+        await game.wait_for_render(game.board_version)
+        await send_grid(ctx, game, False, f"\n{Translator.starting_message(game)}\
                        \n\
                        \n{Translator.state_message(game)}",
                     components=CNButton.state_component(game),
-                    files=image,
-                    allowed_mentions=interactions.AllowedMentions(users=[int(game.spies[game.color_state].user.id)])
+                    allowed_mentions=interactions.AllowedMentions(users=[game.spies[game.color_state].user_id])
         )
         # await ctx.send(state_message(game), components=state_component(game))
-    except (GameNotFound, NotGameCreator, GameAlreadyStarted, NotEnoughPlayerInTeam) as e:
+    except (GameNotFound, GameBusy, NotGameCreator, GameAlreadyStarted, NotEnoughPlayerInTeam, RenderFailed) as e:
         await ctx.send(e.message, ephemeral=True)
 
 
@@ -308,11 +352,11 @@ async def suggest(ctx: interactions.CommandContext, hint:str, number_of_try:int)
     """Suggest a hint to help your team to guess words. Provide also a number of try"""
     try:
         game = await GAME_LIST.get_game(str(ctx.channel_id), language=Language.get_discord_equivalent(ctx.locale))
-        await game.suggest(ctx.user, hint, number_of_try)
+        await game.actor.submit("suggest", game.suggest, ctx.user, hint, number_of_try)
 
         await ctx.send(Translator.state_message(game), components=CNButton.state_component(game))
 
-    except (GameNotFound, GameNotStarted, NotInGame, NotYourRole, NotYourTurn, WrongHintNumberGiven, WordInGrid) as e:
+    except (GameNotFound, GameBusy, GameNotStarted, NotInGame, NotYourRole, NotYourTurn, WrongHintNumberGiven, WordInGrid) as e:
         await ctx.send(e.message, ephemeral=True)
 
 
@@ -340,26 +384,26 @@ async def guess_by_func(ctx: interactions.CommandContext, word:str | None = None
     try:
         game = await GAME_LIST.get_game(str(ctx.channel_id), language=Language.get_discord_equivalent(ctx.locale))
         if word == None and card_id != None:
-            (card_color, word_found) = await game.guess_by_card_id(ctx.user, card_id)
+            (card_color, word_found) = await game.actor.submit("guess", game.guess_by_card_id, ctx.user, card_id)
         elif word != None and card_id == None:
-            (card_color, word_found) = await game.guess_by_word(ctx.user, word)
+            (card_color, word_found) = await game.actor.submit("guess", game.guess_by_word, ctx.user, word)
         else:
             # can't happen
             await ctx.send(Translator.get_error_message(language=game.language))
             return
-        image = interactions.File(game.get_image_path(isSpy=(game.state== State.WIN)))
-        await ctx.send(f"{Translator.get_revealed_word_message(word_found, card_color, language=game.language)}\
+        # the renders of a burst of guesses are merged, this waits for the render of this guess or a newer board
+        await game.wait_for_render(game.board_version)
+        await send_grid(ctx, game, game.state == State.WIN, f"{Translator.get_revealed_word_message(word_found, card_color, language=game.language)}\
                        \n\
                        {Translator.remaining_words_messages(game)}\
                        \n\
                        \n{Translator.state_message(game)}",
-                       files=image, 
                        components=CNButton.state_component(game)
         )
         if game.state == State.WIN:
             await GAME_LIST.delete_game(game.channel_id, language=Language.get_discord_equivalent(ctx.locale))
 
-    except (GameNotFound, GameNotStarted, NotInGame, NotYourRole, NotYourTurn, WordNotInGrid, WrongCardIdNumberGiven) as e:
+    except (GameNotFound, GameBusy, GameNotStarted, NotInGame, NotYourRole, NotYourTurn, WordNotInGrid, WrongCardIdNumberGiven, RenderFailed) as e:
         await ctx.send(e.message, ephemeral=True)
 
 @bot.command()
@@ -368,33 +412,49 @@ async def skip(ctx: interactions.CommandContext):
     """End the player turn if at least one word is proposed"""
     try:
         game = await GAME_LIST.get_game(str(ctx.channel_id), language=Language.get_discord_equivalent(ctx.locale))
-        await game.skip(ctx.user)
+        await game.actor.submit("skip", game.skip, ctx.user)
         await ctx.send(f"{Translator.get_skipped_message(player_name=ctx.user.username, language=game.language)}\
                        \n\
                        \n{Translator.state_message(game)}", components=CNButton.state_component(game))
-    except (GameNotFound, GameNotStarted, NotInGame, NotYourRole, NotYourTurn, NoWordGuessed) as e:
+    except (GameNotFound, GameBusy, GameNotStarted, NotInGame, NotYourRole, NotYourTurn, NoWordGuessed) as e:
         await ctx.send(e.message, ephemeral=True)
 
 
 @bot.command() # type: ignore
 @interactions.option(
-    description=".txt with alphanumerical or `-` characters. 1 word (<12 char) per line, 1000 words max, no duplicate",
+    description=".txt with alphanumerical or `-` characters. 1 word (<12 char) per line, optional `<TAB>weight`",
     type=interactions.OptionType.ATTACHMENT,
     name="file"
 )
 async def upload(ctx: interactions.CommandContext, file: interactions.Attachment):
     """Send a list of word in a `.txt` file"""
     guild = await ctx.get_guild()
+    language = Language.get_discord_equivalent(ctx.locale)
     if not file.filename.endswith(".txt"):
         return await ctx.send("The file must be a tkt file")
-    if file.size > 15000:
+    if file.size > UPLOAD_MAX_BYTES:
         print(file.size)
         size_kB = str(file.size/1000)
-        return await ctx.send(f"The file is too large. Received: {size_kB[:size_kB.find('.')+2]}kB, max: 15kB", ephemeral=True)
+        return await ctx.send(f"The file is too large. Received: {size_kB[:size_kB.find('.')+2]}kB, max: {UPLOAD_MAX_BYTES//1000}kB", ephemeral=True)
     downloaded_file = await file.download()
     wrapper = io.TextIOWrapper(downloaded_file, encoding='utf-8')
-    write_list_file(wrapper, max_word=1000, max_length_word=11, guild_id=str(guild.id))
-    return await ctx.send("File added")
-
-
-bot.start()
\ No newline at end of file
+    # the words also in the default list are kept, the pools skip them when both lists are used
+    default_words = await get_word_list_repository().refresh(get_default_list_path(language))
+    store = get_guild_word_store()
+    report = UploadReport()
+    try:
+        words = parse_upload(wrapper, UPLOAD_MAX_WORDS, 11, report, default_words)
+        await get_file_io().run("write_word_list", store.replace, str(guild.id), words)
+    except (OSError, TimeoutError, sqlite3.Error) as e:
+        print(e)
+        return await ctx.send(Translator.get_error_message(language=language), ephemeral=True)
+    store.invalidate(str(guild.id))
+    get_word_pool_index().invalidate_guild(str(guild.id))
+    return await ctx.send(Translator.get_upload_report_message(report, UPLOAD_MAX_WORDS, language))
+
+
+try:
+    bot.start()
+finally:
+    # commit the games changed since the last group commit
+    get_game_store().close()
@@ -0,0 +1,95 @@
+from BoardRenderer import BoardRenderer
+from CardGrid import CardGrid
+from ColorCard import ColorCard
+from Language import Language
+from TileCache import get_tile_cache
+import TileCache
+from ArtifactStore import get_artifact_store
+import RenderExecutor
+import pytest
+
+# render in the test process
+RenderExecutor.RENDER_EXECUTOR = RenderExecutor.RenderExecutor(workers=0)
+
+class TestBoardRenderer:
+
+    card_grid:CardGrid = CardGrid(
+        language=Language.EN,
+        starting_team_color=ColorCard.BLUE,
+        team_list=[ColorCard.BLUE, ColorCard.RED]
+    )
+
+    @pytest.mark.asyncio
+    async def test_only_guessed_card_is_dirty(self):
+        renderer = BoardRenderer(self.card_grid, channel_id="test_dirty")
+        await renderer.render(isSpy=False)
+        await renderer.render(isSpy=True)
+        assert renderer.dirty_tiles(isSpy=False) == []
+
+        word = self.card_grid.get_word_by_number(7)
+        self.card_grid.guess(word)
+        assert renderer.dirty_tiles(isSpy=False) == [6]
+        assert renderer.dirty_tiles(isSpy=True) == [6]
+
+    @pytest.mark.asyncio
+    async def test_incremental_render_equals_full_render(self):
+        renderer = BoardRenderer(self.card_grid, channel_id="test_incremental")
+        await renderer.render(isSpy=True)
+        self.card_grid.guess(self.card_grid.get_word_by_number(1))
+        await renderer.render(isSpy=True)
+
+        full_renderer = BoardRenderer(self.card_grid, channel_id="test_full")
+        await full_renderer.render(isSpy=True)
+
+        assert renderer.canvases[True].tobytes() == full_renderer.canvases[True].tobytes()
+
+    @pytest.mark.asyncio
+    async def test_tile_cache_shared_between_games(self):
+        await BoardRenderer(self.card_grid, channel_id="test_cache_1").render(isSpy=False)
+        hits = get_tile_cache().hits
+        await BoardRenderer(self.card_grid, channel_id="test_cache_2").render(isSpy=False)
+        assert get_tile_cache().hits == hits + self.card_grid.grid_size**2
+
+    @pytest.mark.asyncio
+    async def test_guessed_tile_shared_between_views(self, monkeypatch):
+        # an empty cache : only the tiles of this grid are cached
+        monkeypatch.setattr(TileCache, "TILE_CACHE", TileCache.TileCache(max_bytes=64_000_000))
+        card_grid = CardGrid(language=Language.EN, starting_team_color=ColorCard.BLUE, team_list=[ColorCard.BLUE, ColorCard.RED])
+        card_grid.guess(card_grid.get_word_by_number(3))
+        renderer = BoardRenderer(card_grid, channel_id="test_shared_views")
+        await renderer.render(isSpy=True)
+        assert get_tile_cache().hits == 0
+        await renderer.render(isSpy=False)
+        # the guessed card and the white cards look the same in both views
+        shared = [index for index in range(card_grid.grid_size**2) if renderer.visible_state(index, True) == renderer.visible_state(index, False)]
+        assert 2 in shared and get_tile_cache().hits == len(shared)
+
+    @pytest.mark.asyncio
+    async def test_render_views_equals_separate_renders(self):
+        renderer = BoardRenderer(self.card_grid, channel_id="test_views")
+        encoded = await renderer.render_views([False, True])
+        assert set(encoded.keys()) == {False, True}
+
+        for isSpy in (False, True):
+            separate_renderer = BoardRenderer(self.card_grid, channel_id="test_separate")
+            await separate_renderer.render(isSpy)
+            assert renderer.canvases[isSpy].tobytes() == separate_renderer.canvases[isSpy].tobytes()
+
+    @pytest.mark.asyncio
+    async def test_same_board_state_shares_artifact(self):
+        first = BoardRenderer(self.card_grid, channel_id="test_hash_1")
+        second = BoardRenderer(self.card_grid, channel_id="test_hash_2")
+        await first.render(isSpy=True)
+        await second.render(isSpy=True)
+        store = get_artifact_store()
+        assert store.get_hash("test_hash_1", True) == store.get_hash("test_hash_2", True) == first.state_hash(isSpy=True)
+        assert first.state_hash(isSpy=True) != first.state_hash(isSpy=False)
+
+        await store.remove("test_hash_1")
+        assert await store.get("test_hash_2", True) is not None
+
+    def test_render_timeout_from_env(self, monkeypatch):
+        monkeypatch.setenv("RENDER_TIMEOUT", "2.5")
+        assert RenderExecutor.RenderExecutor.from_env().timeout == 2.5
+        monkeypatch.setenv("RENDER_TIMEOUT", "never")
+        assert RenderExecutor.RenderExecutor.from_env().timeout == 20
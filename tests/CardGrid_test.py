@@ -0,0 +1,40 @@
+from CardGrid import CardGrid, normalize_word
+from ColorCard import ColorCard
+from Language import Language
+from CodeGameExceptions import WordNotInGrid
+import pytest
+import random
+
+class TestCardGrid:
+
+    def test_index_follows_guesses(self):
+        card_grid = CardGrid(Language.EN, ColorCard.RED, [ColorCard.RED, ColorCard.BLUE])
+        card = card_grid.get_card(3)
+        assert card_grid.get_card_by_word(card.word) == card
+        assert card_grid.get_card_by_word(normalize_word(card.word.lower() + " extra")) == card
+
+        card_grid.guess(card.word)
+        assert card_grid.get_card_by_word(card.word) is None
+        assert not card_grid.is_in_grid(card.word)
+        with pytest.raises(WordNotInGrid):
+            card_grid.guess(card.word)
+        # only the words of the grid are indexed, not the whole pool
+        assert card_grid.positions is not None and len(card_grid.positions) == card_grid.grid_size**2
+
+    def test_remaining_cards(self):
+        card_grid = CardGrid(Language.EN, ColorCard.RED, [ColorCard.RED, ColorCard.BLUE])
+        for color in [ColorCard.RED, ColorCard.BLUE, ColorCard.WHITE, ColorCard.BLACK]:
+            assert len(card_grid.remaining_cards(color)) == card_grid.remaining_count(color)
+
+        card = card_grid.remaining_cards(ColorCard.BLUE)[0]
+        clone = card_grid.clone()
+        card_grid.guess(card.word)
+        assert card not in card_grid.remaining_cards(ColorCard.BLUE)
+        assert clone.remaining_count(ColorCard.BLUE) == card_grid.remaining_count(ColorCard.BLUE) + 1
+        assert len(card_grid.remaining_cards(ColorCard.BLUE)) == card_grid.remaining_count(ColorCard.BLUE)
+
+    def test_same_seed_same_grid(self):
+        grids = [CardGrid(Language.EN, ColorCard.RED, [ColorCard.RED, ColorCard.BLUE, ColorCard.GREEN], rng=random.Random(42)) for _ in range(2)]
+        assert grids[0].pool_version == grids[1].pool_version
+        assert [(card.word, card.color) for card in grids[0].cards()] == [(card.word, card.color) for card in grids[1].cards()]
+        assert sum(card.color == ColorCard.RED for card in grids[0].cards()) == 10
@@ -0,0 +1,32 @@
+from CompiledWordList import CompiledWordList, compile_list_file, compile_words, HEADER, MAGIC
+from WordListRepository import WordListRepository
+import pytest
+
+class TestCompiledWordList:
+
+    def test_compiled_list_equals_text_list(self, tmp_path):
+        path = str(tmp_path / "list.txt")
+        with open(path, "w") as f:
+            f.write("Élan\nchat\nChat\nporte-avion\n")
+        words = CompiledWordList(compile_list_file(path))
+        assert len(words) == 3
+        assert list(words) == ["ELAN", "CHAT", "PORTE-AVION"]
+        assert words[-1] == "PORTE-AVION"
+        with pytest.raises(IndexError):
+            words[3]
+
+    def test_other_version_is_rejected(self, tmp_path):
+        path = str(tmp_path / "list.wl")
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, 0, 0, 0))
+        with pytest.raises(ValueError):
+            CompiledWordList(path)
+
+    def test_repository_opens_compiled_list(self, tmp_path):
+        path = str(tmp_path / "list.txt")
+        with open(path, "w") as f:
+            f.write("chat\n")
+        compile_words(["CHIEN"], str(tmp_path / "list.wl"))
+        words = WordListRepository(check_interval=0).get(path)
+        assert isinstance(words, CompiledWordList)
+        assert list(words) == ["CHIEN"]
@@ -0,0 +1,34 @@
+from FileIO import FileIO
+import time
+import pytest
+
+class TestFileIO:
+
+    @pytest.mark.asyncio
+    async def test_operations_are_measured(self, tmp_path):
+        file_io = FileIO(workers=2)
+        path = str(tmp_path / "grid.png")
+        await file_io.write_bytes(path, b"grid")
+        assert await file_io.read_bytes(path) == b"grid"
+        await file_io.remove(path)
+        await file_io.remove(path)
+        with pytest.raises(FileNotFoundError):
+            await file_io.read_bytes(path)
+
+        stats = file_io.stats()
+        assert stats["remove"]["count"] == 2
+        assert stats["read_bytes"]["count"] == 1
+        assert stats["read_bytes"]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_operation_times_out(self):
+        file_io = FileIO(workers=1, timeout=0.05)
+        with pytest.raises(TimeoutError):
+            await file_io.run("slow", time.sleep, 0.5)
+        assert file_io.stats()["slow"]["timeouts"] == 1
+
+    def test_timeout_from_env(self, monkeypatch):
+        monkeypatch.setenv("FILE_IO_TIMEOUT", "2.5")
+        assert FileIO.from_env().timeout == 2.5
+        monkeypatch.setenv("FILE_IO_TIMEOUT", "never")
+        assert FileIO.from_env().timeout == 10
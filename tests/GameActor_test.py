@@ -0,0 +1,98 @@
+from Game import Game
+from GameActor import GameActor
+from Language import Language
+from ColorCard import ColorCard
+from Creator import Creator
+from CodeGameExceptions import GameBusy, GameNotFound
+import interactions as di
+import asyncio
+import random
+import pytest
+
+class TestGameActor:
+
+    creator:Creator = Creator(Language.EN, creator_id="1", channel_id="actor", guild_id="1")
+    users:list[di.User] = [di.User(id=di.Snowflake(2000 + i), username=f"user{i}", avatar="", client="") for i in range(8)] # type: ignore
+
+    @pytest.mark.asyncio
+    async def test_concurrent_clicks(self):
+        game = Game(self.creator, nb_teams=4, default_word_list=True, server_word_list=False)
+        game.actor = GameActor(Language.EN, max_queued=10_000)
+        rng = random.Random(0)
+        clicks = []
+        for _ in range(5000):
+            user = rng.choice(self.users)
+            if rng.random() < 0.8:
+                clicks.append(game.actor.submit("join", game.join, user, rng.choice(game.team_colors), rng.choice([True, False, None])))
+            else:
+                clicks.append(game.actor.submit("invert_can_be_spy", game.invert_can_be_spy, user))
+        await asyncio.gather(*clicks, return_exceptions=True)
+
+        # every player is in the team of its color and only in it
+        assert set(game.player_list) == set().union(*game.teams.values())
+        for (color, team) in game.teams.items():
+            assert all(game.player_list[user_id].team_color == color for user_id in team)
+        stats = game.actor.stats()
+        assert stats["commands"] == 5000 and stats["depth"] == 0 and stats["max_depth"] > 1
+        assert game.actor.task is None
+
+    @pytest.mark.asyncio
+    async def test_guesses_do_not_wait_for_renders(self):
+        creator = Creator(Language.EN, creator_id="1", channel_id="actor_renders", guild_id="1")
+        game = Game(creator, nb_teams=2, default_word_list=True, server_word_list=False)
+        for (i, user) in enumerate(self.users[:4]):
+            await game.actor.submit("join", game.join, user, [ColorCard.BLUE, ColorCard.RED][i % 2], i < 2)
+        await game.actor.submit("start", game.start, creator.creator_id)
+        users = {int(user.id): user for user in self.users}
+        await game.actor.submit("suggest", game.suggest, users[game.spies[game.color_state].user_id], "hint", 8)
+
+        # a burst of guesses of the cards of the team : the actor applies them without waiting for their renders
+        player = next(p for p in game.get_team(game.color_state) if not p.isSpy)
+        words = [card.word for card in game.card_grid.remaining_cards(game.color_state) if " " not in card.word][:6]
+        await asyncio.gather(*[game.actor.submit("guess", game.guess_by_word, users[player.user_id], word) for word in words])
+        assert game.card_grid.remaining_count(game.color_state) == 9 - len(words)
+
+        await game.wait_for_render(game.board_version)
+        # the start and the guesses are merged in fewer renders
+        assert game.render_scheduler.renders < 1 + len(words)
+
+    @pytest.mark.asyncio
+    async def test_commands_do_not_interleave(self):
+        actor = GameActor(Language.EN, max_queued=1000)
+        running:list[int] = []
+        overlaps = 0
+
+        async def command(i:int) -> int:
+            nonlocal overlaps
+            overlaps += len(running)
+            running.append(i)
+            await asyncio.sleep(0)
+            running.remove(i)
+            return i
+
+        assert await asyncio.gather(*[actor.submit("command", command, i) for i in range(1000)]) == list(range(1000))
+        assert overlaps == 0
+
+    @pytest.mark.asyncio
+    async def test_games_run_in_parallel(self):
+        (blocked, other) = (GameActor(Language.EN), GameActor(Language.EN))
+        event = asyncio.Event()
+        waiting = asyncio.create_task(blocked.submit("wait", event.wait))
+        assert await asyncio.wait_for(other.submit("ping", lambda: "pong"), timeout=1) == "pong"
+        event.set()
+        await waiting
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_and_close(self):
+        actor = GameActor(Language.EN, max_queued=2)
+        event = asyncio.Event()
+        tasks = [asyncio.create_task(actor.submit("wait", event.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(GameBusy):
+            await actor.submit("wait", event.wait)
+        assert actor.stats()["rejected"] == 1
+
+        await actor.close()
+        for task in tasks:
+            with pytest.raises(GameNotFound):
+                await task
@@ -0,0 +1,60 @@
+from Game import Game, State
+from GameList import GameList
+from GameStore import GameStore
+from GameLog import GameEvent, EventType, LoggedUser
+from Language import Language
+from ColorCard import ColorCard
+from Creator import Creator
+import interactions as di
+import json
+import pytest
+
+class TestGameLog:
+
+    creator:Creator = Creator(Language.EN, creator_id="1", channel_id="log", guild_id="1")
+    users:list[di.User] = [di.User(id=di.Snowflake(4000 + i), username=f"user{i}", avatar="", client="") for i in range(4)] # type: ignore
+
+    async def play(self, game:Game):
+        """join, start and guess until a team wins, without rendering"""
+        game.headless = True
+        for (i, user) in enumerate(self.users):
+            await game.join(user, game.team_colors[i % 2], i < 2)
+        await game.leave(self.users[3])
+        await game.join(self.users[3], ColorCard.RED, False)
+        await game.start(self.creator.creator_id)
+        while game.state != State.WIN:
+            if game.state == State.SPY:
+                await game.suggest(LoggedUser(game.spies[game.color_state].user_id), "hint", 2) # type: ignore
+            else:
+                player = next(p for p in game.get_team(game.color_state) if not p.isSpy)
+                card = next(card for card in game.card_grid.cards() if not card.guessed and " " not in card.word)
+                await game.guess_by_word(LoggedUser(player.user_id), card.word) # type: ignore
+
+    @pytest.mark.asyncio
+    async def test_replay(self):
+        game = Game(self.creator, nb_teams=2, default_word_list=True, server_word_list=False)
+        await self.play(game)
+
+        events = [GameEvent.decode(row[2]) for row in game.log.encode_pending()]
+        assert [event.type for event in events[:7]] == [EventType.CREATE, *[EventType.JOIN] * 4, EventType.LEAVE, EventType.JOIN]
+        assert events == game.log.pending
+        assert Game.replay(events).snapshot() == game.snapshot()
+
+        with pytest.raises(ValueError):
+            Game.replay(events[1:])
+
+    @pytest.mark.asyncio
+    async def test_compaction(self, tmp_path):
+        store = GameStore(str(tmp_path / "games.db"), flush_interval=0)
+        game_list = GameList(store)
+        game = await game_list.create_game(self.creator, 2, True, False)
+        await game.actor.submit("play", self.play, game)
+        await game_list.flush()
+        assert len(store.load_events(game.log.game_id)) == game.log.length and game.log.pending == []
+
+        await game_list.delete_game("log", Language.EN)
+        await game_list.flush()
+        assert store.connection.execute("SELECT COUNT(*) FROM game_events").fetchone() == (0,)
+        [(game_id, snapshot, events)] = list(store.finished_games(batch_size=1))
+        assert game_id == game.log.game_id and snapshot == json.loads(json.dumps(game.snapshot()))
+        assert json.loads(json.dumps(Game.replay(events).snapshot())) == snapshot
@@ -0,0 +1,48 @@
+from Game import Game
+from GameList import GameList
+from GameStore import GameStore
+from Language import Language
+from ColorCard import ColorCard
+from Creator import Creator
+from CodeGameExceptions import GameNotFound
+import interactions as di
+import json
+import pytest
+
+class TestGameStore:
+
+    creator:Creator = Creator(Language.FR, creator_id="1", channel_id="store", guild_id="1")
+    users:list[di.User] = [di.User(id=di.Snowflake(3000 + i), username=f"user{i}", avatar="", client="") for i in range(4)] # type: ignore
+
+    @pytest.mark.asyncio
+    async def test_snapshot_round_trip(self):
+        game = Game(self.creator, nb_teams=2, default_word_list=True, server_word_list=False, seed=7)
+        for (i, user) in enumerate(self.users):
+            await game.join(user, game.team_colors[i % 2], i < 2)
+        game.card_grid.guess(game.card_grid.get_word_by_number(3))
+
+        restored = Game.from_snapshot(json.loads(json.dumps(game.snapshot())))
+        assert restored.snapshot() == game.snapshot()
+        assert restored.card_grid.remaining_count(ColorCard.BLACK) == game.card_grid.remaining_count(ColorCard.BLACK)
+        assert restored.card_grid.is_in_grid(game.card_grid.get_word_by_number(4))
+
+    @pytest.mark.asyncio
+    async def test_games_survive_a_restart(self, tmp_path):
+        path = str(tmp_path / "games.db")
+        game_list = GameList(GameStore(path, flush_interval=0))
+        game = await game_list.create_game(self.creator, 2, True, False)
+        await game.actor.submit("join", game.join, self.users[0], ColorCard.RED, True)
+        await game_list.flush()
+
+        # a new process reads the saved channels and restores the game on first access
+        game_list = GameList(GameStore(path))
+        assert game_list.saved_channels == {"store"} and game_list.game_list == {}
+        restored = await game_list.get_game("store", Language.FR)
+        assert restored.snapshot() == game.snapshot()
+        assert restored.actor.on_change is not None
+
+        await game_list.delete_game("store", Language.FR)
+        await game_list.flush()
+        assert GameStore(path).channel_ids() == set()
+        with pytest.raises(GameNotFound):
+            await GameList(GameStore(path)).get_game("store", Language.FR)
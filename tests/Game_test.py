@@ -10,6 +10,7 @@ import enum
 from CodeGameExceptions import *
 import pytest
 import copy
+from ArtifactStore import get_artifact_store
 
 class TestGame:
 
@@ -32,7 +33,7 @@ class TestGame:
 
     @pytest.mark.asyncio
     async def test_nb_player_in_team(self):
-        game:Game = copy.deepcopy(self.game)
+        game:Game = self.game.clone()
         await game.join(self.user1, ColorCard.BLUE, False)
         await game.join(self.user2, ColorCard.BLUE, False)
         await game.join(self.user3, ColorCard.RED, False)
@@ -43,13 +44,14 @@ class TestGame:
 
     @pytest.mark.asyncio
     async def test_join(self):
-        game:Game = copy.deepcopy(self.game)
+        game:Game = self.game.clone()
         await game.join(self.user1, ColorCard.BLUE, False)
         
-        if (p := game.player_list.get(str(self.user1.id))) is None: return
+        if (p := game.player_list.get(int(self.user1.id))) is None: return
         
-        assert p.user == self.user1
-        assert game.teams[ColorCard.BLUE][0].user == self.user1
+        assert p.user_id == int(self.user1.id)
+        assert p.name == "user1"
+        assert game.get_team(ColorCard.BLUE)[0] is p
         
         assert len(game.player_list) == 1
 
@@ -62,12 +64,12 @@ class TestGame:
         
     @pytest.mark.asyncio
     async def test_rejoin(self):
-        game:Game = copy.deepcopy(self.game)
+        game:Game = self.game.clone()
 
 
         # join BLUE with can_be_spy False
         await game.join(self.user1, ColorCard.BLUE, False)
-        if((p := game.player_list.get(str(self.user1.id))) is None): return
+        if((p := game.player_list.get(int(self.user1.id))) is None): return
         assert p.team_color == ColorCard.BLUE
         assert p.can_be_spy == False
         
@@ -88,6 +90,34 @@ class TestGame:
             else:
                 assert len(game.teams[i]) == 0
 
+    @pytest.mark.asyncio
+    async def test_leave(self):
+        game:Game = self.game.clone()
+        await game.join(self.user1, ColorCard.BLUE, False)
+        await game.join(self.user2, ColorCard.RED, False)
+        await game.leave(self.user1)
+
+        assert list(game.player_list) == [int(self.user2.id)]
+        assert game.teams[ColorCard.BLUE] == set()
+        with pytest.raises(NotInGame):
+            await game.leave(self.user1)
+
+    @pytest.mark.asyncio
+    async def test_clone_is_not_rendered(self):
+        pointers = dict(get_artifact_store().pointers)
+        game:Game = self.game.clone()
+        for user in [self.user1, self.user2, self.user3, self.user4]:
+            await game.join(user, ColorCard.BLUE if int(user.id) % 2 else ColorCard.RED, False)
+        await game.start(self.creator.creator_id)
+        spy = game.spies[game.color_state]
+        await game.suggest(di.User(id=di.Snowflake(spy.user_id), username=spy.name, avatar="", client=""), "hint", 1) # type: ignore
+        player = next(p for p in game.get_team(game.color_state) if not p.isSpy)
+        card = next(card for card in game.card_grid.cards() if " " not in card.word)
+        await game.guess_by_word(di.User(id=di.Snowflake(player.user_id), username=player.name, avatar="", client=""), card.word) # type: ignore
+
+        assert game.board_version == 2 and self.game.board_version == 0
+        assert get_artifact_store().pointers == pointers
+
     def test_team_color(self):
         game:Game = Game(self.creator, 2, True, False)
         assert game.team_colors == [ColorCard.BLUE, ColorCard.RED]
@@ -99,7 +129,7 @@ class TestGame:
         assert game.team_colors == [ColorCard.BLUE, ColorCard.RED, ColorCard.GREEN, ColorCard.YELLOW]
     
     def test_state_WAITING(self):
-        game:Game = copy.deepcopy(self.game)
+        game:Game = self.game.clone()
         assert game.state == State.WAITING
 
     def test_WordListFileNotFound(self):
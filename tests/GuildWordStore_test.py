@@ -0,0 +1,44 @@
+from GuildWordStore import SqliteGuildWordStore
+import os
+import pytest
+
+class TestSqliteGuildWordStore:
+
+    def test_replace_and_query(self, tmp_path):
+        store = SqliteGuildWordStore(str(tmp_path / "words.db"), batch_size=2)
+        store.replace("1", [("Chat", None), ("Chien", None), ("Chat", None), ("Maison", None)])
+        store.replace("2", [("Porte", 2)])
+
+        assert store.count("1") == 3
+        assert store.get_words("1") == ("CHAT", "CHIEN", "MAISON")
+        assert store.get_words("1") is store.get_words("1")
+        assert set(store.sample("1", 2)) <= {"CHAT", "CHIEN", "MAISON"}
+        with pytest.raises(FileNotFoundError):
+            store.get_words("3")
+
+        store.replace("1", [("Ecole", None)])
+        store.invalidate("1")
+        assert store.get_words("1") == ("ECOLE",)
+        assert store.get_words("2") == ("PORTE",)
+        assert store.get_weights("1") is None
+        assert store.get_weights("2") == (2,)
+
+    @pytest.mark.asyncio
+    async def test_replaced_by_another_process(self, tmp_path):
+        (store, other) = (SqliteGuildWordStore(str(tmp_path / "words.db")), SqliteGuildWordStore(str(tmp_path / "words.db")))
+        store.replace("1", [("Chat", None)])
+        words = await other.refresh("1")
+        assert await other.refresh("1") is words
+
+        # the upload is handled by the other process : the cached list is read again on refresh
+        store.replace("1", [("Chien", 2)])
+        assert await other.refresh("1") == ("CHIEN",)
+        assert other.get_weights("1") == (2,)
+
+    def test_import_list_files(self, tmp_path):
+        os.makedirs(tmp_path / "servers")
+        with open(tmp_path / "servers" / "42_word_list.txt", "w") as f:
+            f.write("Chat\nÉlan\n")
+        store = SqliteGuildWordStore(str(tmp_path / "words.db"))
+        assert store.import_list_files(str(tmp_path / "servers")) == {"42": 2}
+        assert store.get_words("42") == ("CHAT", "ELAN")
@@ -0,0 +1,29 @@
+from RecentWords import RecentWords
+from WordPool import WordPool
+from Language import Language
+
+class TestRecentWords:
+
+    pool:WordPool = WordPool((tuple(f"WORD{i}" for i in range(200)),))
+
+    def test_recent_words_are_avoided(self):
+        recent_words = RecentWords(window=3)
+        grids = [set(recent_words.sample(self.pool, (Language.EN, True, None), 25, ["channel:1"])) for _ in range(4)]
+        # the 3 first grids share no word, the 4th one only avoids the 3 last grids
+        assert len(grids[0] | grids[1] | grids[2]) == 75
+        assert grids[3].isdisjoint(grids[1] | grids[2])
+        assert recent_words.fallbacks == 0
+
+    def test_full_pool_falls_back_to_recent_words(self):
+        recent_words = RecentWords(window=10)
+        # 10 grids of 25 words for a pool of 200
+        for _ in range(10):
+            assert len(set(recent_words.sample(self.pool, (Language.EN, True, None), 25, ["channel:1"]))) == 25
+        assert recent_words.fallbacks > 0
+
+    def test_idle_histories_are_evicted(self):
+        recent_words = RecentWords(max_histories=2)
+        for channel in range(3):
+            recent_words.sample(self.pool, (Language.EN, True, None), 25, [f"channel:{channel}"])
+        assert len(recent_words.histories) == 2
+        assert recent_words.evictions == 1
@@ -0,0 +1,61 @@
+from RenderScheduler import RenderScheduler
+import asyncio
+import pytest
+
+class SlowRenderer:
+    "Renderer double that records the board version of each render"
+    def __init__(self) -> None:
+        self.versions:list[int] = []
+        self.running:int = 0
+        self.max_running:int = 0
+        self.fail:bool = False
+
+    async def render_views(self, views:list[bool], version:int=0) -> dict[bool, bytes]:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if self.fail:
+            raise TimeoutError("render failed")
+        self.versions.append(version)
+        return {isSpy: b"" for isSpy in views}
+
+class TestRenderScheduler:
+
+    @pytest.mark.asyncio
+    async def test_burst_is_coalesced(self):
+        renderer = SlowRenderer()
+        scheduler = RenderScheduler(renderer) # type: ignore
+
+        async def change(version:int):
+            scheduler.request(version)
+            await scheduler.wait_for(version)
+
+        await asyncio.gather(*[change(version) for version in range(1, 11)])
+
+        assert scheduler.rendered_version == 10
+        assert renderer.max_running == 1
+        assert len(renderer.versions) < 10
+        assert renderer.versions[-1] == 10
+
+    @pytest.mark.asyncio
+    async def test_readers_wait_for_in_flight_render(self):
+        renderer = SlowRenderer()
+        scheduler = RenderScheduler(renderer) # type: ignore
+        scheduler.request(1)
+        await asyncio.gather(*[scheduler.wait_for(1) for _ in range(50)])
+        assert renderer.versions == [1]
+
+    @pytest.mark.asyncio
+    async def test_error_is_raised_then_retried(self):
+        renderer = SlowRenderer()
+        renderer.fail = True
+        scheduler = RenderScheduler(renderer) # type: ignore
+        scheduler.request(1)
+        with pytest.raises(TimeoutError):
+            await scheduler.wait_for(1)
+
+        renderer.fail = False
+        scheduler.request(1)
+        await scheduler.wait_for(1)
+        assert scheduler.rendered_version == 1
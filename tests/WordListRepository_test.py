@@ -0,0 +1,37 @@
+from WordListRepository import WordListRepository
+import os
+
+class TestWordListRepository:
+
+    def test_list_is_read_once(self, tmp_path):
+        path = str(tmp_path / "list.txt")
+        with open(path, "w") as f:
+            f.write("Élan\nchat\nChat\n")
+        repository = WordListRepository(check_interval=0)
+        assert repository.get(path) == ("ELAN", "CHAT")
+        assert repository.get(path) is repository.get(path)
+        assert (repository.misses, repository.hits, repository.reloads) == (1, 2, 0)
+
+    def test_list_is_reloaded_when_modified(self, tmp_path):
+        path = str(tmp_path / "list.txt")
+        with open(path, "w") as f:
+            f.write("chat\n")
+        repository = WordListRepository(check_interval=0)
+        repository.get(path)
+        with open(path, "w") as f:
+            f.write("chien\n")
+        os.utime(path, (0, 0))
+        assert repository.get(path) == ("CHIEN",)
+        assert repository.reloads == 1
+
+    def test_invalidate(self, tmp_path):
+        path = str(tmp_path / "list.txt")
+        with open(path, "w") as f:
+            f.write("chat\n")
+        repository = WordListRepository(check_interval=3600)
+        repository.get(path)
+        with open(path, "w") as f:
+            f.write("chien\n")
+        assert repository.get(path) == ("CHAT",)
+        repository.invalidate(path)
+        assert repository.get(path) == ("CHIEN",)
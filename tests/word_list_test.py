@@ -0,0 +1,67 @@
+from word_list import write_list_file, read_list_file, read_weighted_list_file
+from WordPool import WordPool, WordPoolIndex
+from Language import Language
+import random
+import time
+import io
+import pytest
+
+class TestWordList:
+
+    def test_upload_report(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        wrapper = io.TextIOWrapper(io.BytesIO("chat\nChat\n\nélan\nchien\nsans espace\ntrès-long-mot\nporte-avion\nmaison\n".encode("utf-8")), encoding="utf-8")
+        report = write_list_file(wrapper, max_word=4, max_length_word=11, guild_id="42", default_words=("CHIEN",))
+
+        # the words of the default list are kept : a game may use the guild list only
+        assert (report.accepted, report.rejected, report.duplicated, report.in_default_list, report.truncated) == (4, 2, 1, 1, True)
+        assert read_list_file("words/servers/42_word_list.txt") == ["CHAT", "ELAN", "CHIEN", "PORTE-AVION"]
+
+    def test_large_default_list(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        # the default list is a tuple, as returned by the repository
+        default_words = tuple(f"MOT{i}" for i in range(100_000))
+        wrapper = io.TextIOWrapper(io.BytesIO("".join(f"mot{i}\n" for i in range(0, 20_000, 2)).encode("utf-8")), encoding="utf-8")
+        start = time.perf_counter()
+        report = write_list_file(wrapper, max_word=10_000, max_length_word=11, guild_id="42", default_words=default_words)
+
+        assert (report.accepted, report.in_default_list) == (10_000, 10_000)
+        assert time.perf_counter() - start < 2
+
+    def test_weighted_upload(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        wrapper = io.TextIOWrapper(io.BytesIO("chat\t3\nchien\nmaison\t0\nporte\t-1\n".encode("utf-8")), encoding="utf-8")
+        report = write_list_file(wrapper, max_word=10, max_length_word=11, guild_id="42")
+
+        assert (report.accepted, report.rejected) == (2, 2)
+        assert read_weighted_list_file("words/servers/42_word_list.txt") == (["CHAT", "CHIEN"], [3, 1])
+
+    def test_weighted_pool(self):
+        pool = WordPool((("A", "B"), ("B", "C")), ((9, 1), None))
+        rng = random.Random(0)
+        draws = [pool[pool.draw_index(rng)] for _ in range(11000)]
+
+        # A : 9, B : 1 from the first list, C : 1
+        assert 8500 < draws.count("A") < 9500
+        assert 700 < draws.count("C") < 1300
+        assert sorted(pool.sample(3, rng)) == ["A", "B", "C"]
+
+    @pytest.mark.asyncio
+    async def test_pool_merged_by_refresh(self):
+        index = WordPoolIndex()
+        await index.refresh(Language.EN, True, None)
+        pool = index.get_pool(Language.EN, True, None)
+        assert index.get_pool(Language.EN, True, None) is pool
+        # merged in the file I/O threads, never in get_pool
+        assert (index.stats()["builds"], index.stats()["sync_builds"], index.stats()["hits"]) == (1, 0, 2)
+        # the version is hashed with the merge
+        assert pool._version is not None
+
+        merged = WordPool((("A", "B", "D"), ("B", "C", "D", "E")))
+        assert [merged[i] for i in range(len(merged))] == ["A", "B", "D", "C", "E"]
+
+    def test_pool_version(self):
+        lists = (("A", "B"), ("B", "C"))
+        assert WordPool(lists).version == WordPool(tuple(list(words) for words in lists)).version
+        assert WordPool(lists).version != WordPool(lists, ((2, 1), None)).version
+        assert WordPool(lists).version != WordPool((("A", "B"), ("C", "B"))).version
@@ -1,30 +1,126 @@
 import io
+import os
+import math
+from typing import Collection, Iterable, Iterator
 import unidecode
 
-def write_list_file(wrapper:io.TextIOWrapper, max_word:int, max_length_word:int, guild_id:str):
-    """write words in a file
+
+class UploadReport(object):
+    def __init__(self) -> None:
+        """constructor of the UploadReport object, the count of the lines of an uploaded word list
+        """
+        super(UploadReport, self).__init__()
+        self.accepted:int = 0
+        self.rejected:int = 0
+        self.duplicated:int = 0
+        # accepted words also in the default list, kept for the games played with the guild list only
+        self.in_default_list:int = 0
+        # True if the file had more words than allowed
+        self.truncated:bool = False
+
+    def __repr__(self) -> str:
+        return f"{{accepted: {self.accepted}, rejected: {self.rejected}, duplicated: {self.duplicated}, in_default_list: {self.in_default_list}, truncated: {self.truncated}}}"
+
+
+def is_valid_word(word:str, max_length_word:int) -> bool:
+    return (word != ""
+            and len(word) <= max_length_word
+            and all(x.isalpha() or x == "-" or x.isnumeric() for x in word))
+
+def parse_weight(text:str) -> float | None:
+    """read the weight of a word, the words without weight are drawn like a word of weight 1
+
+    Args:
+        text (str): the text after the tabulation of the line
+
+    Returns:
+        float | None: the weight, None if it is not a positive number
+    """
+    try:
+        weight = float(text)
+    except ValueError:
+        return None
+    return weight if weight > 0 and math.isfinite(weight) else None
+
+def split_line(line:str) -> tuple[str, str | None]:
+    # a line is `word` or `word<TAB>weight`
+    (word, _, weight) = line.strip().partition("\t")
+    return (word.strip(), weight.strip() if weight != "" else None)
+
+def parse_upload(lines:Iterable[str], max_word:int, max_length_word:int, report:UploadReport, default_words:Collection[str]=()) -> Iterator[tuple[str, float | None]]:
+    """read an uploaded word list line by line and yield the accepted words.
+
+    A line is a word, optionally followed by a tabulation and its weight : a word of weight 2 is drawn twice as often as a word of weight 1
+
+    Args:
+        lines (Iterable[str]): the lines of the file
+        max_word (int): Number max of word allowed to add
+        max_length_word (int): max length of a word, if the length is greater the word will not be added
+        report (UploadReport): the report filled while the words are read
+        default_words (Collection[str], optional): the normalized words of the default list, accepted and counted in the report. Defaults to ().
+
+    Yields:
+        Iterator[tuple[str, float | None]]: the accepted words and their weight, None if not given
+    """
+    # normalized words of the file
+    seen:set[str] = set()
+    # the default list may be a tuple or a CompiledWordList : a set is built once, in the thread reading the upload
+    default_set:frozenset[str] | set[str] = default_words if isinstance(default_words, (set, frozenset)) else frozenset(default_words)
+    for line in lines:
+        (text, weight_text) = split_line(line)
+        word = unidecode.unidecode(text).capitalize()
+        if word == "":
+            continue
+        weight = parse_weight(weight_text) if weight_text is not None else None
+        if not is_valid_word(word, max_length_word) or (weight_text is not None and weight is None):
+            report.rejected += 1
+            continue
+        if word.upper() in seen:
+            report.duplicated += 1
+            continue
+        if report.accepted >= max_word:
+            report.truncated = True
+            break
+        seen.add(word.upper())
+        report.accepted += 1
+        if word.upper() in default_set:
+            report.in_default_list += 1
+        yield (word, weight)
+
+def write_words(path:str, words:Iterable[tuple[str, float | None]]):
+    """write words in a file, one per line followed by its weight if given.
+
+    The file is replaced once complete : the games being created keep reading the previous file
+
+    Args:
+        path (str): the path of the file
+        words (Iterable[tuple[str, float | None]]): the words and their weight
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        for (word, weight) in words:
+            f.write(f"{word}\t{weight:g}\n" if weight is not None else word+"\n")
+    os.replace(tmp_path, path)
+
+def write_list_file(wrapper:io.TextIOWrapper, max_word:int, max_length_word:int, guild_id:str, default_words:Collection[str]=()) -> UploadReport:
+    """write words in a file, the file is read line by line and replaced once complete.
+
+    Run it in a thread : it reads and writes files
 
     Args:
         wrapper (io.TextIOWrapper): text wrapper buffer
         max_word (int): Number max of word allowed to add
         max_length_word (int): max length of a word, if the length is greater the word will not be added
         guild_id (str): the guild id of the word list
+        default_words (Collection[str], optional): the normalized words of the default list, accepted and counted in the report. Defaults to ().
+
+    Returns:
+        UploadReport: the number of words accepted, rejected and duplicated
     """
-    l = wrapper.readlines()
-    with open(f"words/servers/{guild_id}_word_list.txt", "w") as f:
-        
-        i = 0
-        words_added:list[str] = []
-        while i < len(l) and len(words_added) < max_word:
-            word = unidecode.unidecode(l[i].strip()).capitalize()
-            i += 1
-            if (all(x.isalpha() or x == "-" or x.isnumeric() for x in word[:-1]) 
-                    and len(word) <= max_length_word 
-                    and word not in words_added
-                    and word != ""):
-                words_added.append(word)
-                f.write(word+"\n")
-        # exit : i >= len(l) or len(words_added) >= max_word
+    report = UploadReport()
+    write_words(f"words/servers/{guild_id}_word_list.txt", parse_upload(wrapper, max_word, max_length_word, report, default_words))
+    return report
 
 def read_list_file(path:str) -> list[str]:
     """read a file to create a list of word
@@ -35,7 +131,27 @@ def read_list_file(path:str) -> list[str]:
     Returns:
         list[str]: the list of word
     """
-    with open(path, "r") as f:
-        return [unidecode.unidecode(word.strip()).upper() for word in f.readlines() if word != "\n"]
+    return read_weighted_list_file(path)[0]
 
+def read_weighted_list_file(path:str) -> tuple[list[str], list[float] | None]:
+    """read a file to create a list of word and the list of their weight
 
+    Args:
+        path (str): the path of the file
+
+    Returns:
+        tuple[list[str], list[float] | None]: the list of word and their weight, None if no word has a weight
+    """
+    words:list[str] = []
+    weights:list[float] = []
+    weighted = False
+    with open(path, "r") as f:
+        for line in f:
+            (word, weight_text) = split_line(line)
+            if word == "":
+                continue
+            weight = parse_weight(weight_text) if weight_text is not None else None
+            weighted = weighted or weight is not None
+            words.append(unidecode.unidecode(word).upper())
+            weights.append(weight if weight is not None else 1)
+    return (words, weights if weighted else None)